@@ -0,0 +1,241 @@
+"""
+Microbenchmarks for the plan and projection services.
+
+Runs without network access or Firebase: only the model artifacts in core/services and the student spending
+dataset are used. Every benchmark calls a function over inputs built from Models/student_spending.csv and
+reports ops/sec, p50 and p99 latencies.
+
+Usage (from PocketUAI_Back):
+    python -m benchmarks.models_benchmark --output results.json
+    python -m benchmarks.models_benchmark --compare results.json --max-regression 0.2
+
+With --compare, the run fails (exit code 1) when the p50 of a benchmark is more than --max-regression
+(a fraction) slower than in the given results file.
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import numpy as np  # noqa: E402
+from core.services import planModel, regresionModel  # noqa: E402
+from core.services.planArtifacts import registry  # noqa: E402
+from core.services.planCache import plan_cache  # noqa: E402
+from core.services.projectionCache import get_points_json, projection_cache  # noqa: E402
+
+DATASET_PATH = os.path.join(os.path.dirname(BACKEND_DIR), "Models", "student_spending.csv")  # Dataset the models were trained on
+GOALS = [1000, 5000, 10000, 20000, 50000]  # Savings goals drawn for the synthetic users
+DURATIONS = [3, 6, 12, 24, 36, 48]  # Durations (in months) drawn for the synthetic users
+
+def load_users(path=DATASET_PATH, seed=0):
+    """
+    Builds plan requests from the student spending dataset, grouping its columns into the categories used by the
+    models (the same grouping as Models/spending-grouped-classes.csv).
+
+    Parameters:
+    path (str): Path of the student spending CSV.
+    seed (int): Seed used to draw the goal, duration and previous savings of each user.
+
+    Returns:
+    list: One create_plan request body per row of the dataset.
+    """
+    rng = random.Random(seed)
+    users = []
+
+    with open(path, newline="") as file:
+        for row in csv.DictReader(file):
+            value = lambda column: float(row[column])
+            expenses = {
+                "housing": value("housing"),
+                "food": value("food"),
+                "transportation": value("transportation"),
+                "non-essential": value("entertainment") + value("technology") + value("miscellaneous") + value("books_supplies"),
+                "health": value("personal_care") + value("health_wellness"),
+                "university": value("tuition") / 12
+            }
+            users.append({
+                "income": value("monthly_income") + value("financial_aid"),
+                "last_saving": rng.choice([0, 0, 100, 500]),
+                "expenses": [{"type": category, "expense": amount} for category, amount in expenses.items()],
+                "goal": rng.choice(GOALS),
+                "duration": rng.choice(DURATIONS),
+                "goal_name": "benchmark"
+            })
+
+    return users
+
+def load_series(users, seed=0):
+    """
+    Builds projection requests: a few months of cumulative savings for each user, with some noise.
+
+    Parameters:
+    users (list): Users returned by load_users.
+    seed (int): Seed of the noise.
+
+    Returns:
+    list: One get_points request body per user.
+    """
+    rng = random.Random(seed)
+    series = []
+
+    for user in users:
+        months = list(range(1, rng.randint(3, 12) + 1))
+        monthly_saving = max(user["income"] - sum(expense["expense"] for expense in user["expenses"]), 50)
+        progress = [round(monthly_saving * month * rng.uniform(0.8, 1.2), 2) for month in months]
+        series.append({"months": months, "progress": progress, "duration": user["duration"], "poly_degree": rng.choice([1, 2, 3])})
+
+    return series
+
+def run_benchmark(function, inputs, iterations, before=None):
+    """
+    Times a function over a list of inputs, cycling through them.
+
+    Parameters:
+    function (callable): Function called with one input per iteration.
+    inputs (list): Inputs of the function.
+    iterations (int): Number of timed calls.
+    before (callable, optional): Called before each call, outside of the timed region.
+
+    Returns:
+    dict: The number of iterations, ops/sec and the mean, p50 and p99 latencies in microseconds.
+    """
+    # A few untimed calls so lazy initialization does not end up in the numbers
+    for item in inputs[:5]:
+        if before:
+            before()
+        function(item)
+
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        item = inputs[i % len(inputs)]
+        if before:
+            before()
+        start = time.perf_counter_ns()
+        function(item)
+        timings[i] = time.perf_counter_ns() - start
+
+    timings /= 1000
+    return {
+        "iterations": iterations,
+        "ops_per_sec": 1e6 / timings.mean(),
+        "mean_us": timings.mean(),
+        "p50_us": float(np.percentile(timings, 50)),
+        "p99_us": float(np.percentile(timings, 99))
+    }
+
+def build_benchmarks(users, series):
+    """
+    Lists the benchmarks of the suite.
+
+    Parameters:
+    users (list): Plan requests.
+    series (list): Projection requests.
+
+    Returns:
+    dict: Maps the benchmark name to a (function, inputs, before) tuple.
+    """
+    bundle = registry.preload()
+    minimums = bundle.minimums
+    plans = bundle.plans
+
+    # Prepared inputs for the functions that work on already classified plans
+    assigned = []
+    for user in users:
+        result = planModel.assign_plan(user, plans, model=bundle.model, class_model="dt")
+        if result["status"] == "successful":
+            assigned.append((result["assigned_plan"], user["income"], user["goal"] - user["last_saving"], user["duration"]))
+
+    return {
+        "classify_data_dt": (lambda user: planModel.classify_data_dt(user, bundle.model), users, None),
+        "classify_data_apriori": (lambda user: planModel.classify_data_apriori(user, bundle.rules), users, None),
+        "assign_plan": (lambda user: planModel.assign_plan(user, plans, model=bundle.model, class_model="dt"), users, None),
+        "adjust_and_verify_plan": (lambda item: planModel.adjust_and_verify_plan(dict(item[0]), item[1], item[2], item[3], minimums), assigned, None),
+        "create_plan": (planModel.create_plan, users, plan_cache.clear),
+        "create_plan_cached": (planModel.create_plan, users[:100], None),
+        "get_points": (regresionModel.get_points, series, None),
+        "get_points_json": (get_points_json, series, projection_cache.clear),
+        "get_points_json_cached": (get_points_json, series[:100], None)
+    }
+
+def compare_results(results, baseline, max_regression):
+    """
+    Compares the p50 latency of each benchmark with a previous run.
+
+    Parameters:
+    results (dict): Results of the current run.
+    baseline (dict): Results of the previous run.
+    max_regression (float): Allowed slowdown, as a fraction of the baseline p50.
+
+    Returns:
+    list: Descriptions of the benchmarks that regressed.
+    """
+    regressions = []
+    for name, result in results["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        change = result["p50_us"] / previous["p50_us"] - 1
+        if change > max_regression:
+            regressions.append(f"{name}: p50 {previous['p50_us']:.1f}us -> {result['p50_us']:.1f}us (+{change:.0%})")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks for planModel and regresionModel.")
+    parser.add_argument("--iterations", type=int, default=2000, help="Timed calls per benchmark.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed used to build the inputs.")
+    parser.add_argument("--dataset", default=DATASET_PATH, help="Path of student_spending.csv.")
+    parser.add_argument("--only", nargs="*", help="Names of the benchmarks to run.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed p50 slowdown with --compare (0.2 = 20%%).")
+    args = parser.parse_args(argv)
+
+    users = load_users(args.dataset, args.seed)
+    series = load_series(users, args.seed)
+    benchmarks = build_benchmarks(users, series)
+
+    results = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "iterations": args.iterations,
+            "seed": args.seed
+        },
+        "results": {}
+    }
+
+    print(f"{'benchmark':<24}{'ops/sec':>12}{'p50 (us)':>12}{'p99 (us)':>12}")
+    for name, (function, inputs, before) in benchmarks.items():
+        if args.only and name not in args.only:
+            continue
+        result = run_benchmark(function, inputs, args.iterations, before)
+        results["results"][name] = result
+        print(f"{name:<24}{result['ops_per_sec']:>12.0f}{result['p50_us']:>12.1f}{result['p99_us']:>12.1f}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare_results(results, baseline, args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
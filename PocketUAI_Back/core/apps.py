@@ -5,3 +5,10 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
 
+    def ready(self):
+        # Register the system checks of the app
+        from core import checks  # noqa: F401
+
+        # Load the plan model artifacts once per process instead of on every request
+        from core.services.planArtifacts import registry
+        registry.preload()
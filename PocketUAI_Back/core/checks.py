@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Error, Info, register
+from core.services.importBudget import measure_import_times
+
+@register("performance", deploy=True)
+def check_import_budget(app_configs, **kwargs):
+    """
+    Fails `manage.py check --deploy` when a new worker takes longer than IMPORT_TIME_BUDGET_MS
+    (in milliseconds) to set up Django and import the views. The time spent per package is reported either way.
+    A budget of 0 disables the check.
+    """
+    budget = getattr(settings, "IMPORT_TIME_BUDGET_MS", 0)
+    if not budget:
+        return []
+
+    result = measure_import_times()
+    if result["status"] != "successful":
+        return [Error(f"The import time could not be measured: {result['message']}", id="core.E001")]
+
+    report = ", ".join(f"{package} {duration:.0f}ms" for package, duration in result["packages"][:10])
+    if result["total_ms"] > budget:
+        return [Error(
+            f"Starting a worker took {result['total_ms']:.0f}ms, over the import budget of {budget}ms.",
+            hint=f"Slowest packages: {report}. Defer heavy imports until first use.",
+            id="core.E002"
+        )]
+    return [Info(f"Starting a worker took {result['total_ms']:.0f}ms (budget {budget}ms). Slowest packages: {report}.", id="core.I001")]
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.services.planArtifacts import BUNDLE_PATH, export_artifacts
+
+class Command(BaseCommand):
+    help = "Exports the plan model artifacts (decision tree, Apriori rules, plans and minimums) into the compiled bundle loaded at startup."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default=BUNDLE_PATH, help="Path of the bundle to write.")
+
+    def handle(self, *args, **options):
+        result = export_artifacts(options["output"])
+        if result["status"] != "successful":
+            raise CommandError(result["message"])
+        self.stdout.write(self.style.SUCCESS(result["message"]))
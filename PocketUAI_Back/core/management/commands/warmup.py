@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.services.warmup import WARMUP_STEPS, run_warmup
+
+class Command(BaseCommand):
+    help = "Loads the plan artifacts, runs synthetic plans and projections and opens the Firestore connection, reporting how long each step takes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--skip", nargs="*", choices=[name for name, _ in WARMUP_STEPS], help="Steps not to run. Defaults to WARMUP_SKIP.")
+
+    def handle(self, *args, **options):
+        skip = options["skip"] if options["skip"] is not None else settings.WARMUP_SKIP
+        state = run_warmup(skip)
+
+        for name, duration in state["steps"].items():
+            line = f"{name:<12}{duration:>10.1f}ms"
+            if name in state["errors"]:
+                self.stdout.write(self.style.ERROR(f"{line}  {state['errors'][name]}"))
+            else:
+                self.stdout.write(line)
+
+        if state["status"] != "ready":
+            raise CommandError(f"Warmup failed: {', '.join(state['errors'])}")
+        self.stdout.write(self.style.SUCCESS("Warmup finished."))
@@ -0,0 +1,46 @@
+import json
+import logging
+import time
+from django.conf import settings
+from core.services.timing import start_timing, stop_timing
+
+logger = logging.getLogger("core.timing")
+
+class ServerTimingMiddleware:
+    """
+    Times the stages of the model endpoints (/api/models/*) and reports them in a Server-Timing response header,
+    e.g. "artifact_load;dur=0.01, dt_classification;dur=0.06, ..., total;dur=0.45" (durations in milliseconds).
+
+    When settings.MODEL_TIMING_LOG is enabled, the same timings are also written as one JSON log line per request
+    on the "core.timing" logger.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.log_timings = getattr(settings, "MODEL_TIMING_LOG", False)
+
+    def __call__(self, request):
+        if "/api/models/" not in request.path:
+            return self.get_response(request)
+
+        token = start_timing()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            total = (time.perf_counter() - start) * 1000
+            timings = stop_timing(token)
+
+        response["Server-Timing"] = ", ".join(
+            [f"{stage};dur={duration:.3f}" for stage, duration in timings.items()] + [f"total;dur={total:.3f}"]
+        )
+
+        if self.log_timings:
+            logger.info(json.dumps({
+                "path": request.path,
+                "status": response.status_code,
+                "total_ms": round(total, 3),
+                "stages_ms": {stage: round(duration, 3) for stage, duration in timings.items()}
+            }))
+
+        return response
@@ -0,0 +1,133 @@
+import numpy as np
+from collections import namedtuple
+
+# Association rules compiled into arrays. For every rule r and feature f the rule matches when
+# lower[r, f] <= value[f] <= upper[r, f]; features a rule does not mention have infinite bounds.
+# class_index[r] points into `classes`, which keeps the order in which the classes appear in the CSV.
+CompiledRules = namedtuple("CompiledRules", ["features", "lower", "upper", "class_index", "classes"])
+
+def parse_rule(left_hand, right_hand):
+    """
+    Parses one association rule as stored in the rules CSV.
+
+    Parameters:
+    left_hand (str): Left side of the rule, e.g. "('Class / 1',)".
+    right_hand (str): Right side of the rule, e.g. "('housing / 760.4-880.2', 'food / 160.0-220.0')".
+
+    Returns:
+    tuple: The class label (str) and a list of (feature, min_value, max_value) conditions.
+    """
+    clase = left_hand.split(" / ")[1].strip("',()")
+    conditions = []
+
+    for item in right_hand.strip("()").split(", "):
+        if "/" in item:
+            feature_range = item.strip("''").split("/")
+            if len(feature_range) == 2:
+                feature = feature_range[0].strip()
+                min_val, max_val = map(float, feature_range[1].split("-"))
+                conditions.append((feature, min_val, max_val))
+
+    return clase, conditions
+
+def compile_rules(rules_df):
+    """
+    Compiles the Apriori rules into NumPy arrays of per-feature bounds so they can be matched in a single
+    vectorized comparison instead of parsing every rule again on each request.
+
+    Parameters:
+    rules_df (DataFrame): DataFrame containing Apriori rules with columns 'LeftHand' and 'RightHand'.
+
+    Returns:
+    CompiledRules or dict: The compiled rules if successful, otherwise an error dictionary.
+
+    Possible error statuses:
+    - "load_error" if the rules are missing the expected columns or cannot be parsed.
+    """
+    try:
+        parsed = [parse_rule(left, right) for left, right in zip(rules_df["LeftHand"], rules_df["RightHand"])]
+    except KeyError as e:
+        return {"status": "load_error", "message": f"The rules file is missing the column {e}."}
+    except (IndexError, ValueError, AttributeError) as e:
+        return {"status": "load_error", "message": f"Error parsing the association rules: {e}"}
+
+    # Fixed feature and class axes, in order of first appearance
+    features = list(dict.fromkeys(feature for _, conditions in parsed for feature, _, _ in conditions))
+    classes = list(dict.fromkeys(clase for clase, _ in parsed))
+    feature_position = {feature: i for i, feature in enumerate(features)}
+    class_position = {clase: i for i, clase in enumerate(classes)}
+
+    lower = np.full((len(parsed), len(features)), -np.inf)
+    upper = np.full((len(parsed), len(features)), np.inf)
+    class_index = np.empty(len(parsed), dtype=np.intp)
+
+    for r, (clase, conditions) in enumerate(parsed):
+        class_index[r] = class_position[clase]
+        for feature, min_val, max_val in conditions:
+            f = feature_position[feature]
+            # A feature repeated in the same rule must satisfy every range
+            lower[r, f] = max(lower[r, f], min_val)
+            upper[r, f] = min(upper[r, f], max_val)
+
+    return CompiledRules(features=features, lower=lower, upper=upper, class_index=class_index, classes=classes)
+
+def build_feature_matrix(users, features):
+    """
+    Builds the matrix of user values laid out on the feature axis of the compiled rules.
+
+    Parameters:
+    users (list): List of dictionaries with 'income' (float) and 'expenses' (list of dicts).
+    features (list): Feature names of the compiled rules.
+
+    Returns:
+    np.ndarray: An (N x F) float matrix. Features a user does not provide are NaN and are ignored when matching.
+    """
+    feature_position = {feature: i for i, feature in enumerate(features)}
+    matrix = np.full((len(users), len(features)), np.nan)
+
+    for n, user_data in enumerate(users):
+        values = {"income": user_data.get("income")}
+        for expense in user_data.get("expenses"):
+            if isinstance(expense, dict):
+                values[expense.get('type', 0).lower().replace(" ", "_")] = expense.get('expense', 0)
+
+        for feature, value in values.items():
+            if feature in feature_position:
+                matrix[n, feature_position[feature]] = value
+
+    return matrix
+
+def match_rules(matrix, compiled):
+    """
+    Matches every user against every rule and picks, for each user, the class with the most matching rules.
+    Ties go to the class whose first matching rule comes first, as in the original row-by-row matcher.
+
+    Parameters:
+    matrix (np.ndarray): An (N x F) matrix built with build_feature_matrix.
+    compiled (CompiledRules): The compiled rules.
+
+    Returns:
+    np.ndarray: For each user, the index into compiled.classes of the predicted class, or -1 if no rule matched.
+    """
+    values = matrix[:, None, :]
+    in_range = (compiled.lower <= values) & (values <= compiled.upper)
+    matches = np.all(in_range | np.isnan(values), axis=2)  # (N x R)
+
+    n_rules = len(compiled.class_index)
+    n_classes = len(compiled.classes)
+    one_hot = np.zeros((n_rules, n_classes), dtype=np.intp)
+    one_hot[np.arange(n_rules), compiled.class_index] = 1
+    counts = matches.astype(np.intp) @ one_hot  # (N x C)
+
+    # Position of the first matching rule of each class, used to break ties
+    rule_position = np.where(matches, np.arange(n_rules), n_rules)
+    first_match = np.full((len(matrix), n_classes), n_rules, dtype=np.intp)
+    for c in range(n_classes):
+        class_rules = compiled.class_index == c
+        if class_rules.any():
+            first_match[:, c] = rule_position[:, class_rules].min(axis=1)
+
+    score = counts * (n_rules + 1) + (n_rules - first_match)
+    predictions = np.argmax(score, axis=1)
+    predictions[counts.max(axis=1, initial=0) == 0] = -1
+    return predictions
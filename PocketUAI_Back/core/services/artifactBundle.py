@@ -0,0 +1,173 @@
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import tempfile
+import zipfile
+import numpy as np
+from core.services.aprioriRules import CompiledRules
+from core.services.decisionTree import CompiledTree
+
+BUNDLE_VERSION = 1  # Bumped whenever the layout of the bundle changes; bundles with another version are ignored
+
+# Arrays stored in the bundle, next to a "meta" JSON document with the version, plans, minimums and source hashes
+TREE_ARRAYS = ("feature", "threshold", "left", "right", "leaf_class", "classes")
+RULES_ARRAYS = ("lower", "upper", "class_index")
+
+def hash_files(paths):
+    """
+    Computes the SHA-256 of the files the bundle is exported from, so a stale bundle can be detected.
+
+    Parameters:
+    paths (list): Paths of the source files.
+
+    Returns:
+    list: The hex digest of each file, or None for files that cannot be read.
+    """
+    digests = []
+    for path in paths:
+        try:
+            with open(path, "rb") as file:
+                digests.append(hashlib.sha256(file.read()).hexdigest())
+        except OSError:
+            digests.append(None)
+    return digests
+
+def export_bundle(path, model, rules, plans, minimums, sources=()):
+    """
+    Writes the compiled artifacts into a single uncompressed .npz file. Every array is stored as a plain .npy
+    member so the loader can map it straight from the file instead of copying it into memory. The file is
+    replaced atomically, so processes that have the previous bundle mapped keep reading it unchanged.
+
+    Parameters:
+    path (str): Path of the bundle to write.
+    model (CompiledTree): The compiled decision tree.
+    rules (CompiledRules): The compiled Apriori rules.
+    plans (dict): Dictionary mapping plan names to their percentage allocations.
+    minimums (dict): Minimum expense requirements.
+    sources (list, optional): Paths of the files the artifacts were loaded from, hashed into the bundle.
+    """
+    meta = {
+        "version": BUNDLE_VERSION,
+        "tree": {"features": list(model.features), "max_depth": model.max_depth},
+        "rules": {"features": list(rules.features), "classes": list(rules.classes)},
+        "plans": {name: dict(template) for name, template in plans.items()},
+        "minimums": dict(minimums),
+        "sources": hash_files(sources)
+    }
+
+    arrays = {"meta": np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)}
+    for name in TREE_ARRAYS:
+        arrays[f"tree_{name}"] = np.ascontiguousarray(getattr(model, name))
+    for name in RULES_ARRAYS:
+        arrays[f"rules_{name}"] = np.ascontiguousarray(getattr(rules, name))
+
+    # Object arrays would need pickle to load, class labels are stored as fixed-width strings instead
+    if arrays["tree_classes"].dtype == object:
+        arrays["tree_classes"] = arrays["tree_classes"].astype(str)
+
+    # Running workers keep the current bundle memory-mapped, so it is never rewritten in place: the new bundle is
+    # written to a temporary file next to it and renamed over it, and the old mappings keep the old file
+    path = str(path)
+    if not path.endswith(".npz"):
+        path += ".npz"  # Same name np.savez would have used
+    descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".npz.tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            np.savez(file, **arrays)
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def map_npz(path):
+    """
+    Memory-maps the members of an uncompressed .npz file. The arrays are read-only views over the file's pages,
+    so every process that maps the same bundle shares them through the page cache.
+
+    Parameters:
+    path (str): Path of the .npz file.
+
+    Returns:
+    dict: Maps the member names (without the .npy suffix) to read-only arrays.
+
+    Raises:
+    ValueError: If a member is compressed or holds Python objects.
+    """
+    with open(path, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    arrays = {}
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"Member '{info.filename}' is compressed and cannot be memory-mapped.")
+
+            # The member's data starts after its local header: 30 fixed bytes, the file name and the extra field
+            name_length, extra_length = struct.unpack("<HH", buffer[info.header_offset + 26:info.header_offset + 30])
+            start = info.header_offset + 30 + name_length + extra_length
+
+            header = io.BytesIO(buffer[start:start + min(info.file_size, 4096)])
+            version = np.lib.format.read_magic(header)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(header)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(header)
+            if dtype.hasobject:
+                raise ValueError(f"Member '{info.filename}' holds Python objects.")
+
+            count = int(np.prod(shape, dtype=np.int64))
+            array = np.frombuffer(buffer, dtype=dtype, count=count, offset=start + header.tell())
+            arrays[info.filename[:-len(".npy")]] = array.reshape(shape, order="F" if fortran_order else "C")
+
+    return arrays
+
+def load_bundle(path, sources=()):
+    """
+    Loads the artifacts from a bundle written by export_bundle. Only NumPy is needed: scikit-learn and pandas
+    are not imported.
+
+    Parameters:
+    path (str): Path of the bundle.
+    sources (list, optional): Paths of the source artifacts. If any of them exists and its contents differ from
+        the ones the bundle was exported from, the bundle is considered stale.
+
+    Returns:
+    dict: A dictionary with the status and, if successful, the "model" (CompiledTree), "rules" (CompiledRules),
+        "plans" and "minimums".
+
+    Possible error statuses:
+    - "load_error" if the file is missing, stale, from another version or cannot be read.
+    """
+    try:
+        arrays = map_npz(path)
+        meta = json.loads(arrays["meta"].tobytes())
+    except FileNotFoundError:
+        return {"status": "load_error", "message": f"Bundle file '{path}' not found"}
+    except Exception as e:
+        return {"status": "load_error", "message": f"Error reading the bundle file: {e}"}
+
+    if meta.get("version") != BUNDLE_VERSION:
+        return {"status": "load_error", "message": f"Unsupported bundle version {meta.get('version')}"}
+
+    for exported, current in zip(meta.get("sources", []), hash_files(sources)):
+        if current is not None and exported != current:
+            return {"status": "load_error", "message": "The bundle was exported from different artifact files"}
+
+    model = CompiledTree(
+        features=meta["tree"]["features"],
+        max_depth=meta["tree"]["max_depth"],
+        **{name: arrays[f"tree_{name}"] for name in TREE_ARRAYS}
+    )
+    rules = CompiledRules(
+        features=meta["rules"]["features"],
+        classes=meta["rules"]["classes"],
+        **{name: arrays[f"rules_{name}"] for name in RULES_ARRAYS}
+    )
+
+    return {"status": "successful", "model": model, "rules": rules, "plans": meta["plans"], "minimums": meta["minimums"]}
@@ -0,0 +1,75 @@
+import numpy as np
+from collections import namedtuple
+
+# Arrays of a fitted decision tree, enough to predict without scikit-learn or pandas.
+# Node i is a leaf when left[i] == -1; otherwise samples with value[feature[i]] <= threshold[i] go to left[i].
+# leaf_class[i] is the index into `classes` predicted when a sample ends in node i.
+CompiledTree = namedtuple("CompiledTree", ["features", "feature", "threshold", "left", "right", "leaf_class", "classes", "max_depth"])
+
+def compile_tree(model, features=None):
+    """
+    Extracts the arrays of a fitted DecisionTreeClassifier into a CompiledTree.
+
+    Parameters:
+    model (DecisionTreeClassifier): The fitted decision tree.
+    features (list, optional): Feature names in the order the model was trained with. Defaults to
+        the model's feature_names_in_.
+
+    Returns:
+    CompiledTree or dict: The compiled tree if successful, otherwise an error dictionary.
+
+    Possible error statuses:
+    - "load_error" if the model is not a fitted single-output decision tree.
+    """
+    try:
+        tree = model.tree_
+        if features is None:
+            features = [str(name) for name in model.feature_names_in_]
+
+        return CompiledTree(
+            features=list(features),
+            feature=np.asarray(tree.feature, dtype=np.intp),
+            threshold=np.asarray(tree.threshold, dtype=np.float64),
+            left=np.asarray(tree.children_left, dtype=np.intp),
+            right=np.asarray(tree.children_right, dtype=np.intp),
+            leaf_class=np.argmax(tree.value[:, 0, :], axis=1),
+            classes=np.asarray(model.classes_),
+            max_depth=int(tree.max_depth)
+        )
+    except AttributeError as e:
+        return {"status": "load_error", "message": f"The model is not a fitted decision tree: {e}"}
+
+def predict_tree(compiled, matrix):
+    """
+    Predicts the class of one or many samples by walking the compiled tree, one level at a time for the whole batch.
+
+    Parameters:
+    compiled (CompiledTree): The compiled tree.
+    matrix (array-like): A single feature vector or an (N x F) matrix, with columns in compiled.features order.
+
+    Returns:
+    np.ndarray: The predicted class label of each sample.
+
+    Raises:
+    ValueError: If the input has the wrong number of features or contains NaN values.
+    """
+    # scikit-learn evaluates trees on float32 inputs, converting the same way keeps the predictions identical
+    samples = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    if samples.shape[1] != len(compiled.features):
+        raise ValueError(f"Expected {len(compiled.features)} features, got {samples.shape[1]}.")
+    if np.isnan(samples).any():
+        raise ValueError("Input contains NaN.")
+
+    rows = np.arange(len(samples))
+    nodes = np.zeros(len(samples), dtype=np.intp)
+
+    for _ in range(compiled.max_depth):
+        is_split = compiled.left[nodes] != -1
+        if not is_split.any():
+            break
+        # Leaves have feature -2, clip it so the lookup stays valid; their node does not change anyway
+        values = samples[rows, np.maximum(compiled.feature[nodes], 0)]
+        go_left = values <= compiled.threshold[nodes]
+        nodes = np.where(is_split, np.where(go_left, compiled.left[nodes], compiled.right[nodes]), nodes)
+
+    return compiled.classes[compiled.leaf_class[nodes]]
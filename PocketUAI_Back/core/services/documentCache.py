@@ -0,0 +1,156 @@
+import copy
+import threading
+from core.services.cache import LRUCache
+
+DOCUMENT_CACHE_SIZE = 10000  # Maximum number of documents kept in memory
+# Seconds a document of each collection stays in the cache. Writes made by this process remove it at once, so the
+# TTL only bounds how long a change made by another server process can go unnoticed. Other collections are not cached.
+DOCUMENT_CACHE_TTLS = {
+    "user": 300,
+    "financialPlan": 300,
+    "tracking": 60,
+    "history": 300
+}
+
+# Documents keyed by (collection, ID)
+document_cache = LRUCache(maxsize=DOCUMENT_CACHE_SIZE)
+
+class _InvalidatingTransaction:
+    # Records the documents written in a transaction so they are removed from the cache once it finishes
+
+    def __init__(self, transaction, written):
+        self._transaction = transaction
+        self._written = written
+
+    def get(self, collection, doc_id):
+        return self._transaction.get(collection, doc_id)
+
+    def where(self, collection, field, value):
+        return self._transaction.where(collection, field, value)
+
+    def set(self, collection, doc_id, data):
+        self._written.add((collection, doc_id))
+        self._transaction.set(collection, doc_id, data)
+
+    def delete(self, collection, doc_id):
+        self._written.add((collection, doc_id))
+        self._transaction.delete(collection, doc_id)
+
+class CachedStorage:
+    """
+    Read-through cache in front of a document storage (FirestoreStorage or SqliteStorage), with the same operations.
+
+    get() answers from the cache when it can; every write made through this object removes the document from the
+    cache. Queries and reads inside transactions always go to the storage.
+    """
+
+    def __init__(self, backend, cache=document_cache, ttls=DOCUMENT_CACHE_TTLS):
+        self.backend = backend
+        self.cache = cache
+        self.ttls = ttls
+        self._lock = threading.Lock()
+        self._writes = 0  # Number of writes made so far, to detect reads that overlap a write
+
+    @property
+    def name(self):
+        return self.backend.name
+
+    def _invalidate(self, collection, doc_id):
+        with self._lock:
+            self._writes += 1
+        self.cache.delete((collection, doc_id))
+
+    def get(self, collection, doc_id):
+        """
+        Reads a document, from the cache if it holds it (see FirestoreStorage.get).
+        """
+        ttl = self.ttls.get(collection)
+        if ttl is None:
+            return self.backend.get(collection, doc_id)
+
+        key = (collection, doc_id)
+        document = self.cache.get(key)
+        if document is None:
+            writes = self._writes
+            document = self.backend.get(collection, doc_id)
+            if document is None:
+                return None
+
+            # A write that finished while the document was being read may have changed it: it is not cached then
+            with self._lock:
+                if writes == self._writes:
+                    self.cache.set(key, document, ttl=ttl)
+
+        # Callers may modify what they get, the cached document is never handed out
+        return copy.deepcopy(document)
+
+    def where(self, collection, field, value):
+        """
+        Reads every document of a collection whose field is equal to a value (see FirestoreStorage.where).
+        """
+        return self.backend.where(collection, field, value)
+
+    def stream(self, collection, field, value, **options):
+        """
+        Iterates over the documents of a collection whose field is equal to a value (see FirestoreStorage.stream).
+        """
+        return self.backend.stream(collection, field, value, **options)
+
+    def add(self, collection, data):
+        """
+        Creates a document with a generated ID (see FirestoreStorage.add).
+        """
+        return self.backend.add(collection, data)
+
+    def set(self, collection, doc_id, data):
+        """
+        Creates or replaces a document (see FirestoreStorage.set).
+        """
+        try:
+            self.backend.set(collection, doc_id, data)
+        finally:
+            self._invalidate(collection, doc_id)
+
+    def update(self, collection, doc_id, data):
+        """
+        Updates some fields of an existing document (see FirestoreStorage.update).
+        """
+        try:
+            return self.backend.update(collection, doc_id, data)
+        finally:
+            self._invalidate(collection, doc_id)
+
+    def delete(self, collection, doc_id):
+        """
+        Deletes an existing document (see FirestoreStorage.delete).
+        """
+        try:
+            return self.backend.delete(collection, doc_id)
+        finally:
+            self._invalidate(collection, doc_id)
+
+    def delete_where(self, collection, field, value, **options):
+        """
+        Deletes every document of a collection whose field is equal to a value (see FirestoreStorage.delete_where).
+        """
+        for doc_ids in self.backend.delete_where(collection, field, value, **options):
+            for doc_id in doc_ids:
+                self._invalidate(collection, doc_id)
+            yield doc_ids
+
+    def run_transaction(self, function):
+        """
+        Runs a function in a transaction (see FirestoreStorage.run_transaction).
+        """
+        written = set()
+        try:
+            return self.backend.run_transaction(lambda transaction: function(_InvalidatingTransaction(transaction, written)))
+        finally:
+            for collection, doc_id in written:
+                self._invalidate(collection, doc_id)
+
+    def ping(self):
+        """
+        Opens the connection to the storage.
+        """
+        self.backend.ping()
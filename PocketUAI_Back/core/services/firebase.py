@@ -1,15 +1,66 @@
+import threading
 from django.conf import settings  # Import Django settings to access environment-specific configurations
-import firebase_admin  # Import Firebase Admin SDK to interact with Firebase services
-from firebase_admin import credentials, firestore, auth  # Import specific modules for credentials, Firestore DB, and authentication
 
-# Load Firebase credentials from the path defined in Django settings
-cred = credentials.Certificate(settings.FIREBASE_CREDENTIALS_PATH)
+_lock = threading.Lock()
+_app = None
 
-# Initialize the Firebase application with the given credentials
-firebase_admin.initialize_app(cred)
+def get_app():
+    """
+    Initializes the Firebase application on first use. The Firebase Admin SDK and the credentials are loaded here
+    instead of at import time, so the server can start without paying for them.
 
-# Create a Firestore client instance to interact with the Firestore database
-db = firestore.client()
+    Returns:
+    firebase_admin.App: The initialized Firebase application.
+    """
+    global _app
+    if _app is None:
+        with _lock:
+            if _app is None:
+                import firebase_admin  # Import Firebase Admin SDK to interact with Firebase services
+                from firebase_admin import credentials
 
-# Create an instance for Firebase Authentication to handle user authentication tasks
-firebase_auth = auth
+                # Load Firebase credentials from the path defined in Django settings
+                cred = credentials.Certificate(settings.FIREBASE_CREDENTIALS_PATH)
+
+                # Initialize the Firebase application with the given credentials
+                _app = firebase_admin.initialize_app(cred)
+    return _app
+
+def _create_db():
+    from firebase_admin import firestore
+    return firestore.client(get_app())
+
+def _load_auth():
+    from firebase_admin import auth
+    get_app()
+    return auth
+
+class LazyService:
+    """
+    Stand-in for a Firebase service that is created the first time one of its attributes is used,
+    e.g. `db.collection(...)` or `firebase_auth.verify_session_cookie(...)`.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._service = None
+        self._lock = threading.Lock()
+
+    def resolve(self):
+        """
+        Returns the underlying service, creating it if needed.
+        """
+        if self._service is None:
+            with self._lock:
+                if self._service is None:
+                    self._service = self._factory()
+        return self._service
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+# Firestore client instance to interact with the Firestore database
+db = LazyService(_create_db)
+
+# Firebase Authentication module to handle user authentication tasks
+firebase_auth = LazyService(_load_auth)
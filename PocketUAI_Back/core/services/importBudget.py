@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+
+# Code run in a fresh interpreter to time the startup of a worker: Django setup plus every view module
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+import django
+django.setup()
+import {module}
+print((time.perf_counter() - start) * 1000)
+"""
+
+def parse_importtime(output):
+    """
+    Adds up the import times reported by `python -X importtime` per top-level package.
+
+    Parameters:
+    output (str): The stderr of the interpreter, one "import time: self | cumulative | name" line per module.
+
+    Returns:
+    dict: Maps each top-level package (e.g. "django", "numpy", "core") to its import time in milliseconds.
+    """
+    packages = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Header line
+        package = fields[2].strip().split(".")[0]
+        packages[package] = packages.get(package, 0.0) + int(fields[0]) / 1000
+    return packages
+
+def measure_import_times(module="core.urls", settings_module=None):
+    """
+    Measures how long a new worker takes to set up Django and import a module, in a separate interpreter so the
+    modules already loaded in this process do not hide the cost.
+
+    Parameters:
+    module (str): Module imported after django.setup(). core.urls imports every view.
+    settings_module (str, optional): Settings module of the interpreter. Defaults to DJANGO_SETTINGS_MODULE.
+
+    Returns:
+    dict: A dictionary with the status and, if successful:
+        - "total_ms" (float): Wall time of the setup and the import.
+        - "packages" (list): (package, milliseconds) pairs, slowest first.
+
+    Possible error statuses:
+    - "import_error" if the interpreter fails to import the module.
+    """
+    env = dict(os.environ)
+    if settings_module:
+        env["DJANGO_SETTINGS_MODULE"] = settings_module
+
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT.format(module=module)],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    )
+    if process.returncode != 0:
+        return {"status": "import_error", "message": process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "Unknown error"}
+
+    packages = parse_importtime(process.stderr)
+    return {
+        "status": "successful",
+        "total_ms": float(process.stdout.strip().splitlines()[-1]),
+        "packages": sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    }
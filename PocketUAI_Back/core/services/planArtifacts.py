@@ -0,0 +1,343 @@
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+from core.services.aprioriRules import compile_rules
+from core.services.artifactBundle import export_bundle, load_bundle
+from core.services.decisionTree import compile_tree
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) # Gets the absolute path of the current file and sets BASE_DIR to its directory
+MODEL_PATH = os.path.join(BASE_DIR, "model.pkl")  # Path to the serialized machine learning model
+PLANS_PATH = os.path.join(BASE_DIR, "plans.json")  # Path to the JSON file containing base financial plans
+MINS_PATH = os.path.join(BASE_DIR, "mins.json")  # Path to the JSON file containing minimum expense requirements
+RULES_PATH = os.path.join(BASE_DIR, "association_rules_class.csv")  # Path to the CSV file containing association rules
+BUNDLE_PATH = os.path.join(BASE_DIR, "artifacts.npz")  # Path to the compiled bundle exported from the files above
+
+SOURCE_PATHS = (MODEL_PATH, RULES_PATH, PLANS_PATH, MINS_PATH)  # Files the bundle is exported from
+ARTIFACT_PATHS = SOURCE_PATHS + (BUNDLE_PATH,)  # Files watched by the registry for hot-swapping
+RELOAD_CHECK_INTERVAL = 5.0  # Minimum number of seconds between two checks of the artifact files on disk
+
+# Immutable set of artifacts shared by every request. Each field holds either the loaded artifact
+# (the decision tree and the Apriori rules already compiled) or the error dictionary returned by its loader, so a broken
+# file only disables the model that needs it.
+ArtifactBundle = namedtuple("ArtifactBundle", ["model", "rules", "plans", "minimums", "signature", "generation"])
+
+def check_for_error(result):
+    """
+    Checks whether the provided result indicates an error.
+
+    Parameters:
+    result (dict): A dictionary possibly containing a "status" key.
+
+    Returns:
+    dict or None: The result if an error status is found, otherwise None.
+    """
+    if isinstance(result, dict) and result.get("status") != "successful":
+        return result
+    return None
+
+def load_model():
+    """
+    Loads the machine learning model from the specified path.
+
+    Returns:
+    dict or object: The loaded model if successful, otherwise an error dictionary.
+
+    Possible error statuses:
+    - "load_error" if the file is missing, corrupted, or an unexpected error occurs.
+    """
+    try:
+        with open(MODEL_PATH, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return {"status": "load_error", "message": f"Model file '{MODEL_PATH}' not found"}
+    except pickle.UnpicklingError:
+        return {"status": "load_error", "message": "Error unpickling the model. The file may be corrupted"}
+    except Exception as e:
+        return {"status": "load_error", "message": f"An unexpected error occurred: {e}"}
+
+def load_rules():
+    """
+    Loads the association rules from a CSV file.
+
+    Returns:
+    pd.DataFrame or dict: The rules DataFrame if successful, otherwise an error dictionary.
+
+    Possible error statuses:
+    - "load_error" if the file is missing, empty, improperly formatted, or an unexpected error occurs.
+    """
+    try:
+        import pandas as pd  # Only needed when the rules are read from the CSV instead of the bundle
+    except ImportError:
+        return {"status": "load_error", "message": "pandas is required to read the rules file."}
+
+    try:
+        rules_df = pd.read_csv(RULES_PATH)
+        return rules_df
+    except FileNotFoundError:
+        return {"status": "load_error", "message": f"Rules file '{RULES_PATH}' not found."}
+    except pd.errors.EmptyDataError:
+        return {"status": "load_error", "message": "The rules file is empty."}
+    except pd.errors.ParserError:
+        return {"status": "load_error", "message": "Error parsing the rules file. Check the file format."}
+    except Exception as e:
+        return {"status": "load_error", "message": f"An unexpected error occurred: {e}"}
+
+def load_plans():
+    """
+    Loads the base financial plans from a JSON file.
+
+    Returns:
+    dict: A dictionary with the status and either the plans or an error message.
+
+    Possible error statuses:
+    - "load_error" if the file is missing, improperly formatted, or an unexpected error occurs.
+    """
+    try:
+        with open(PLANS_PATH, 'r') as file:
+            plans = json.load(file)
+        return {"status": "successful", "plans": plans}
+    except FileNotFoundError:
+        return {"status": "load_error", "message": f"Plans file '{PLANS_PATH}' not found"}
+    except json.JSONDecodeError:
+        return {"status": "load_error", "message": "Error reading the plans file"}
+    except Exception as e:
+        return {"status": "load_error", "message": f"An unexpected error occurred: {e}"}
+
+def load_minimums():
+    """
+    Loads the minimum expense requirements from a JSON file.
+
+    Returns:
+    dict: A dictionary with the status and either the minimums or an error message.
+
+    Possible error statuses:
+    - "load_error" if the file is missing, improperly formatted, or an unexpected error occurs.
+    """
+    try:
+        with open(MINS_PATH, mode='r') as file:
+            minimums = json.load(file)
+        return {"status": "successful", "minimums": minimums}
+    except FileNotFoundError:
+        return {"status": "load_error", "message": "Minimums file not found"}
+    except json.JSONDecodeError:
+        return {"status": "load_error", "message": "Error reading the minimums file"}
+    except Exception as e:
+        return {"status": "load_error", "message": f"An unexpected error occurred: {e}"}
+
+def read_signature(paths=ARTIFACT_PATHS):
+    """
+    Builds a cheap fingerprint of the artifact files from their modification time and size.
+
+    Parameters:
+    paths (tuple): Paths of the files to fingerprint.
+
+    Returns:
+    tuple: One (mtime_ns, size) pair per path, or None for files that do not exist.
+    """
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+def freeze_plans(plans):
+    """
+    Wraps the plan templates in read-only mappings so that they can be shared between requests.
+    Callers that need to modify a template must copy it first (e.g. with dict(template)).
+
+    Parameters:
+    plans (dict): Dictionary mapping plan names to their percentage allocations.
+
+    Returns:
+    MappingProxyType: A read-only view of the plans where every template is also read-only.
+    """
+    return MappingProxyType({name: MappingProxyType(dict(template)) for name, template in plans.items()})
+
+def load_sources():
+    """
+    Loads every artifact from its source file, compiling the decision tree and the Apriori rules.
+    Reading the model and the rules needs scikit-learn and pandas.
+
+    Returns:
+    tuple: The model, rules, plans and minimums. Artifacts that failed to load are their error dictionary.
+    """
+    plans = load_plans()
+    if not check_for_error(plans):
+        plans = freeze_plans(plans["plans"])
+
+    minimums = load_minimums()
+    if not check_for_error(minimums):
+        minimums = MappingProxyType(minimums["minimums"])
+
+    # The rules are parsed once here into bounds arrays instead of on every request
+    rules = load_rules()
+    if not check_for_error(rules):
+        rules = compile_rules(rules)
+
+    # The decision tree is reduced to its arrays so predictions do not go through scikit-learn and pandas
+    model = load_model()
+    if not check_for_error(model):
+        model = compile_tree(model)
+
+    return model, rules, plans, minimums
+
+def export_artifacts(path=BUNDLE_PATH):
+    """
+    Exports the source artifacts into the compiled bundle loaded at startup.
+
+    Parameters:
+    path (str): Path of the bundle to write.
+
+    Returns:
+    dict: A dictionary with the status and a message.
+
+    Possible error statuses:
+    - "load_error" if one of the source artifacts cannot be loaded.
+    - "export_error" if the bundle cannot be written.
+    """
+    model, rules, plans, minimums = load_sources()
+    for artifact in (model, rules, plans, minimums):
+        error = check_for_error(artifact)
+        if error:
+            return error
+
+    try:
+        export_bundle(path, model, rules, plans, minimums, SOURCE_PATHS)
+    except Exception as e:
+        return {"status": "export_error", "message": f"Error writing the bundle: {e}"}
+    return {"status": "successful", "message": f"Artifacts exported to '{path}'"}
+
+def build_bundle(generation=0):
+    """
+    Loads every artifact and packs them into an ArtifactBundle. The compiled bundle file is used when it is
+    present and matches the source files; otherwise the artifacts are loaded and compiled from the sources.
+
+    Parameters:
+    generation (int): Sequence number assigned to the new bundle.
+
+    Returns:
+    ArtifactBundle: The new bundle. Artifacts that failed to load are stored as their error dictionary.
+    """
+    # The signature is taken before reading so that a file modified while loading triggers another reload
+    signature = read_signature()
+
+    # The bundle is memory-mapped, so it neither imports scikit-learn and pandas nor copies the arrays per process
+    compiled = load_bundle(BUNDLE_PATH, SOURCE_PATHS)
+    if not check_for_error(compiled):
+        model, rules = compiled["model"], compiled["rules"]
+        plans = freeze_plans(compiled["plans"])
+        minimums = MappingProxyType(compiled["minimums"])
+    else:
+        if os.path.exists(BUNDLE_PATH):
+            logger.warning("Ignoring the artifact bundle: %s", compiled["message"])
+        model, rules, plans, minimums = load_sources()
+
+    return ArtifactBundle(
+        model=model,
+        rules=rules,
+        plans=plans,
+        minimums=minimums,
+        signature=signature,
+        generation=generation
+    )
+
+def bundle_errors(bundle):
+    """
+    Lists the artifacts of a bundle that failed to load.
+
+    Parameters:
+    bundle (ArtifactBundle): The bundle to inspect.
+
+    Returns:
+    list: The error dictionaries of the artifacts that could not be loaded.
+    """
+    return [artifact for artifact in (bundle.model, bundle.rules, bundle.plans, bundle.minimums) if check_for_error(artifact)]
+
+class ArtifactRegistry:
+    """
+    Process-wide holder of the artifacts used by the plan models.
+
+    The artifacts are loaded once (normally from CoreConfig.ready) and shared by every request. The files
+    are checked on disk at most every `check_interval` seconds; when they change a complete new bundle is
+    loaded on the side and swapped in with a single reference assignment, so requests always see either the
+    old or the new set of artifacts, never a mix. If the new files cannot be loaded the current bundle is kept,
+    and the broken files are not loaded again until they change.
+    """
+
+    def __init__(self, check_interval=RELOAD_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._bundle = None
+        self._last_check = 0.0
+        self._failed_signature = None  # Signature of the last files that could not replace the current bundle
+        self._lock = threading.Lock()
+
+    def preload(self):
+        """
+        Loads the artifacts if they have not been loaded yet.
+
+        Returns:
+        ArtifactBundle: The current bundle.
+        """
+        if self._bundle is None:
+            with self._lock:
+                if self._bundle is None:
+                    self._bundle = build_bundle()
+                    self._last_check = time.monotonic()
+        return self._bundle
+
+    def reload(self, force=False):
+        """
+        Reloads the artifacts from disk and swaps the current bundle if the files changed.
+
+        Parameters:
+        force (bool): Reload even if the files on disk look unchanged.
+
+        Returns:
+        ArtifactBundle: The bundle in use after the reload.
+        """
+        with self._lock:
+            self._last_check = time.monotonic()
+            current = self._bundle
+            if current is not None and not force and read_signature() in (current.signature, self._failed_signature):
+                return current
+
+            generation = current.generation + 1 if current is not None else 0
+            bundle = build_bundle(generation)
+
+            # Keep serving the previous artifacts if the new ones are broken (e.g. a file still being written)
+            if current is None or bundle_errors(current) or not bundle_errors(bundle):
+                self._bundle = bundle
+                self._failed_signature = None
+            else:
+                self._failed_signature = bundle.signature
+            return self._bundle
+
+    def get_bundle(self):
+        """
+        Returns the current bundle, checking first whether the files on disk have changed.
+
+        Returns:
+        ArtifactBundle: The artifacts to use for the current request.
+        """
+        bundle = self._bundle
+        if bundle is None:
+            return self.preload()
+        if time.monotonic() - self._last_check >= self.check_interval:
+            # Another request is already reloading: keep using the current bundle instead of waiting for it
+            if self._lock.locked():
+                return bundle
+            return self.reload()
+        return bundle
+
+# Shared registry used by the plan models
+registry = ArtifactRegistry()
@@ -0,0 +1,98 @@
+import copy
+import hashlib
+import json
+import threading
+from core.services.cache import LRUCache
+
+PLAN_CACHE_SIZE = 4096  # Maximum number of plan results kept in memory
+PLAN_CACHE_TTL = 600  # Seconds a plan result stays in the cache
+PLAN_CACHE_QUANTUM = None  # Round money amounts to this step before hashing (e.g. 10), None to only reuse identical inputs
+CACHEABLE_STATUSES = ("success", "calc_error")  # Only results that depend on the input alone are cached
+
+plan_cache = LRUCache(maxsize=PLAN_CACHE_SIZE, ttl=PLAN_CACHE_TTL)
+
+_generation_lock = threading.Lock()
+_cache_generation = None  # Generation of the artifact bundle the cached results were computed with
+
+def quantize(value, quantum=PLAN_CACHE_QUANTUM):
+    """
+    Normalizes a money amount for the cache key.
+
+    Parameters:
+    value (int, float or str): The amount.
+    quantum (float, optional): Step to round the amount to.
+
+    Returns:
+    float: The normalized amount.
+    """
+    value = float(value)
+    if quantum:
+        value = round(value / quantum) * quantum
+    return value
+
+def plan_cache_key(user_data, generation, quantum=PLAN_CACHE_QUANTUM):
+    """
+    Builds a canonical hash of the inputs that determine a plan: income, expenses (ordered by type), goal,
+    last_saving and duration. The goal name does not change the plan and is left out.
+
+    Parameters:
+    user_data (dict): The financial data provided by the user.
+    generation (int): Generation of the artifact bundle used to compute the plan.
+    quantum (float, optional): Step to round money amounts to.
+
+    Returns:
+    str or None: The key, or None if the input cannot be normalized (it is then not cached).
+    """
+    try:
+        expenses = sorted(
+            ((str(expense["type"]), quantize(expense.get("expense", 0), quantum)) for expense in user_data["expenses"]),
+            key=lambda expense: expense[0]
+        )
+        canonical = [
+            generation,
+            quantize(user_data["income"], quantum),
+            expenses,
+            quantize(user_data["goal"], quantum),
+            quantize(user_data["last_saving"], quantum),
+            float(user_data["duration"])
+        ]
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+
+    return hashlib.sha256(json.dumps(canonical).encode()).hexdigest()
+
+def lookup_plan(user_data, generation):
+    """
+    Looks up the cached plan for a user's input. Results computed with another artifact bundle are dropped.
+
+    Parameters:
+    user_data (dict): The financial data provided by the user.
+    generation (int): Generation of the artifact bundle in use.
+
+    Returns:
+    tuple: The cache key (None if the input cannot be cached) and a copy of the cached result (None on a miss).
+    """
+    global _cache_generation
+    if generation != _cache_generation:
+        with _generation_lock:
+            if generation != _cache_generation:
+                plan_cache.clear()
+                _cache_generation = generation
+
+    key = plan_cache_key(user_data, generation)
+    if key is None:
+        return None, None
+
+    cached = plan_cache.get(key)
+    return key, copy.deepcopy(cached) if cached is not None else None
+
+def store_plan(key, result):
+    """
+    Stores the result of a plan in the cache if it can be reused.
+
+    Parameters:
+    key (str or None): Key returned by lookup_plan.
+    result (dict): Result of the plan creation.
+    """
+    if key is not None and result.get("status") in CACHEABLE_STATUSES:
+        plan_cache.set(key, copy.deepcopy(result))
@@ -1,113 +1,11 @@
-import json
-import pickle
-from datetime import datetime
-import pandas as pd
-from sklearn.tree import DecisionTreeClassifier 
-import os
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__)) # Gets the absolute path of the current file and sets BASE_DIR to its directory
-MODEL_PATH = os.path.join(BASE_DIR, "model.pkl")  # Path to the serialized machine learning model
-PLANS_PATH = os.path.join(BASE_DIR, "plans.json")  # Path to the JSON file containing base financial plans
-MINS_PATH = os.path.join(BASE_DIR, "mins.json")  # Path to the JSON file containing minimum expense requirements
-RULES_PATH = os.path.join(BASE_DIR, "association_rules_class.csv")  # Path to the CSV file containing association rules
-
-def check_for_error(result):
-    """
-    Checks whether the provided result indicates an error.
-    
-    Parameters:
-    result (dict): A dictionary possibly containing a "status" key.
-    
-    Returns:
-    dict or None: The result if an error status is found, otherwise None.
-    """
-    if isinstance(result, dict) and result.get("status") != "successful":
-        return result
-    return None
-
-def load_model():
-    """
-    Loads the machine learning model from the specified path.
-    
-    Returns:
-    dict or object: The loaded model if successful, otherwise an error dictionary.
-    
-    Possible error statuses:
-    - "load_error" if the file is missing, corrupted, or an unexpected error occurs.
-    """
-    try:
-        with open(MODEL_PATH, 'rb') as f:
-            return pickle.load(f)
-    except FileNotFoundError:
-        return {"status": "load_error", "message": f"Model file '{MODEL_PATH}' not found"}
-    except pickle.UnpicklingError:
-        return {"status": "load_error", "message": "Error unpickling the model. The file may be corrupted"}
-    except Exception as e:
-        return {"status": "load_error", "message": f"An unexpected error occurred: {e}"}
-
-def load_rules():
-    """
-    Loads the association rules from a CSV file.
-    
-    Returns:
-    pd.DataFrame or dict: The rules DataFrame if successful, otherwise an error dictionary.
-    
-    Possible error statuses:
-    - "load_error" if the file is missing, empty, improperly formatted, or an unexpected error occurs.
-    """
-    try:
-        rules_df = pd.read_csv(RULES_PATH)
-        return rules_df
-    except FileNotFoundError:
-        return {"status": "load_error", "message": f"Rules file '{RULES_PATH}' not found."}
-    except pd.errors.EmptyDataError:
-        return {"status": "load_error", "message": "The rules file is empty."}
-    except pd.errors.ParserError:
-        return {"status": "load_error", "message": "Error parsing the rules file. Check the file format."}
-    except Exception as e:
-        return {"status": "load_error", "message": f"An unexpected error occurred: {e}"}
+from core.services.planArtifacts import check_for_error, registry  # Artifact loading is shared through the process-wide registry
+from core.services.aprioriRules import CompiledRules, build_feature_matrix, compile_rules, match_rules
+from core.services.decisionTree import CompiledTree, compile_tree, predict_tree
+from core.services.planSolver import adjust_and_verify_plans, plans_to_matrix, solver_result_to_dict
+from core.services.planCache import lookup_plan, store_plan
+from core.services.timing import timed
 
-def load_plans():
-    """
-    Loads the base financial plans from a JSON file.
-    
-    Returns:
-    dict: A dictionary with the status and either the plans or an error message.
-    
-    Possible error statuses:
-    - "load_error" if the file is missing, improperly formatted, or an unexpected error occurs.
-    """
-    try:
-        with open(PLANS_PATH, 'r') as file:
-            plans = json.load(file)  
-        return {"status": "successful", "plans": plans}
-    except FileNotFoundError:
-        return {"status": "load_error", "message": f"Plans file '{PLANS_PATH}' not found"}
-    except json.JSONDecodeError:
-        return {"status": "load_error", "message": "Error reading the plans file"}
-    except Exception as e:
-        return {"status": "load_error", "message": f"An unexpected error occurred: {e}"}
-
-def load_minimums():
-    """
-    Loads the minimum expense requirements from a JSON file.
-    
-    Returns:
-    dict: A dictionary with the status and either the minimums or an error message.
-    
-    Possible error statuses:
-    - "load_error" if the file is missing, improperly formatted, or an unexpected error occurs.
-    """
-    try:
-        with open(MINS_PATH, mode='r') as file:
-            minimums = json.load(file)
-        return {"status": "successful", "minimums": minimums}
-    except FileNotFoundError:
-        return {"status": "load_error", "message": "Minimums file not found"}
-    except json.JSONDecodeError:
-        return {"status": "load_error", "message": "Error reading the minimums file"}
-    except Exception as e:
-        return {"status": "load_error", "message": f"An unexpected error occurred: {e}"}
+DT_FEATURE_ORDER = ["housing", "food", "transportation", "income", "non-essential", "health", "university"]  # Column order the decision tree was trained with
 
 def process_transactions(user_data):
     """
@@ -173,19 +71,51 @@ def process_goals(user_data):
     }
     return response
 
-def classify_data_dt(user_data, model):
+def prepare_plan_input(user_data):
     """
-    Classifies financial data using a decision tree model.
+    Validates and prepares the user's transactions and goal once, so that they can be shared by every plan strategy.
+    
+    Parameters:
+    user_data (dict): Dictionary containing the user's financial data and goal.
+        Required keys: 'income' (float), 'last_saving' (float), 'expenses' (list of dicts),
+        'goal' (float), 'duration' (int), 'goal_name' (str).
+        
+    Returns:
+    dict: 
+        If successful, returns a dictionary with status 'successful' and the prepared data of both
+        process_transactions and process_goals.
+        Otherwise, returns the error of the first step that failed.
+    """
+    # Process the user's transaction data (income, expenses, savings)
+    transactions_result = process_transactions(user_data)
+    error = check_for_error(transactions_result)
+    if error:
+        return error
+
+    # Process the user's goal (financial target and duration)
+    goals_result = process_goals(user_data)
+    error = check_for_error(goals_result)
+    if error:
+        return error
+
+    return {
+        "status": "successful",
+        "prepared_data": {**transactions_result["prepared_data"], **goals_result["prepared_data"]}
+    }
+
+def extract_dt_features(user_data, features):
+    """
+    Builds the feature vector used by the decision tree from the user's income and expenses.
     
     Parameters:
     user_data (dict): Dictionary containing financial data.
         Required keys: 'income' (float), 'expenses' (list of dicts).
-    model (object): Trained decision tree model.
+    features (list): Feature names in the order the tree was trained with.
     
     Returns:
     dict:
-        If successful, returns a dictionary with status 'successful' and the classification prediction.
-        If data is incomplete or an error occurs during prediction, returns a dictionary with an appropriate error status.
+        If successful, returns a dictionary with status 'successful' and the feature vector.
+        If data is incomplete, returns a dictionary with status 'load_error'.
     """
     income = user_data.get('income')
     expenses = user_data.get('expenses')
@@ -193,19 +123,44 @@ def classify_data_dt(user_data, model):
     if income is None or not isinstance(expenses, list):
         return {"status": "load_error", "message": "Invalid data: 'income' must be provided and 'expenses' must be a list"}
 
-    expected_order = ["housing", "food", "transportation", "income", "non-essential", "health", "university"]
+    values = {"income": income}
+    for expense in expenses:
+        if isinstance(expense, dict):
+            values[expense.get('type', 0).lower().replace(" ", "_")] = expense.get('expense', 0)
+
+    missing_features = [feature for feature in features if feature not in values]
+    if missing_features:
+        return {"status": "load_error", "message": f"Invalid data: missing features {', '.join(missing_features)}"}
+
+    return {"status": "successful", "features": [values[feature] for feature in features]}
+
+def classify_data_dt(user_data, model):
+    """
+    Classifies financial data using a decision tree model.
     
-    # Extracting features from the expenses list
-    features = [income] + [expense.get('expense', 0) for expense in expenses if isinstance(expense, dict)]
-    feature_names = ["income"] + [expense.get('type', 0).lower().replace(" ", "_") 
-                                   for i, expense in enumerate(expenses) if isinstance(expense, dict)]
+    Parameters:
+    user_data (dict): Dictionary containing financial data.
+        Required keys: 'income' (float), 'expenses' (list of dicts).
+    model (CompiledTree or object): Compiled decision tree, or a trained DecisionTreeClassifier that is compiled on the fly.
     
-    # Create a DataFrame and reorder the columns based on expected order
-    features_df = pd.DataFrame([features], columns=feature_names)
-    features_df = features_df[expected_order]
+    Returns:
+    dict:
+        If successful, returns a dictionary with status 'successful' and the classification prediction.
+        If data is incomplete or an error occurs during prediction, returns a dictionary with an appropriate error status.
+    """
+    compiled = model if isinstance(model, CompiledTree) else compile_tree(model, DT_FEATURE_ORDER)
+    error = check_for_error(compiled)
+    if error:
+        return error
+
+    features_result = extract_dt_features(user_data, compiled.features)
+    error = check_for_error(features_result)
+    if error:
+        return error
 
+    # Walk the tree directly on the feature vector, without building a DataFrame
     try:
-        prediction = model.predict(features_df)
+        prediction = predict_tree(compiled, features_result["features"])
     except Exception as e:
         return {"status": "exe_error", "message": f"Error during classification: {e}"}
 
@@ -218,7 +173,8 @@ def classify_data_apriori(user_data, rules_df):
     Parameters:
     user_data (dict): Dictionary containing financial data.
         Required keys: 'income' (float), 'expenses' (list of dicts).
-    rules_df (DataFrame): DataFrame containing Apriori rules with columns 'LeftHand' and 'RightHand'.
+    rules_df (CompiledRules or DataFrame): Compiled Apriori rules, or a DataFrame with columns 'LeftHand'
+        and 'RightHand' that is compiled on the fly.
     
     Returns:
     dict:
@@ -232,43 +188,102 @@ def classify_data_apriori(user_data, rules_df):
     if income is None or not isinstance(expenses, list):
         return {"status": "load_error", "message": "Invalid data: 'income' must be provided and 'expenses' must be a list"}
 
-    # Extract features and feature names from user data
-    features = [income] + [expense.get('expense', 0) for expense in expenses if isinstance(expense, dict)]
-    feature_names = ["income"] + [expense.get('type', 0).lower().replace(" ", "_") 
-                                  for expense in expenses if isinstance(expense, dict)]
-    features_df = pd.DataFrame([features], columns=feature_names)
-
-    class_counts = {}
-
-    # Iterating through the rules to classify user data
-    for _, row in rules_df.iterrows():
-        clase = row["LeftHand"].split(" / ")[1].strip("',()")
-        right_items = row["RightHand"].strip("()").split(", ")
-        all_match = True
-
-        # Matching user features against the rule conditions
-        for item in right_items:
-            if "/" in item:
-                feature_range = item.strip("''").split("/")
-                if len(feature_range) == 2:
-                    feature = feature_range[0].strip()
-                    min_val, max_val = map(float, feature_range[1].split("-"))
-
-                    if feature in features_df.columns:
-                        user_value = features_df.at[0, feature]
-                        if not (min_val <= user_value <= max_val):
-                            all_match = False
-
-        if all_match:
-            class_counts[clase] = class_counts.get(clase, 0) + 1  
-
-    if class_counts:
-        max_class = max(class_counts, key=class_counts.get)
-        return {"status": "successful", "prediction": [max_class]}
+    compiled = rules_df if isinstance(rules_df, CompiledRules) else compile_rules(rules_df)
+    error = check_for_error(compiled)
+    if error:
+        return error
+
+    # Match the user against every rule in a single vectorized pass
+    features = build_feature_matrix([user_data], compiled.features)
+    prediction = match_rules(features, compiled)[0]
+
+    if prediction >= 0:
+        return {"status": "successful", "prediction": [compiled.classes[prediction]]}
     else:
         return {"status": "calc_error", "message": "No matching class found."}
 
-def assign_plan(user_data, plans, model=None, rules=None, class_model="dt"):
+def classify_batch_dt(users, model):
+    """
+    Classifies the financial data of many users with a single walk of the decision tree.
+    
+    Parameters:
+    users (list): List of dictionaries containing financial data.
+        Required keys: 'income' (float), 'expenses' (list of dicts).
+    model (CompiledTree or object): Compiled decision tree, or a trained DecisionTreeClassifier that is compiled on the fly.
+    
+    Returns:
+    list: One classification result per user, in the same format as classify_data_dt.
+    """
+    compiled = model if isinstance(model, CompiledTree) else compile_tree(model, DT_FEATURE_ORDER)
+    error = check_for_error(compiled)
+    if error:
+        return [error] * len(users)
+
+    results = [None] * len(users)
+    rows = []
+    positions = []
+
+    for i, user_data in enumerate(users):
+        features_result = extract_dt_features(user_data, compiled.features)
+        if check_for_error(features_result):
+            results[i] = features_result
+        else:
+            rows.append(features_result["features"])
+            positions.append(i)
+
+    if not rows:
+        return results
+
+    # A single feature matrix and a single prediction for the whole batch
+    try:
+        predictions = predict_tree(compiled, rows)
+    except Exception as e:
+        error = {"status": "exe_error", "message": f"Error during classification: {e}"}
+        for i in positions:
+            results[i] = error
+        return results
+
+    for i, prediction in zip(positions, predictions.tolist()):
+        results[i] = {"status": "successful", "prediction": [prediction]}
+    return results
+
+def classify_batch_apriori(users, rules_df):
+    """
+    Classifies the financial data of many users with a single vectorized pass over the Apriori rules.
+    
+    Parameters:
+    users (list): List of dictionaries containing financial data.
+        Required keys: 'income' (float), 'expenses' (list of dicts).
+    rules_df (CompiledRules or DataFrame): Compiled Apriori rules, or a DataFrame that is compiled on the fly.
+    
+    Returns:
+    list: One classification result per user, in the same format as classify_data_apriori.
+    """
+    compiled = rules_df if isinstance(rules_df, CompiledRules) else compile_rules(rules_df)
+    error = check_for_error(compiled)
+    if error:
+        return [error] * len(users)
+
+    results = [None] * len(users)
+    positions = []
+
+    for i, user_data in enumerate(users):
+        if user_data.get('income') is None or not isinstance(user_data.get('expenses'), list):
+            results[i] = {"status": "load_error", "message": "Invalid data: 'income' must be provided and 'expenses' must be a list"}
+        else:
+            positions.append(i)
+
+    features = build_feature_matrix([users[i] for i in positions], compiled.features)
+    predictions = match_rules(features, compiled)
+
+    for i, prediction in zip(positions, predictions.tolist()):
+        if prediction >= 0:
+            results[i] = {"status": "successful", "prediction": [compiled.classes[prediction]]}
+        else:
+            results[i] = {"status": "calc_error", "message": "No matching class found."}
+    return results
+
+def assign_plan(user_data, plans, model=None, rules=None, class_model="dt", classification_result=None):
     """
     Assigns a financial plan based on the user's financial data and classification results.
     
@@ -276,16 +291,22 @@ def assign_plan(user_data, plans, model=None, rules=None, class_model="dt"):
     user_data (dict): Dictionary containing financial data.
         Required keys: 'income' (float), 'expenses' (list of dicts).
     plans (dict): Dictionary mapping plan names to plan details.
-    model (object, optional): Trained decision tree model (required if class_model is 'dt').
-    rules (DataFrame, optional): DataFrame containing Apriori rules (required if class_model is 'apriori').
+    model (CompiledTree or object, optional): Decision tree model (required if class_model is 'dt').
+    rules (CompiledRules or DataFrame, optional): Apriori rules (required if class_model is 'apriori').
     class_model (str): The classification model to use ('dt' for Decision Tree, 'apriori' for Apriori).
+    classification_result (dict, optional): Result of a classification already made for this user (e.g. in a batch).
+        When given, the model and rules are not used.
     
     Returns:
     dict:
         If successful, returns a dictionary with status 'successful' and the assigned plan.
         If an error occurs during classification or plan selection, returns an appropriate error status.
     """
-    if class_model == "dt":
+    if classification_result is not None:
+        # The user was already classified, only the plan has to be picked
+        pass
+
+    elif class_model == "dt":
         if model is None:
             return {"status": "load_error", "message": "Decision tree model not provided."}
         classification_result = classify_data_dt(user_data, model)
@@ -311,7 +332,8 @@ def assign_plan(user_data, plans, model=None, rules=None, class_model="dt"):
     assigned_plan = f"{prediction[0]}A" if ispayingHousing else f"{prediction[0]}B"
     
     try:
-        selected_plan = plans[assigned_plan]        
+        # Plan templates are shared read-only mappings, so the caller gets its own copy to adjust
+        selected_plan = dict(plans[assigned_plan])
     except (IndexError, TypeError):
         return {"status": "exe_error", "message": "Plan index out of range or invalid"}
 
@@ -520,7 +542,8 @@ def adjust_and_verify_plan(plan, income, savings_goal, max_months, minimums):
     isvalid, results = check_expenses(plan, income, isForeign, minimums)
 
     if not isvalid:
-        redistribution_result = redistribute_to_meet_minimums(plan, income, minimums, adjustable_fields, isForeign)
+        with timed("redistribution"):
+            redistribution_result = redistribute_to_meet_minimums(plan, income, minimums, adjustable_fields, isForeign)
         isvalid, results = check_expenses(plan, income, isForeign, minimums)
         if  redistribution_result["status"] == "calc_error":
             return {
@@ -540,30 +563,33 @@ def adjust_and_verify_plan(plan, income, savings_goal, max_months, minimums):
 
     return savings_check
 
-# dt = decission tree, apriori = Apriori Algorithm
-def manage_plan(user_data, class_model):
+def assign_user_plan(user_data, class_model, bundle, classification_result=None, prepared_input=None):
     """
-    Manages the generation of a financial plan based on the user's data and chosen classification model (decision tree or Apriori).
+    Runs the steps of manage_plan that come before the plan adjustment: checks the artifacts, prepares the
+    user's input and assigns the base plan with the chosen classification model.
 
     Parameters:
     user_data (dict): The financial data provided by the user, including income, expenses, goals, etc.
-    class_model (str): A string indicating the classification model to use for plan generation. 
-                        Can be either "dt" (decision tree) or "apriori" (Apriori algorithm).
+    class_model (str): "dt" (decision tree) or "apriori" (Apriori algorithm).
+    bundle (ArtifactBundle): Artifacts to use.
+    classification_result (dict, optional): Classification already computed for this user with `class_model`.
+    prepared_input (dict, optional): Result of prepare_plan_input for this user, to avoid preparing it again.
 
     Returns:
-    dict: A dictionary containing the status of the plan creation process, including a message and the final plan if successful.
-          If any errors occur during the process, an error message is returned instead.
+    dict:
+        If successful, returns a dictionary with status 'successful', the assigned plan (a copy that can be modified),
+        the income, the goal reduced by the previous savings and the duration.
+        Otherwise, returns the error of the first step that failed.
     """
-    
-    # Load the appropriate model based on the user's choice (Decision Tree or Apriori)
+    # Get the appropriate model based on the user's choice (Decision Tree or Apriori)
     if class_model == "dt":
-        model = load_model()
+        model = bundle.model
         error = check_for_error(model)
         if error:
             return error
 
     elif class_model == "apriori":
-        rules = load_rules()
+        rules = bundle.rules
         error = check_for_error(rules)
         if error:
             return error
@@ -571,39 +597,29 @@ def manage_plan(user_data, class_model):
     else:
         return {"status": "load_error", "message": "The class_model parameter must be 'dt' or 'apriori'."}
 
-    # Load the list of available financial plans
-    plans = load_plans()
+    # Get the list of available financial plans
+    plans = bundle.plans
     error = check_for_error(plans)
     if error:
         return error
-    plans = plans.get("plans")
 
-    # Load the minimum financial thresholds required for basic living
-    minimums = load_minimums()
+    # Get the minimum financial thresholds required for basic living
+    minimums = bundle.minimums
     error = check_for_error(minimums)
     if error:
         return error
-    minimums = minimums.get("minimums")
 
-    # Process the user's transaction data (income, expenses, savings)
-    transactions_result = process_transactions(user_data)
-    error = check_for_error(transactions_result)
+    # Validate and prepare the user's transactions and goal, unless it was already done by the caller
+    if prepared_input is None:
+        prepared_input = prepare_plan_input(user_data)
+    error = check_for_error(prepared_input)
     if error:
         return error
 
-    income = transactions_result["prepared_data"]["income"]
-    expenses = transactions_result["prepared_data"]["expenses"]
-    last_saving = transactions_result["prepared_data"]["last_saving"]
-
-    # Process the user's goal (financial target and duration)
-    goals_result = process_goals(user_data)
-    error = check_for_error(goals_result)
-    if error:
-        return error
-
-    goal = goals_result["prepared_data"]["goal"]
-    duration = goals_result["prepared_data"]["duration"]
-    goal_name = goals_result["prepared_data"]["goal_name"]
+    income = prepared_input["prepared_data"]["income"]
+    last_saving = prepared_input["prepared_data"]["last_saving"]
+    goal = prepared_input["prepared_data"]["goal"]
+    duration = prepared_input["prepared_data"]["duration"]
 
     # Adjust the goal based on any previous savings
     goal = goal - last_saving
@@ -611,25 +627,41 @@ def manage_plan(user_data, class_model):
     # Assign a financial plan based on the user's data and the selected classification model
     plan_result = assign_plan(user_data, plans, model=model if class_model == "dt" else None, 
                           rules=rules if class_model == "apriori" else None, 
-                          class_model=class_model)
+                          class_model=class_model,
+                          classification_result=classification_result)
     error = check_for_error(plan_result)
     if error:
         return error
 
-    assigned_plan = plan_result.get("assigned_plan")
+    return {
+        "status": "successful",
+        "assigned_plan": plan_result.get("assigned_plan"),
+        "income": income,
+        "goal": goal,
+        "duration": duration
+    }
 
-    # Adjust the assigned plan and verify it meets the user's financial goal and constraints
-    adjusted_plan_result = adjust_and_verify_plan(
-        assigned_plan,
-        income,
-        goal,
-        duration,
-        minimums
-    )
+def format_plan_result(adjusted_plan_result):
+    """
+    Builds the response of manage_plan from the result of the plan adjustment.
+
+    Parameters:
+    adjusted_plan_result (dict): Result of adjust_and_verify_plan (or solver_result_to_dict).
+
+    Returns:
+    dict: The error if the adjustment failed or gave no plan, otherwise the successfully generated plan.
+    """
     error = check_for_error(adjusted_plan_result)
     if error:
         return error
 
+    # The goal can be reached but the plan does not meet the minimum expenses: there is no plan to return
+    if adjusted_plan_result.get("plan") is None:
+        return {
+            "status": "calc_error",
+            "message": "Cannot adjust the plan to meet minimum expenses."
+        }
+
     # Return the successfully generated plan along with additional details such as actual duration and differences
     return {
         "status": "success",
@@ -639,6 +671,190 @@ def manage_plan(user_data, class_model):
         "diff": adjusted_plan_result.get("diff")
     }
 
+# dt = decission tree, apriori = Apriori Algorithm
+def manage_plan(user_data, class_model, bundle=None, classification_result=None, prepared_input=None):
+    """
+    Manages the generation of a financial plan based on the user's data and chosen classification model (decision tree or Apriori).
+
+    Parameters:
+    user_data (dict): The financial data provided by the user, including income, expenses, goals, etc.
+    class_model (str): A string indicating the classification model to use for plan generation. 
+                        Can be either "dt" (decision tree) or "apriori" (Apriori algorithm).
+    bundle (ArtifactBundle, optional): Artifacts to use. Defaults to the current bundle of the shared registry.
+    classification_result (dict, optional): Classification already computed for this user with `class_model`.
+    prepared_input (dict, optional): Result of prepare_plan_input for this user, to avoid preparing it again.
+
+    Returns:
+    dict: A dictionary containing the status of the plan creation process, including a message and the final plan if successful.
+          If any errors occur during the process, an error message is returned instead.
+    """
+    if bundle is None:
+        with timed("artifact_load"):
+            bundle = registry.get_bundle()
+
+    # Check the artifacts, prepare the input and assign the base plan
+    assigned_result = assign_user_plan(user_data, class_model, bundle, classification_result, prepared_input)
+    error = check_for_error(assigned_result)
+    if error:
+        return error
+
+    # Adjust the assigned plan and verify it meets the user's financial goal and constraints
+    with timed("adjustment"):
+        adjusted_plan_result = adjust_and_verify_plan(
+            assigned_result["assigned_plan"],
+            assigned_result["income"],
+            assigned_result["goal"],
+            assigned_result["duration"],
+            bundle.minimums
+        )
+
+    return format_plan_result(adjusted_plan_result)
+
+def select_plan(dt_plan, apriori_plan):
+    """
+    Picks the plan to return to the user between the Decision Tree and the Apriori results.
+
+    The plan with the shorter duration wins; on a tie, or when only the Decision Tree plan is successful, the
+    Decision Tree plan is returned. A successful plan without a duration loses against one with a duration.
+    If both plans failed, the Decision Tree plan is returned by default.
+
+    Parameters:
+    dt_plan (dict): Result of manage_plan with the Decision Tree model.
+    apriori_plan (dict): Result of manage_plan with the Apriori rules.
+
+    Returns:
+    dict: The selected plan result.
+    """
+    # If both plans are successful, compare their durations and return the one with the shorter duration
+    if dt_plan["status"] == "success" and apriori_plan["status"] == "success":
+        dt_duration = dt_plan["actual_duration"]
+        apriori_duration = apriori_plan["actual_duration"]
+
+        # A plan without a duration cannot be compared, the other one is preferred
+        if apriori_duration is None or (dt_duration is not None and dt_duration <= apriori_duration):
+            return dt_plan
+        else:
+            return apriori_plan
+    
+    # If only the Decision Tree plan is successful, return it
+    elif dt_plan["status"] == "success":
+        return dt_plan
+    
+    # If only the Apriori plan is successful, return it
+    elif apriori_plan["status"] == "success":
+        return apriori_plan
+    
+    # If both plans failed, return the Decision Tree plan by default
+    else:
+        return dt_plan
+
+def max_savings_percentage(plan, minimums):
+    """
+    Computes an upper bound of the savings percentage that adjust_and_verify_plan can reach for a plan.
+
+    The adjustment moves at most half of each adjustable field ("non-essential", "health" and "transportation")
+    to savings, and the redistribution to meet minimums never touches savings.
+
+    Parameters:
+    plan (dict): Percentage allocations of the plan before any adjustment.
+    minimums (dict): A dictionary with the minimum expense amounts for essential categories.
+
+    Returns:
+    float or None: The bound, or None if it cannot be guaranteed for this plan.
+    """
+    adjustable_fields = ["non-essential", "health", "transportation"]
+    if "savings" in minimums or any(field not in plan for field in adjustable_fields + ["savings"]):
+        return None
+
+    return plan["savings"] + sum(plan[field] / 2 for field in adjustable_fields)
+
+def can_skip_apriori(user_data, dt_plan, dt_result, apriori_result, prepared_input, bundle):
+    """
+    Checks whether the Apriori plan can be skipped because it cannot be selected over the Decision Tree plan.
+
+    This is the case when both models predict the same class (the plans would be identical and the Decision
+    Tree wins ties), or when even the most favourable adjustment of the Apriori plan cannot reach the goal
+    in fewer months than the Decision Tree plan.
+
+    Parameters:
+    user_data (dict): The financial data provided by the user.
+    dt_plan (dict): Result of manage_plan with the Decision Tree model.
+    dt_result (dict): Classification result of the Decision Tree model.
+    apriori_result (dict): Classification result of the Apriori rules.
+    prepared_input (dict): Result of prepare_plan_input for this user.
+    bundle (ArtifactBundle): Artifacts used for both plans.
+
+    Returns:
+    bool: True if create_plan would return the Decision Tree plan whatever the Apriori result is.
+    """
+    if check_for_error(dt_result) or check_for_error(apriori_result) or check_for_error(prepared_input):
+        return False
+
+    # A successful plan without a duration cannot be compared, leave it to select_plan
+    dt_duration = dt_plan.get("actual_duration")
+    if dt_plan["status"] == "success" and dt_duration is None:
+        return False
+
+    # Same class, same plan template: the Apriori plan would be a copy of the Decision Tree one
+    if str(dt_result["prediction"][0]) == str(apriori_result["prediction"][0]):
+        return True
+
+    if dt_plan["status"] != "success":
+        return False
+
+    apriori_plan = assign_plan(user_data, bundle.plans, classification_result=apriori_result)
+    if check_for_error(apriori_plan):
+        return False
+
+    income = prepared_input["prepared_data"]["income"]
+    goal = prepared_input["prepared_data"]["goal"] - prepared_input["prepared_data"]["last_saving"]
+    max_savings = max_savings_percentage(apriori_plan["assigned_plan"], bundle.minimums)
+    if max_savings is None or income <= 0 or goal < 0:
+        return False
+
+    # The margin covers the rounding of the step-by-step adjustment
+    max_monthly_savings = max_savings * (1 + 1e-9) / 100 * income
+    if max_monthly_savings <= 0:
+        return True
+    return int(goal / max_monthly_savings) >= dt_duration
+
+def generate_plan(user_data, bundle):
+    """
+    Generates the plan returned by create_plan with the given artifacts, without going through the plan cache.
+
+    The user's input is validated and prepared once for both approaches, and the Apriori plan is not built when
+    it cannot be selected anyway (see `can_skip_apriori`).
+
+    Parameters:
+    user_data (dict): The financial data provided by the user, which is used to generate the plans.
+    bundle (ArtifactBundle): Artifacts to use.
+
+    Returns:
+    dict: The selected plan result (see select_plan).
+    """
+    with timed("input_prep"):
+        prepared_input = prepare_plan_input(user_data)
+
+    # Classify the user with both approaches over the same artifacts
+    dt_result = None
+    apriori_result = None
+    if not check_for_error(prepared_input):
+        if not check_for_error(bundle.model):
+            with timed("dt_classification"):
+                dt_result = classify_data_dt(user_data, bundle.model)
+        if not check_for_error(bundle.rules):
+            with timed("apriori_classification"):
+                apriori_result = classify_data_apriori(user_data, bundle.rules)
+
+    dt_plan = manage_plan(user_data, "dt", bundle, dt_result, prepared_input)
+    if dt_result is not None and apriori_result is not None and \
+            can_skip_apriori(user_data, dt_plan, dt_result, apriori_result, prepared_input, bundle):
+        return dt_plan
+
+    apriori_plan = manage_plan(user_data, "apriori", bundle, apriori_result, prepared_input)
+    
+    return select_plan(dt_plan, apriori_plan)
+
 def create_plan(user_data):
     """
     Creates a financial plan for the user by comparing two different approaches: Decision Tree (DT) and Apriori algorithm.
@@ -647,6 +863,9 @@ def create_plan(user_data):
     It compares the durations of the two plans and returns the one with the shorter duration. If both plans have the same duration, 
     the Decision Tree plan is returned by default. If any of the plans are unsuccessful, the function returns the successful plan or defaults to the Decision Tree plan.
 
+    Results are memoized in the plan cache (see planCache), keyed on the normalized input and the artifact
+    bundle, so repeated requests skip the classification and the adjustment.
+
     Parameters:
     user_data (dict): The financial data provided by the user, which is used to generate the plans.
 
@@ -655,31 +874,18 @@ def create_plan(user_data):
           If an error occurs during the process, the function returns an error message.
     """
     try:
-        # Generate plans using both the Decision Tree (DT) and Apriori approaches
-        dt_plan = manage_plan(user_data, "dt")
-        apriori_plan = manage_plan(user_data, "apriori")
-        
-        # If both plans are successful, compare their durations and return the one with the shorter duration
-        if dt_plan["status"] == "success" and apriori_plan["status"] == "success":
-            dt_duration = dt_plan["actual_duration"]
-            apriori_duration = apriori_plan["actual_duration"]
+        with timed("artifact_load"):
+            bundle = registry.get_bundle()
 
-            if dt_duration <= apriori_duration:
-                return dt_plan
-            else:
-                return apriori_plan
-        
-        # If only the Decision Tree plan is successful, return it
-        elif dt_plan["status"] == "success":
-            return dt_plan
-        
-        # If only the Apriori plan is successful, return it
-        elif apriori_plan["status"] == "success":
-            return apriori_plan
-        
-        # If both plans failed, return the Decision Tree plan by default
-        else:
-            return dt_plan
+        # Reuse the result of an identical request made with the same artifacts
+        with timed("cache_lookup"):
+            key, cached_plan = lookup_plan(user_data, bundle.generation)
+        if cached_plan is not None:
+            return cached_plan
+
+        plan = generate_plan(user_data, bundle)
+        store_plan(key, plan)
+        return plan
 
     except Exception as e:
         # If an error occurs during the process, return an error message
@@ -689,3 +895,103 @@ def create_plan(user_data):
             "details": str(e)
         }
 
+def build_plans_batch(users_data, class_model, bundle, classification_results, prepared_inputs):
+    """
+    Generates the plans of many users with one classification model, adjusting all the plans in a single
+    call to the vectorized solver.
+
+    Parameters:
+    users_data (list): List of user financial data dictionaries.
+    class_model (str): "dt" (decision tree) or "apriori" (Apriori algorithm).
+    bundle (ArtifactBundle): Artifacts to use.
+    classification_results (list): Classification result of each user with `class_model`.
+    prepared_inputs (list): Result of prepare_plan_input for each user.
+
+    Returns:
+    list: One result per user, in the same format as manage_plan.
+    """
+    results = [None] * len(users_data)
+    assigned = []
+
+    for i, (user_data, classification_result, prepared_input) in enumerate(zip(users_data, classification_results, prepared_inputs)):
+        assigned_result = assign_user_plan(user_data, class_model, bundle, classification_result, prepared_input)
+        if check_for_error(assigned_result):
+            results[i] = assigned_result
+        else:
+            assigned.append((i, assigned_result))
+
+    if not assigned:
+        return results
+
+    # Adjust and verify every assigned plan at once
+    with timed("adjustment"):
+        solver_result = adjust_and_verify_plans(
+            plans_to_matrix([assigned_result["assigned_plan"] for _, assigned_result in assigned]),
+            [assigned_result["income"] for _, assigned_result in assigned],
+            [assigned_result["goal"] for _, assigned_result in assigned],
+            [assigned_result["duration"] for _, assigned_result in assigned],
+            bundle.minimums
+        )
+
+    for k, (i, assigned_result) in enumerate(assigned):
+        adjusted_plan_result = solver_result_to_dict(solver_result, k, assigned_result["assigned_plan"], assigned_result["duration"])
+        results[i] = format_plan_result(adjusted_plan_result)
+    return results
+
+def create_plans(users_data):
+    """
+    Creates financial plans for many users at once.
+
+    Every user goes through the same steps as in `create_plan`, but each step is done for the whole batch:
+    a single decision tree prediction over one feature matrix, a single vectorized pass over the Apriori
+    rules and a single call to the vectorized plan solver per model. Each user gets its own result, so one
+    invalid entry does not fail the rest of the batch.
+
+    Parameters:
+    users_data (list): List of user financial data dictionaries, each one as expected by `create_plan`.
+
+    Returns:
+    list: One result dictionary per user, in the same order and format as `create_plan`.
+    """
+    with timed("artifact_load"):
+        bundle = registry.get_bundle()
+
+    with timed("input_prep"):
+        prepared_inputs = [prepare_plan_input(user_data) for user_data in users_data]
+
+    # Classify every user in one pass per model. If an artifact failed to load, assign_user_plan reports the error.
+    dt_results = [None] * len(users_data)
+    if not check_for_error(bundle.model):
+        with timed("dt_classification"):
+            dt_results = classify_batch_dt(users_data, bundle.model)
+
+    apriori_results = [None] * len(users_data)
+    if not check_for_error(bundle.rules):
+        with timed("apriori_classification"):
+            apriori_results = classify_batch_apriori(users_data, bundle.rules)
+
+    try:
+        dt_plans = build_plans_batch(users_data, "dt", bundle, dt_results, prepared_inputs)
+        apriori_plans = build_plans_batch(users_data, "apriori", bundle, apriori_results, prepared_inputs)
+
+    except Exception as e:
+        error = {
+            "status": "server_error",
+            "message": "An error occurred while processing the plans.",
+            "details": str(e)
+        }
+        return [error] * len(users_data)
+
+    results = []
+    for dt_plan, apriori_plan in zip(dt_plans, apriori_plans):
+        try:
+            results.append(select_plan(dt_plan, apriori_plan))
+
+        except Exception as e:
+            results.append({
+                "status": "server_error",
+                "message": "An error occurred while processing the plan.",
+                "details": str(e)
+            })
+
+    return results
@@ -0,0 +1,274 @@
+import numpy as np
+from core.services.timing import timed
+
+CATEGORIES = ["food", "housing", "health", "transportation", "university", "non-essential", "savings"]  # Fixed column order of the plan matrices
+ADJUSTABLE_FIELDS = ["non-essential", "health", "transportation"]  # Fields cut to increase savings, in priority order
+
+CATEGORY_INDEX = {category: i for i, category in enumerate(CATEGORIES)}
+SAVINGS = CATEGORY_INDEX["savings"]
+HOUSING = CATEGORY_INDEX["housing"]
+
+def plans_to_matrix(plans):
+    """
+    Stacks plan dictionaries into an (N x 7) matrix following the CATEGORIES order.
+
+    Parameters:
+    plans (list): List of dictionaries with the percentage allocated to each category.
+
+    Returns:
+    np.ndarray: The plan matrix.
+
+    Raises:
+    KeyError: If a plan is missing one of the categories.
+    """
+    return np.array([[plan[category] for category in CATEGORIES] for plan in plans], dtype=np.float64).reshape(-1, len(CATEGORIES))
+
+def matrix_to_plan(row, template=None):
+    """
+    Converts a row of a plan matrix back into a plan dictionary.
+
+    Parameters:
+    row (np.ndarray): Percentages in the CATEGORIES order.
+    template (dict, optional): Plan the row was built from. Categories left unchanged keep the template's value,
+        so integer percentages stay integers as in the dictionary-based functions.
+
+    Returns:
+    dict: The plan dictionary.
+    """
+    plan = {}
+    for category, value in zip(CATEGORIES, row.tolist()):
+        if template is not None and template.get(category) == value:
+            plan[category] = template[category]
+        else:
+            plan[category] = value
+    return plan
+
+def verify_savings_batch(savings, incomes, goals, max_months):
+    """
+    Vectorized version of verify_saving_to_goal.
+
+    Parameters:
+    savings (np.ndarray): Percentage of the income allocated to savings, per plan.
+    incomes (np.ndarray): Monthly income, per plan.
+    goals (np.ndarray): Savings goal, per plan.
+    max_months (np.ndarray): Maximum number of months allowed to reach the goal, per plan.
+
+    Returns:
+    tuple:
+      - ok (np.ndarray): True where the goal is reached within max_months.
+      - required_months (np.ndarray): Months needed to reach the goal, NaN where nothing can be saved.
+    """
+    monthly_savings = (savings / 100) * incomes
+    can_save = monthly_savings > 0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        required_months = np.where(can_save, goals / np.where(can_save, monthly_savings, 1), np.nan)
+
+    ok = can_save & ~(required_months > max_months)
+    return ok, required_months
+
+def check_expenses_batch(plans, incomes, is_foreign, minimums):
+    """
+    Vectorized version of check_expenses.
+
+    Parameters:
+    plans (np.ndarray): The (N x 7) plan matrix.
+    incomes (np.ndarray): Monthly income, per plan.
+    is_foreign (np.ndarray): True for users living abroad (only they are checked on "housing").
+    minimums (dict): A dictionary specifying the minimum required amounts for essential expense categories.
+
+    Returns:
+    tuple:
+      - valid (np.ndarray): True where every checked category meets its minimum.
+      - diff (np.ndarray): (N x 7) differences between the minimum and the current expense, NaN where not checked.
+    """
+    valid = np.ones(len(plans), dtype=bool)
+    diff = np.full(plans.shape, np.nan)
+
+    for category, c in CATEGORY_INDEX.items():
+        if category not in minimums:
+            continue
+
+        checked = is_foreign if category == "housing" else np.ones(len(plans), dtype=bool)
+        current_expense = (plans[:, c] / 100) * incomes
+        diff[:, c] = np.where(checked, minimums[category] - current_expense, np.nan)
+        valid &= ~(checked & (current_expense < minimums[category]))
+
+    return valid, diff
+
+def redistribute_batch(plans, incomes, minimums, rows, is_foreign):
+    """
+    Vectorized version of redistribute_to_meet_minimums. The plan matrix is modified in place.
+
+    Categories are processed in the CATEGORIES order, which is the order of the plan templates, so every row goes
+    through exactly the same steps as the dictionary-based function.
+
+    Parameters:
+    plans (np.ndarray): The (N x 7) plan matrix.
+    incomes (np.ndarray): Monthly income, per plan.
+    minimums (dict): A dictionary specifying the minimum required amounts for essential expense categories.
+    rows (np.ndarray): True for the plans that have to be redistributed.
+    is_foreign (np.ndarray): True for users living abroad (affects "housing" adjustments).
+
+    Returns:
+    np.ndarray: True where the redistribution failed to meet the minimums.
+    """
+    current = incomes[:, None] * plans / 100
+    eligible = np.ones(plans.shape, dtype=bool)
+    eligible[:, HOUSING] = is_foreign
+
+    to_adjust = np.zeros(plans.shape, dtype=bool)
+    with_surplus = np.zeros(plans.shape, dtype=bool)
+    for category, c in CATEGORY_INDEX.items():
+        if category in minimums:
+            to_adjust[:, c] = eligible[:, c] & (current[:, c] < minimums[category])
+            if category not in ADJUSTABLE_FIELDS:
+                with_surplus[:, c] = eligible[:, c] & (current[:, c] > minimums[category])
+
+    alive = rows.copy()
+    failed = np.zeros(len(plans), dtype=bool)
+
+    for field, f in CATEGORY_INDEX.items():
+        adjusting = alive & to_adjust[:, f]
+        if not adjusting.any():
+            continue
+
+        deficit = minimums[field] - incomes * plans[:, f] / 100
+        open_rows = adjusting.copy()
+
+        for adjust_field, g in CATEGORY_INDEX.items():
+            step = open_rows & with_surplus[:, g]
+            if not step.any():
+                continue
+
+            adjust_value = incomes * plans[:, g] / 100
+            surplus = adjust_value - minimums[adjust_field]
+            step &= surplus > 0
+
+            max_reduction = np.minimum(np.minimum(surplus, deficit), adjust_value / 4)
+            plans[step, g] -= (max_reduction[step] / incomes[step]) * 100
+            deficit = np.where(step, deficit - max_reduction, deficit)
+            plans[step, f] += (max_reduction[step] / incomes[step]) * 100
+
+            open_rows &= ~(deficit <= 0)
+
+        field_failed = adjusting & (deficit > 0)
+        failed |= field_failed
+        alive &= ~field_failed
+
+    return failed
+
+def adjust_and_verify_plans(plans, incomes, goals, max_months, minimums):
+    """
+    Vectorized version of adjust_and_verify_plan: adjusts many plans at once to meet their savings goal within
+    their time frame, then redistributes funds to meet the minimum expenses, with the same heuristic.
+
+    Parameters:
+    plans (array-like): (N x 7) matrix of percentage allocations in the CATEGORIES order.
+    incomes (array-like): Monthly income, per plan.
+    goals (array-like): Savings goal (already reduced by the previous savings), per plan.
+    max_months (array-like): Maximum number of months allowed to reach the goal, per plan.
+    minimums (dict): A dictionary with the minimum expense amounts for essential categories.
+
+    Returns:
+    dict: A dictionary of arrays with one entry per plan:
+      - "plans": The adjusted (N x 7) plan matrix.
+      - "success": True where the plan meets the goal and the minimum expenses.
+      - "savings_ok": True where the savings goal is reached within max_months.
+      - "required_months": Months needed to reach the goal (NaN where nothing can be saved).
+      - "valid": True where the minimum expenses are met.
+      - "redistribution_failed": True where the redistribution could not meet the minimums.
+      - "diff": (N x 7) differences between the minimum and the current expenses (NaN where not checked).
+    """
+    plans = np.array(plans, dtype=np.float64).reshape(-1, len(CATEGORIES))
+    incomes = np.asarray(incomes, dtype=np.float64)
+    goals = np.asarray(goals, dtype=np.float64)
+    max_months = np.asarray(max_months, dtype=np.float64)
+
+    savings_ok, required_months = verify_savings_batch(plans[:, SAVINGS], incomes, goals, max_months)
+
+    # Cut the adjustable fields, in priority order, only for the plans that still miss the goal
+    for field in ADJUSTABLE_FIELDS:
+        rows = ~savings_ok
+        if not rows.any():
+            break
+
+        f = CATEGORY_INDEX[field]
+        if field == "non-essential":
+            plans[rows, SAVINGS] += plans[rows, f] / 2
+            plans[rows, f] = plans[rows, f] / 2
+        else:
+            current_field_amount = incomes * plans[:, f] / 100
+            min_field_amount = minimums[field]
+            rows &= current_field_amount > min_field_amount
+
+            reduction = np.minimum(current_field_amount / 2, current_field_amount - min_field_amount)
+            plans[rows, SAVINGS] += reduction[rows] / incomes[rows] * 100
+            plans[rows, f] -= reduction[rows] / incomes[rows] * 100
+
+        rows = ~savings_ok
+        savings_ok[rows], required_months[rows] = verify_savings_batch(plans[rows, SAVINGS], incomes[rows], goals[rows], max_months[rows])
+
+    is_foreign = plans[:, HOUSING] > 0
+    valid, diff = check_expenses_batch(plans, incomes, is_foreign, minimums)
+
+    # Redistribute the plans that do not meet the minimum expenses and check them again
+    redistributed = ~valid
+    redistribution_failed = np.zeros(len(plans), dtype=bool)
+    if redistributed.any():
+        with timed("redistribution"):
+            redistribution_failed = redistribute_batch(plans, incomes, minimums, redistributed, is_foreign)
+        new_valid, new_diff = check_expenses_batch(plans, incomes, is_foreign, minimums)
+        valid = np.where(redistributed, new_valid, valid)
+        diff = np.where(redistributed[:, None], new_diff, diff)
+
+        rows = redistributed & ~redistribution_failed
+        savings_ok[rows], required_months[rows] = verify_savings_batch(plans[rows, SAVINGS], incomes[rows], goals[rows], max_months[rows])
+
+    return {
+        "plans": plans,
+        "success": savings_ok & valid & ~redistribution_failed,
+        "savings_ok": savings_ok,
+        "required_months": required_months,
+        "valid": valid,
+        "redistribution_failed": redistribution_failed,
+        "diff": diff
+    }
+
+def solver_result_to_dict(result, i, template=None, max_months=None):
+    """
+    Converts the result of one plan from adjust_and_verify_plans into the dictionary returned by adjust_and_verify_plan.
+
+    Parameters:
+    result (dict): Result of adjust_and_verify_plans.
+    i (int): Index of the plan.
+    template (dict, optional): Plan before the adjustment, used to keep unchanged integer percentages.
+    max_months (int, optional): Maximum number of months of the plan, used in the error message.
+
+    Returns:
+    dict: The same result dictionary as adjust_and_verify_plan.
+    """
+    plan = matrix_to_plan(result["plans"][i], template)
+    diff = {category: value for category, value in zip(CATEGORIES, result["diff"][i].tolist()) if not np.isnan(value)}
+    if template is not None:
+        # Keep the category order of the template, as check_expenses does
+        diff = {category: diff[category] for category in template if category in diff}
+
+    if result["redistribution_failed"][i]:
+        return {"status": "calc_error", "message": "Redistribution failed to meet minimums.", "plan": plan, "diff": diff}
+
+    required_months = float(result["required_months"][i])
+    if result["savings_ok"][i]:
+        months = int(required_months)
+        if result["valid"][i]:
+            return {"status": "successful", "plan": plan, "actual_duration": months, "diff": diff}
+        return {"status": "successful", "months": months, "message": f"You can achieve the savings goal in {months} months."}
+
+    if np.isnan(required_months):
+        return {"status": "calc_error", "message": "Savings percentage or income is too low to save anything. "}
+
+    return {
+        "status": "calc_error",
+        "message": f"The savings goal cannot be achieved within {max_months} months. "
+                   f"Required months: {int(required_months)}. "
+    }
@@ -0,0 +1,178 @@
+import math
+import numpy as np
+from core.services.planArtifacts import check_for_error, registry
+from core.services.planSolver import CATEGORIES, CATEGORY_INDEX, adjust_and_verify_plans, plans_to_matrix
+
+DEFAULT_SWEEP_DURATIONS = [3, 6, 9, 12, 18, 24, 36, 48, 60]  # Durations (in months) evaluated when the request does not give any
+MAX_SWEEP_ROWS = 20000  # Maximum number of (template, goal, duration) combinations evaluated in one sweep
+
+SWEEP_COLUMNS = ["plan", "goal", "duration", "feasible", "actual_duration", "non_essential_cut", "matches_housing"]
+
+def pareto_frontier(rows, positions):
+    """
+    Finds the feasible rows of a sweep, among the templates meant for the user's housing situation, that are not
+    dominated on (actual duration, cut to non-essentials): no other such row reaches the goal as fast with a
+    smaller cut, or faster with the same cut.
+
+    Parameters:
+    rows (list): Sweep rows laid out as SWEEP_COLUMNS.
+    positions (list): Positions of the rows to consider.
+
+    Returns:
+    list: Positions of the frontier rows, from the shortest duration to the smallest cut.
+    """
+    feasible_col = SWEEP_COLUMNS.index("feasible")
+    duration_col = SWEEP_COLUMNS.index("actual_duration")
+    cut_col = SWEEP_COLUMNS.index("non_essential_cut")
+    housing_col = SWEEP_COLUMNS.index("matches_housing")
+    # Templates for the other housing situation are never assigned to the user, they are not recommended
+    feasible = [k for k in positions if rows[k][feasible_col] and rows[k][housing_col]]
+
+    frontier = []
+    best_cut = None
+    for k in sorted(feasible, key=lambda k: (rows[k][duration_col], rows[k][cut_col])):
+        if best_cut is None or rows[k][cut_col] < best_cut:
+            frontier.append(k)
+            best_cut = rows[k][cut_col]
+    return frontier
+
+def is_positive_duration(value):
+    # Whole number of months; bools are ints in Python but never a valid duration
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+def is_positive_goal(value):
+    # json.loads accepts NaN and Infinity, which would also be echoed in the rows as non-standard JSON
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value) and value > 0
+
+def validate_sweep_grid(durations, goals):
+    """
+    Checks the grids of a sweep.
+
+    Parameters:
+    durations (list or None): Durations (in months) to evaluate.
+    goals (list or None): Savings goals to evaluate.
+
+    Returns:
+    dict or None: An "invalid_data" error if a grid is not a non-empty list of positive integer durations or of
+        finite positive goals, otherwise None.
+    """
+    if durations is not None and (not isinstance(durations, list) or not durations or not all(map(is_positive_duration, durations))):
+        return {"status": "invalid_data", "message": "'durations' must be a non-empty list of positive integers."}
+    if goals is not None and (not isinstance(goals, list) or not goals or not all(map(is_positive_goal, goals))):
+        return {"status": "invalid_data", "message": "'goals' must be a non-empty list of positive numbers."}
+    return None
+
+def sweep_plans(user_data, durations=None, goals=None):
+    """
+    Evaluates every plan template over a grid of durations and savings goals for a single user, adjusting all the
+    combinations in one call to the vectorized solver.
+
+    Parameters:
+    user_data (dict): Dictionary containing the user's financial data.
+        Required keys: 'income' (float), 'expenses' (list of dicts), 'goal' (float).
+        Optional keys: 'last_saving' (float, default 0).
+    durations (list, optional): Maximum durations (in months) to evaluate. Defaults to DEFAULT_SWEEP_DURATIONS.
+    goals (list, optional): Savings goals to evaluate. Defaults to the user's goal.
+        Durations must be positive integers and goals finite positive numbers (see validate_sweep_grid).
+
+    Returns:
+    dict: Result dictionary containing:
+        - "status" (str): "success", "load_error", "invalid_data" or "server_error".
+        - "message" (str): Descriptive message of the operation result.
+        - "data" (dict, optional): Contains:
+            - "columns" (list): Names of the columns of the rows.
+            - "rows" (list): One row per (plan, goal, duration) combination.
+            - "frontier" (list): For each goal, the Pareto frontier of the feasible rows whose template matches
+              the user's housing situation (shortest duration vs. smallest cut to non-essential expenses) with
+              their adjusted plans.
+        - "details" (str, optional): Error details if an exception occurs.
+    """
+    try:
+        bundle = registry.get_bundle()
+        for artifact in (bundle.plans, bundle.minimums):
+            error = check_for_error(artifact)
+            if error:
+                return error
+
+        error = validate_sweep_grid(durations, goals)
+        if error:
+            return error
+
+        income = user_data.get("income")
+        expenses = user_data.get("expenses")
+        last_saving = user_data.get("last_saving", 0)
+        durations = DEFAULT_SWEEP_DURATIONS if durations is None else durations
+        goals = [user_data.get("goal")] if goals is None else goals
+
+        if income is None or not isinstance(expenses, list) or None in goals:
+            return {"status": "invalid_data", "message": "Invalid data: 'income', 'expenses' and 'goal' must be provided."}
+        if not all(map(is_positive_goal, goals)):
+            return {"status": "invalid_data", "message": "Invalid data: 'goal' must be a positive number."}
+
+        names = list(bundle.plans)
+        if len(names) * len(goals) * len(durations) > MAX_SWEEP_ROWS:
+            return {"status": "invalid_data", "message": f"The sweep cannot evaluate more than {MAX_SWEEP_ROWS} combinations."}
+
+        # Every (template, goal, duration) combination is one row of the solver
+        plan_index, goal_index, duration_index = [
+            index.ravel() for index in np.meshgrid(np.arange(len(names)), np.arange(len(goals)), np.arange(len(durations)), indexing="ij")
+        ]
+        templates = plans_to_matrix([bundle.plans[name] for name in names])
+        goals_array = np.asarray(goals, dtype=np.float64)
+        durations_array = np.asarray(durations, dtype=np.float64)
+
+        result = adjust_and_verify_plans(
+            templates[plan_index],
+            np.full(len(plan_index), income, dtype=np.float64),
+            goals_array[goal_index] - last_saving,
+            durations_array[duration_index],
+            bundle.minimums
+        )
+
+        non_essential = CATEGORY_INDEX["non-essential"]
+        cuts = templates[plan_index, non_essential] - result["plans"][:, non_essential]
+        feasible = result["success"]
+
+        # Templates ending in "A" are meant for users paying for housing, as in assign_plan
+        is_paying_housing = any(isinstance(expense, dict) and expense.get("type") == "housing" and expense.get("expense", 0) > 0
+                                for expense in expenses)
+
+        rows = []
+        for k in range(len(plan_index)):
+            name = names[plan_index[k]]
+            rows.append([
+                name,
+                goals[goal_index[k]],
+                durations[duration_index[k]],
+                bool(feasible[k]),
+                int(result["required_months"][k]) if feasible[k] else None,
+                float(cuts[k]),
+                name.endswith("A") == is_paying_housing
+            ])
+
+        # Frontier of each goal, with the adjusted plan of every point
+        frontier = []
+        for g, goal in enumerate(goals):
+            points = pareto_frontier(rows, np.flatnonzero(goal_index == g).tolist())
+            frontier.append({
+                "goal": goal,
+                "points": [{**dict(zip(SWEEP_COLUMNS, rows[k])), "adjusted_plan": dict(zip(CATEGORIES, result["plans"][k].tolist()))}
+                           for k in points]
+            })
+
+        return {
+            "status": "success",
+            "message": "Sweep generated successfully.",
+            "data": {
+                "columns": SWEEP_COLUMNS,
+                "rows": rows,
+                "frontier": frontier
+            }
+        }
+
+    except Exception as e:
+        return {
+            "status": "server_error",
+            "message": "An error occurred while generating the sweep.",
+            "details": str(e)
+        }
@@ -0,0 +1,133 @@
+import numpy as np
+
+MIN_DEGREE = 1  # Lowest polynomial degree supported by the projections
+MAX_DEGREE = 5  # Highest polynomial degree supported by the projections
+GOAL_SEARCH_MONTHS = 1200  # Months after which a goal the fitted curve has not reached is reported as never reached
+
+def fit_polynomial(x, y, degree):
+    """
+    Fits a polynomial by least squares, giving the same coefficients as scikit-learn's
+    PolynomialFeatures + LinearRegression: the powers of x and y are centered, the centered Vandermonde system
+    is solved (minimum-norm solution when there are fewer points than coefficients) and the intercept is
+    recovered from the means.
+
+    Parameters:
+    x (array-like): Sample positions (e.g. months).
+    y (array-like): Sample values (e.g. cumulative savings).
+    degree (int): Degree of the polynomial.
+
+    Returns:
+    np.ndarray: The degree + 1 coefficients, from the constant term to the highest power.
+
+    Raises:
+    ValueError: If x and y are empty or have different lengths.
+    """
+    x = np.asarray(x, dtype=np.float64).ravel()
+    y = np.asarray(y, dtype=np.float64).ravel()
+    if len(x) == 0 or len(x) != len(y):
+        raise ValueError("x and y must be non-empty and have the same length.")
+
+    # Columns x, x^2, ..., x^degree; the constant column is handled by the centering
+    powers = np.vander(x, degree + 1, increasing=True)[:, 1:]
+    powers_mean = powers.mean(axis=0)
+    y_mean = y.mean()
+
+    slopes = np.linalg.lstsq(powers - powers_mean, y - y_mean, rcond=None)[0]
+    intercept = y_mean - powers_mean @ slopes
+    return np.concatenate(([intercept], slopes))
+
+def fit_polynomials(xs, ys, degree):
+    """
+    Fits one polynomial of the same degree to each of many series at once. The series are padded to the same
+    length and the padding rows are zeroed, so every fit is solved in a single batched SVD and gives the same
+    (minimum-norm) solution as fit_polynomial.
+
+    Parameters:
+    xs (list): Sample positions of each series.
+    ys (list): Sample values of each series, with the same lengths as xs.
+    degree (int): Degree of the polynomials.
+
+    Returns:
+    np.ndarray: An (S x degree + 1) matrix with the coefficients of each series, from the constant term to the
+        highest power.
+
+    Raises:
+    ValueError: If a series is empty or its x and y have different lengths.
+    """
+    lengths = np.array([len(x) for x in xs])
+    if len(xs) != len(ys) or (lengths == 0).any() or any(len(x) != len(y) for x, y in zip(xs, ys)):
+        raise ValueError("Every series must be non-empty and have as many x as y values.")
+
+    # Padded (S x L) samples, the mask marks the real ones
+    mask = np.arange(lengths.max()) < lengths[:, None]
+    x = np.zeros(mask.shape)
+    y = np.zeros(mask.shape)
+    x[mask] = np.concatenate([np.asarray(values, dtype=np.float64).ravel() for values in xs])
+    y[mask] = np.concatenate([np.asarray(values, dtype=np.float64).ravel() for values in ys])
+
+    # Centered powers and values of each series, zero on the padding
+    powers = x[:, :, None] ** np.arange(1, degree + 1)
+    powers_mean = (powers * mask[:, :, None]).sum(axis=1) / lengths[:, None]
+    y_mean = (y * mask).sum(axis=1) / lengths
+    centered = (powers - powers_mean[:, None, :]) * mask[:, :, None]
+    values = (y - y_mean[:, None]) * mask
+
+    # Minimum-norm least squares of every series, with the same cutoff for small singular values as numpy's lstsq
+    u, singular, vt = np.linalg.svd(centered, full_matrices=False)
+    cutoff = np.finfo(np.float64).eps * np.maximum(lengths, degree)[:, None] * singular[:, :1]
+    inverse = np.divide(1.0, singular, out=np.zeros_like(singular), where=singular > cutoff)
+    slopes = np.einsum("skd,sk,sk->sd", vt, inverse, np.einsum("slk,sl->sk", u, values))
+
+    intercepts = y_mean - (powers_mean * slopes).sum(axis=1)
+    return np.column_stack((intercepts, slopes))
+
+def evaluate_polynomial(coefficients, x):
+    """
+    Evaluates a polynomial with Horner's method.
+
+    Parameters:
+    coefficients (array-like): Coefficients from the constant term to the highest power.
+    x (array-like): Positions where the polynomial is evaluated.
+
+    Returns:
+    np.ndarray: The value of the polynomial at each position.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    result = np.zeros_like(x)
+    for coefficient in coefficients[::-1]:
+        result = result * x + coefficient
+    return result
+
+def goal_crossing(coefficients, goal, horizon=GOAL_SEARCH_MONTHS):
+    """
+    Finds when a fitted polynomial first reaches a goal, from the real roots of p(x) - goal.
+
+    Parameters:
+    coefficients (array-like): Coefficients from the constant term to the highest power.
+    goal (float): The value to reach.
+    horizon (float, optional): Last month considered.
+
+    Returns:
+    tuple: The first month (int) at which the polynomial is at least the goal and the exact point (float) where
+        it reaches the goal before that month, or (None, None) if it does not within the horizon.
+    """
+    coefficients = np.asarray(coefficients, dtype=np.float64)
+    tolerance = 1e-9 * max(1.0, abs(goal))
+
+    if evaluate_polynomial(coefficients, 0.0) >= goal - tolerance:
+        return 0, 0.0
+
+    # Real roots in (0, horizon], in increasing order. np.roots takes the highest power first.
+    shifted = coefficients.copy()
+    shifted[0] -= goal
+    roots = np.roots(np.trim_zeros(shifted[::-1], "f"))
+    real = roots[np.abs(roots.imag) <= 1e-7 * np.maximum(1.0, np.abs(roots.real))].real
+    real = np.sort(real[(real > 0) & (real <= horizon)])
+
+    # Every integer month where the curve is above the goal comes right after a crossing; the curve can also dip
+    # below the goal again before the next whole month, so each candidate is checked
+    for root in real:
+        month = int(np.ceil(root - 1e-9))
+        if month <= horizon and evaluate_polynomial(coefficients, float(month)) >= goal - tolerance:
+            return month, float(root)
+    return None, None
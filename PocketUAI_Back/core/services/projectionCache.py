@@ -0,0 +1,60 @@
+import hashlib
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from core.services.cache import LRUCache
+from core.services.regresionModel import get_points
+
+PROJECTION_CACHE_SIZE = 4096  # Maximum number of serialized projections kept in memory
+
+# A projection only depends on its input, so entries never expire; they are only evicted when the cache is full
+projection_cache = LRUCache(maxsize=PROJECTION_CACHE_SIZE)
+
+def projection_cache_key(data):
+    """
+    Builds a canonical hash of the inputs of a projection: months, progress, duration, poly_degree and the
+    goal options.
+    Months and progress are compared as floats since the fit converts them anyway; the duration is kept as
+    sent because it decides whether the projected months are integers or floats.
+
+    Parameters:
+    data (dict): The projection data (see get_points).
+
+    Returns:
+    str or None: The key, or None if the input cannot be normalized (it is then not cached).
+    """
+    try:
+        canonical = [
+            [float(month) for month in data["months"]],
+            [float(value) for value in data["progress"]],
+            data["duration"],
+            data.get("poly_degree", 1),
+            data.get("goal"),
+            data.get("include_projection", True)
+        ]
+        return hashlib.sha256(json.dumps(canonical).encode()).hexdigest()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def get_points_json(data):
+    """
+    Returns the projection of get_points already serialized as JSON. Successful projections are cached, so a
+    repeated request skips both the fit and the encoding.
+
+    Parameters:
+    data (dict): The projection data (see get_points).
+
+    Returns:
+    bytes: The JSON body of the result, encoded as JsonResponse does.
+    """
+    key = projection_cache_key(data)
+    if key is not None:
+        cached = projection_cache.get(key)
+        if cached is not None:
+            return cached
+
+    result = get_points(data)
+    body = json.dumps(result, cls=DjangoJSONEncoder).encode()
+
+    if key is not None and result["status"] == "success":
+        projection_cache.set(key, body)
+    return body
@@ -1,7 +1,60 @@
 import numpy as np  # Library for numerical computations
-import matplotlib.pyplot as plt  # Library for plotting (though not used here)
-from sklearn.preprocessing import PolynomialFeatures  # To create polynomial features for regression
-from sklearn.linear_model import LinearRegression  # Linear regression model
+from core.services.polynomialFit import MAX_DEGREE, MIN_DEGREE, evaluate_polynomial, fit_polynomial, fit_polynomials, goal_crossing  # Closed-form least squares and Horner evaluation
+from core.services.regressionStats import fit_from_stats  # Fits from the stored sufficient statistics of a user
+from core.services.timing import timed  # Per-stage timings reported in the Server-Timing header
+
+def is_valid_degree(poly_degree):
+    """
+    Checks that a polynomial degree is supported by the projections.
+
+    Parameters:
+    poly_degree (object): The requested degree.
+
+    Returns:
+    bool: True if it is an integer from MIN_DEGREE to MAX_DEGREE.
+    """
+    return isinstance(poly_degree, int) and not isinstance(poly_degree, bool) and MIN_DEGREE <= poly_degree <= MAX_DEGREE
+
+def build_projection(coefficients, duration, goal=None, include_projection=True):
+    """
+    Evaluates a fitted polynomial over every month of the plan and, if a goal is given, finds when it is reached.
+
+    Parameters:
+    coefficients (np.ndarray): Fitted coefficients, from the constant term to the highest power.
+    duration (int): Total number of months to project.
+    goal (float, optional): Savings goal to find the reach month of.
+    include_projection (bool, optional): Whether to return the projected months and values.
+
+    Returns:
+    dict: The success response of a projection (see get_points).
+    """
+    result_data = {"coefficients": coefficients.tolist()}
+
+    if include_projection:
+        with timed("projection_predict"):
+            # Generate month indices for the entire duration, including future projections
+            all_months = np.arange(0, duration + 1)
+
+            # Predict the progress for all months
+            projection = evaluate_polynomial(coefficients, all_months)
+
+        result_data = {"all_months": all_months.tolist(), "projection": projection.tolist(), **result_data}
+
+    if goal is not None:
+        with timed("projection_goal"):
+            # Solve for the month instead of scanning the projection
+            goal_month, crossing = goal_crossing(coefficients, float(goal))
+
+        result_data["goal_month"] = goal_month
+        result_data["goal_crossing"] = crossing
+        result_data["goal_in_duration"] = goal_month is not None and goal_month <= duration
+
+    # Return the projection results as a success response
+    return {
+        "status": "success",
+        "message": "Projection generated successfully.",
+        "data": result_data
+    }
 
 def get_points(data):
     """
@@ -12,15 +65,22 @@ def get_points(data):
         - "months" (list or array): Months corresponding to user progress data.
         - "progress" (list or array): User's financial progress for each month.
         - "duration" (int): Total number of months to project.
-        - "poly_degree" (int, optional): Degree of the polynomial for the regression model (default is 3).
+        - "poly_degree" (int, optional): Degree of the polynomial for the regression model, from 1 to 5 (default is 1).
+        - "goal" (float, optional): Savings goal; the month the projection reaches it is returned.
+        - "include_projection" (bool, optional): Whether to return all_months and projection (default is True).
 
     Returns:
     dict: Result dictionary containing:
-        - "status" (str): Status message, either "success" or "server_error".
+        - "status" (str): Status message, either "success", "invalid_data" or "server_error".
         - "message" (str): Descriptive message of the operation result.
         - "data" (dict, optional): Contains:
             - "all_months" (list): List of all months, including projected ones.
             - "projection" (list): List of predicted financial progress values.
+            - "coefficients" (list): Fitted coefficients, from the constant term to the highest power of the month.
+            - "goal_month" (int or None): With a goal, the first month the projection reaches it (None if it
+              does not within GOAL_SEARCH_MONTHS).
+            - "goal_crossing" (float or None): With a goal, the exact point the fitted curve reaches it.
+            - "goal_in_duration" (bool): With a goal, whether goal_month is within the duration.
         - "details" (str, optional): Error details if an exception occurs.
     """
     try:
@@ -32,32 +92,52 @@ def get_points(data):
         duration = data.get("duration")
         poly_degree = data.get("poly_degree", 1)
 
-        # Transform the input features to polynomial features
-        poly = PolynomialFeatures(degree=poly_degree)
-        X = poly.fit_transform(months.reshape(-1, 1))
+        if not is_valid_degree(poly_degree):
+            return {
+                "status": "invalid_data",
+                "message": f"'poly_degree' must be an integer from {MIN_DEGREE} to {MAX_DEGREE}."
+            }
 
-        # Initialize and train the linear regression model
-        model = LinearRegression()
-        model.fit(X, progress)
+        with timed("projection_fit"):
+            # Solve the least-squares fit directly instead of building scikit-learn estimators for a handful of points
+            coefficients = fit_polynomial(months, progress, poly_degree)
 
-        # Generate month indices for the entire duration, including future projections
-        all_months = np.arange(0, duration + 1).reshape(-1, 1)
+        return build_projection(coefficients, duration, data.get("goal"), data.get("include_projection", True))
 
-        # Transform the month indices into polynomial features
-        X_all_months = poly.transform(all_months)
+    except Exception as e:
+        # Return error details in case of a failure
+        return {
+            "status": "server_error",
+            "message": "An error occurred while generating the projection.",
+            "details": str(e)
+        }
 
-        # Predict the progress for all months
-        projection = model.predict(X_all_months)
+def get_points_from_stats(stats, duration, poly_degree=1, goal=None, include_projection=True):
+    """
+    Generates the projection of a user from the sufficient statistics stored for their history, without the
+    months and progress themselves. The cost does not depend on how many months have been recorded.
 
-        # Return the projection results as a success response
-        return {
-            "status": "success",
-            "message": "Projection generated successfully.",
-            "data": {
-                "all_months": all_months.flatten().tolist(),
-                "projection": projection.tolist(),
+    Parameters:
+    stats (dict): The user's statistics (see regressionStats).
+    duration (int): Total number of months to project.
+    poly_degree (int, optional): Degree of the polynomial for the regression model, from 1 to 5 (default is 1).
+    goal (float, optional): Savings goal to find the reach month of.
+    include_projection (bool, optional): Whether to return the projected months and values.
+
+    Returns:
+    dict: Result dictionary in the same format as get_points.
+    """
+    try:
+        if not is_valid_degree(poly_degree):
+            return {
+                "status": "invalid_data",
+                "message": f"'poly_degree' must be an integer from {MIN_DEGREE} to {MAX_DEGREE}."
             }
-        }
+
+        with timed("projection_fit"):
+            coefficients = fit_from_stats(stats, poly_degree)
+
+        return build_projection(coefficients, duration, goal, include_projection)
 
     except Exception as e:
         # Return error details in case of a failure
@@ -66,3 +146,58 @@ def get_points(data):
             "message": "An error occurred while generating the projection.",
             "details": str(e)
         }
+
+def get_points_batch(series):
+    """
+    Generates the projections of many series at once. The series are grouped by polynomial degree and every
+    group is fitted in a single vectorized least-squares pass.
+
+    Parameters:
+    series (list): List of dictionaries with the same keys as the data of get_points.
+
+    Returns:
+    list: One result dictionary per series, in the same order and format as get_points.
+    """
+    results = [None] * len(series)
+    groups = {}
+
+    for i, data in enumerate(series):
+        poly_degree = data.get("poly_degree", 1)
+        if not is_valid_degree(poly_degree):
+            results[i] = {
+                "status": "invalid_data",
+                "message": f"'poly_degree' must be an integer from {MIN_DEGREE} to {MAX_DEGREE}."
+            }
+            continue
+        groups.setdefault(poly_degree, []).append(i)
+
+    for poly_degree, positions in groups.items():
+        try:
+            with timed("projection_fit"):
+                coefficients = fit_polynomials(
+                    [series[i].get("months") for i in positions],
+                    [series[i].get("progress") for i in positions],
+                    poly_degree
+                )
+        except Exception:
+            # A malformed series makes the whole group fail, fit each one on its own to report it
+            for i in positions:
+                results[i] = get_points(series[i])
+            continue
+
+        for i, series_coefficients in zip(positions, coefficients):
+            try:
+                results[i] = build_projection(
+                    series_coefficients,
+                    series[i].get("duration"),
+                    series[i].get("goal"),
+                    series[i].get("include_projection", True)
+                )
+            except Exception as e:
+                results[i] = {
+                    "status": "server_error",
+                    "message": "An error occurred while generating the projection.",
+                    "details": str(e)
+                }
+
+    return results
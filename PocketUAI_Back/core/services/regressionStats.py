@@ -0,0 +1,200 @@
+import numpy as np
+from core.services.polynomialFit import MAX_DEGREE, fit_polynomial
+
+STATS_COLLECTION = "projection_stats"  # Firestore collection with one statistics document per user, keyed by the user ID
+
+def empty_stats():
+    """
+    Creates the sufficient statistics of a user without any saving recorded.
+
+    The statistics of the points (x = month, y = accumulated savings) are the power sums S[k] = sum(x^k) for
+    k = 0..2*MAX_DEGREE and the moments T[k] = sum(y * x^k) for k = 0..MAX_DEGREE. XᵀX and Xᵀy of any degree up
+    to MAX_DEGREE are read from them, so a projection does not need the history. While there are at most
+    MAX_DEGREE points the points themselves are kept too, since a fit with fewer points than coefficients cannot
+    be solved from the sums alone.
+
+    Returns:
+    dict: The statistics, with the last month and the running total of savings used to append the next month.
+    """
+    return {
+        "count": 0,
+        "last_month": None,
+        "total_saving": 0.0,
+        "power_sums": [0.0] * (2 * MAX_DEGREE + 1),
+        "moment_sums": [0.0] * (MAX_DEGREE + 1),
+        "point_months": [],
+        "point_progress": []
+    }
+
+def add_point(stats, month, progress):
+    """
+    Adds one point to the statistics in O(MAX_DEGREE).
+
+    Parameters:
+    stats (dict): Statistics created with empty_stats. They are not modified.
+    month (float): Month of the point.
+    progress (float): Accumulated savings at that month.
+
+    Returns:
+    dict: The updated statistics.
+    """
+    powers = float(month) ** np.arange(2 * MAX_DEGREE + 1)
+    count = stats["count"] + 1
+    # Separate lists rather than [month, progress] pairs, since Firestore does not store nested arrays
+    keep_points = count <= MAX_DEGREE and len(stats.get("point_months", [])) == stats["count"]
+    return {
+        **stats,
+        "count": count,
+        "power_sums": (np.asarray(stats["power_sums"]) + powers).tolist(),
+        "moment_sums": (np.asarray(stats["moment_sums"]) + float(progress) * powers[:MAX_DEGREE + 1]).tolist(),
+        "point_months": stats.get("point_months", []) + [float(month)] if keep_points else [],
+        "point_progress": stats.get("point_progress", []) + [float(progress)] if keep_points else []
+    }
+
+def append_saving(stats, month, saving):
+    """
+    Records the saving of a new month, which adds it to the running total and the total as a new point.
+    This only works when the month comes after every month already recorded: an earlier month changes the
+    accumulated savings of all the later points.
+
+    Parameters:
+    stats (dict): The current statistics.
+    month (int or float): Month of the history entry.
+    saving (int or float): Saving of that month.
+
+    Returns:
+    dict or None: The updated statistics, or None if the month is not after the last one recorded.
+    """
+    try:
+        month = float(month)
+        saving = float(saving)
+    except (TypeError, ValueError):
+        return None
+
+    if stats["last_month"] is not None and month <= stats["last_month"]:
+        return None
+
+    total_saving = stats["total_saving"] + saving
+    updated = add_point(stats, month, total_saving)
+    updated["last_month"] = month
+    updated["total_saving"] = total_saving
+    return updated
+
+def stats_from_history(history):
+    """
+    Builds the statistics from the full history of a user, accumulating the savings in month order as the
+    tracking page does.
+
+    Parameters:
+    history (list): History entries with 'month' and 'saving'.
+
+    Returns:
+    dict or None: The statistics, or None if a month or saving is not a number.
+    """
+    try:
+        entries = sorted(((float(entry["month"]), float(entry["saving"])) for entry in history), key=lambda entry: entry[0])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    stats = empty_stats()
+    for month, saving in entries:
+        stats["total_saving"] += saving
+        stats = add_point(stats, month, stats["total_saving"])
+        stats["last_month"] = month
+    return stats
+
+def fit_from_stats(stats, degree):
+    """
+    Solves the normal equations XᵀX c = Xᵀy of a polynomial fit from the statistics.
+    The system is equilibrated by its diagonal first, since the power sums of months span many orders of magnitude.
+    With fewer points than coefficients the system is singular: the kept points are fitted with fit_polynomial
+    instead, which gives the same minimum-norm solution as scikit-learn.
+
+    Parameters:
+    stats (dict): The statistics.
+    degree (int): Degree of the polynomial, at most MAX_DEGREE.
+
+    Returns:
+    np.ndarray: The degree + 1 coefficients, from the constant term to the highest power.
+
+    Raises:
+    ValueError: If the statistics do not contain any point.
+    """
+    if not stats["count"]:
+        raise ValueError("There are no savings recorded to fit.")
+
+    point_months = stats.get("point_months", [])
+    if stats["count"] <= degree and len(point_months) == stats["count"]:
+        return fit_polynomial(point_months, stats["point_progress"], degree)
+
+    power_sums = np.asarray(stats["power_sums"], dtype=np.float64)
+    size = degree + 1
+    xtx = power_sums[np.add.outer(np.arange(size), np.arange(size))]
+    xty = np.asarray(stats["moment_sums"][:size], dtype=np.float64)
+
+    # Months are at least 1 in practice, but month 0 makes every higher power sum 0
+    scale = np.sqrt(np.where(np.diag(xtx) > 0, np.diag(xtx), 1.0))
+    solution = np.linalg.lstsq(xtx / np.outer(scale, scale), xty / scale, rcond=None)[0]
+    return solution / scale
+
+def record_saving(storage, user_id, month, saving):
+    """
+    Appends a new history entry to the user's statistics in a transaction. If the entry cannot be appended
+    (an earlier month, or statistics that were never built) the statistics are dropped and rebuilt from the
+    history by the next projection.
+
+    Parameters:
+    storage (FirestoreStorage or SqliteStorage): The document storage.
+    user_id (str): ID of the user.
+    month (int or float): Month of the new history entry.
+    saving (int or float): Saving of that month.
+    """
+    def append(transaction):
+        stats = transaction.get(STATS_COLLECTION, user_id)
+        updated = append_saving(stats, month, saving) if stats is not None else None
+        if updated is None:
+            transaction.delete(STATS_COLLECTION, user_id)
+        else:
+            transaction.set(STATS_COLLECTION, user_id, updated)
+
+    storage.run_transaction(append)
+
+def invalidate_stats(storage, user_id):
+    """
+    Drops the user's statistics after a history entry is changed or deleted. They are rebuilt by the next projection.
+
+    Parameters:
+    storage (FirestoreStorage or SqliteStorage): The document storage.
+    user_id (str): ID of the user.
+    """
+    if user_id:
+        storage.delete(STATS_COLLECTION, user_id)
+
+def load_stats(storage, user_id):
+    """
+    Reads the user's statistics, rebuilding them from the history if they are missing. The rebuild runs in a
+    transaction so a history entry recorded at the same time either is part of it or is appended after it.
+
+    Parameters:
+    storage (FirestoreStorage or SqliteStorage): The document storage.
+    user_id (str): ID of the user.
+
+    Returns:
+    dict or None: The statistics, or None if the history contains entries that cannot be fitted.
+    """
+    stats = storage.get(STATS_COLLECTION, user_id)
+    if stats is not None:
+        return stats
+
+    def rebuild(transaction):
+        stats = transaction.get(STATS_COLLECTION, user_id)
+        if stats is not None:
+            return stats
+
+        history = transaction.where("history", "id_user", user_id)
+        stats = stats_from_history([entry for _, entry in history])
+        if stats is not None:
+            transaction.set(STATS_COLLECTION, user_id, stats)
+        return stats
+
+    return storage.run_transaction(rebuild)
@@ -0,0 +1,144 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from core.services.cache import LRUCache
+from core.services.firebase import firebase_auth
+
+SESSION_CACHE_SIZE = 10000  # Maximum number of verified session cookies kept in memory
+SESSION_CACHE_TTL = 3600  # Seconds a verified session is trusted before it is fully verified again inline
+
+# Verified claims keyed by the hash of the session cookie. Each entry holds the claims and when the revocation
+# status was last checked with Firebase.
+session_cache = LRUCache(maxsize=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL)
+
+_lock = threading.Lock()
+_refreshing = set()  # Keys with a revocation check in progress
+_revoked_at = {}  # User ID -> time its sessions were revoked in this process
+_invalidated_at = {}  # Key -> time its session was invalidated in this process (e.g. on logout)
+_executor = None
+
+def session_key(session_cookie):
+    """
+    Hashes a session cookie so the cookie itself is never kept in memory as a key.
+
+    Parameters:
+    session_cookie (str): The session cookie.
+
+    Returns:
+    str: The cache key.
+    """
+    return hashlib.sha256(session_cookie.encode()).hexdigest()
+
+def revocation_interval():
+    """
+    Returns how many seconds a cached session is used before its revocation status is checked again in the background.
+
+    Returns:
+    float: settings.SESSION_REVOCATION_CHECK_INTERVAL, 60 seconds by default.
+    """
+    return getattr(settings, "SESSION_REVOCATION_CHECK_INTERVAL", 60)
+
+def _forget_old(times, now):
+    # Older invalidations no longer matter: every entry cached before them has expired
+    for name in [name for name, at in times.items() if now - at > SESSION_CACHE_TTL]:
+        del times[name]
+
+def _store(key, claims, checked_at):
+    # Never trust the claims past the expiration of the cookie
+    ttl = min(SESSION_CACHE_TTL, claims.get("exp", 0) - time.time())
+    with _lock:
+        # A verification that started before the session was invalidated must not put it back in the cache
+        invalidated_at = _invalidated_at.get(key)
+        if ttl > 0 and (invalidated_at is None or checked_at > invalidated_at):
+            session_cache.set(key, {"claims": claims, "checked_at": checked_at}, ttl=ttl)
+
+def _refresh(key, session_cookie):
+    # Background revocation check: a revoked, expired or disabled session is dropped so the next request fails inline
+    try:
+        checked_at = time.time()
+        claims = firebase_auth.verify_session_cookie(session_cookie, check_revoked=True)
+        _store(key, claims, checked_at)
+    except (firebase_auth.InvalidSessionCookieError, firebase_auth.UserDisabledError):
+        session_cache.delete(key)
+    except Exception:
+        pass  # Firebase unreachable: keep the entry and try again on a later request
+    finally:
+        with _lock:
+            _refreshing.discard(key)
+
+def _schedule_refresh(key, session_cookie):
+    global _executor
+    with _lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="session-refresh")
+    _executor.submit(_refresh, key, session_cookie)
+
+def verify_session(session_cookie):
+    """
+    Verifies a session cookie, using the cached claims when the cookie was verified recently.
+
+    The first verification of a cookie checks revocation inline with Firebase. After that, the cached claims are
+    returned and the revocation status is refreshed in the background every SESSION_REVOCATION_CHECK_INTERVAL
+    seconds, so a revoked session stops being accepted within that interval (immediately in the process where
+    it was revoked or logged out).
+
+    Parameters:
+    session_cookie (str): The session cookie.
+
+    Returns:
+    dict: The decoded claims of the session.
+
+    Raises:
+    firebase_auth.InvalidSessionCookieError: If the cookie is invalid, expired or revoked.
+    Exception: Any other error raised by Firebase while verifying the cookie.
+    """
+    key = session_key(session_cookie)
+    entry = session_cache.get(key)
+
+    if entry is not None:
+        claims = entry["claims"]
+        revoked_at = _revoked_at.get(claims.get("uid"))
+        if revoked_at is None or entry["checked_at"] > revoked_at:
+            if time.time() - entry["checked_at"] >= revocation_interval():
+                _schedule_refresh(key, session_cookie)
+            return claims
+        session_cache.delete(key)
+
+    checked_at = time.time()
+    claims = firebase_auth.verify_session_cookie(session_cookie, check_revoked=True)
+    _store(key, claims, checked_at)
+    return claims
+
+def invalidate_session(session_cookie):
+    """
+    Forgets the verified claims of a session cookie (e.g. on logout).
+
+    Parameters:
+    session_cookie (str): The session cookie.
+    """
+    if session_cookie:
+        key = session_key(session_cookie)
+        now = time.time()
+        with _lock:
+            _forget_old(_invalidated_at, now)
+            _invalidated_at[key] = now
+            session_cache.delete(key)
+
+def revoke_user_sessions(uid):
+    """
+    Revokes every session of a user with Firebase and stops accepting their cached sessions in this process.
+    Other processes stop accepting them at their next background revocation check.
+
+    Parameters:
+    uid (str): ID of the user.
+    """
+    firebase_auth.revoke_refresh_tokens(uid)
+    now = time.time()
+    with _lock:
+        _forget_old(_revoked_at, now)
+        _revoked_at[uid] = now
@@ -0,0 +1,214 @@
+import json
+import re
+import sqlite3
+import threading
+import uuid
+from django.core.serializers.json import DjangoJSONEncoder
+from core.services.storage import COLLECTIONS, DELETE_BATCH_SIZE
+
+# Expression indexes of each collection, one tuple of document fields per index
+INDEXES = {
+    "history": [("id_user", "month")]
+}
+
+_FIELD = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+def _field_expression(field):
+    # Fields are interpolated in the SQL, so only plain names are accepted. The expression must be written
+    # exactly as in the index for SQLite to use it.
+    if not _FIELD.match(field):
+        raise ValueError(f"Invalid field name '{field}'.")
+    return f"json_extract(data, '$.{field}')"
+
+def _table(collection):
+    if collection not in COLLECTIONS:
+        raise ValueError(f"Unknown collection '{collection}'.")
+    return f'"{collection}"'
+
+def _dumps(data):
+    return json.dumps(data, cls=DjangoJSONEncoder)
+
+class SqliteTransaction:
+    """
+    Operations available inside SqliteStorage.run_transaction, on the connection that holds the write lock.
+    """
+
+    def __init__(self, storage, connection):
+        self._storage = storage
+        self._connection = connection
+
+    def get(self, collection, doc_id):
+        return self._storage._get(self._connection, collection, doc_id)
+
+    def where(self, collection, field, value):
+        return self._storage._where(self._connection, collection, field, value)
+
+    def set(self, collection, doc_id, data):
+        self._storage._set(self._connection, collection, doc_id, data)
+
+    def delete(self, collection, doc_id):
+        self._storage._delete(self._connection, collection, doc_id)
+
+class SqliteStorage:
+    """
+    Storage of the API documents in a local SQLite database, with the same operations as FirestoreStorage.
+
+    Each collection is a table of JSON documents keyed by ID, with expression indexes on the queried fields.
+    The database runs in WAL mode, so reads never wait for a write, and every thread has its own connection.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        connection = self._connect()
+        try:
+            self._create_schema(connection)
+        finally:
+            connection.close()
+
+    def _connect(self):
+        # Autocommit mode: single statements commit at once and transactions are opened explicitly
+        connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def _create_schema(self, connection):
+        for collection in COLLECTIONS:
+            connection.execute(f"CREATE TABLE IF NOT EXISTS {_table(collection)} (id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+            for fields in INDEXES.get(collection, []):
+                name = f'"{collection}_{"_".join(fields)}"'
+                columns = ", ".join(_field_expression(field) for field in fields)
+                connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {_table(collection)} ({columns})")
+
+    def _get(self, connection, collection, doc_id):
+        row = connection.execute(f"SELECT data FROM {_table(collection)} WHERE id = ?", (doc_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _where(self, connection, collection, field, value):
+        rows = connection.execute(
+            f"SELECT id, data FROM {_table(collection)} WHERE {_field_expression(field)} = ? ORDER BY id", (value,)
+        )
+        return [(doc_id, json.loads(data)) for doc_id, data in rows]
+
+    def _set(self, connection, collection, doc_id, data):
+        connection.execute(f"INSERT OR REPLACE INTO {_table(collection)} (id, data) VALUES (?, ?)", (doc_id, _dumps(data)))
+
+    def _delete(self, connection, collection, doc_id):
+        return connection.execute(f"DELETE FROM {_table(collection)} WHERE id = ?", (doc_id,)).rowcount > 0
+
+    def get(self, collection, doc_id):
+        """
+        Reads a document (see FirestoreStorage.get).
+        """
+        return self._get(self._connection(), collection, doc_id)
+
+    def where(self, collection, field, value):
+        """
+        Reads every document of a collection whose field is equal to a value, ordered by ID (see FirestoreStorage.where).
+        """
+        return self._where(self._connection(), collection, field, value)
+
+    def stream(self, collection, field, value, order_by=None, start_after=None, limit=None, fields=None):
+        """
+        Iterates over the documents of a collection whose field is equal to a value (see FirestoreStorage.stream).
+        Rows are read from the cursor as they are consumed; on history, the (id_user, month) index gives them
+        already ordered by month.
+        """
+        sql = f"SELECT id, data FROM {_table(collection)} WHERE {_field_expression(field)} = ?"
+        parameters = [value]
+        if order_by is not None:
+            if start_after is not None:
+                sql += f" AND ({_field_expression(order_by)}, id) > (?, ?)"
+                parameters.extend(start_after)
+            sql += f" ORDER BY {_field_expression(order_by)}, id"
+        else:
+            sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+
+        for doc_id, data in self._connection().execute(sql, parameters):
+            document = json.loads(data)
+            if fields is not None:
+                document = {key: document[key] for key in fields if key in document}
+            yield doc_id, document
+
+    def add(self, collection, data):
+        """
+        Creates a document with a generated ID (see FirestoreStorage.add).
+        """
+        doc_id = uuid.uuid4().hex
+        self._set(self._connection(), collection, doc_id, data)
+        return doc_id
+
+    def set(self, collection, doc_id, data):
+        """
+        Creates or replaces a document (see FirestoreStorage.set).
+        """
+        self._set(self._connection(), collection, doc_id, data)
+
+    def update(self, collection, doc_id, data):
+        """
+        Updates some fields of an existing document (see FirestoreStorage.update).
+        """
+        def merge(transaction):
+            document = transaction.get(collection, doc_id)
+            if document is None:
+                return False
+            transaction.set(collection, doc_id, {**document, **data})
+            return True
+
+        return self.run_transaction(merge)
+
+    def delete(self, collection, doc_id):
+        """
+        Deletes an existing document (see FirestoreStorage.delete).
+        """
+        return self._delete(self._connection(), collection, doc_id)
+
+    def delete_where(self, collection, field, value, batch_size=DELETE_BATCH_SIZE, workers=None):
+        """
+        Deletes every document of a collection whose field is equal to a value (see FirestoreStorage.delete_where).
+        Each batch is one statement, so the write lock is released between batches; `workers` is not used since
+        SQLite has a single writer.
+        """
+        connection = self._connection()
+        table = _table(collection)
+        while True:
+            rows = connection.execute(
+                f"DELETE FROM {table} WHERE id IN (SELECT id FROM {table} WHERE {_field_expression(field)} = ? LIMIT ?) RETURNING id",
+                (value, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            yield [doc_id for doc_id, in rows]
+
+    def run_transaction(self, function):
+        """
+        Runs a function in a transaction (see FirestoreStorage.run_transaction). The write lock is taken when the
+        transaction starts, so it never has to be retried.
+        """
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            result = function(SqliteTransaction(self, connection))
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return result
+
+    def ping(self):
+        """
+        Opens the connection of this thread.
+        """
+        self._connection().execute("SELECT 1").fetchone()
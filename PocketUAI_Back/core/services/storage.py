@@ -0,0 +1,278 @@
+from django.conf import settings
+from core.services.firebase import LazyService, db
+
+COLLECTIONS = ("user", "financialPlan", "history", "tracking", "projection_stats")  # Collections stored by the API
+DELETE_BATCH_SIZE = 500  # Documents deleted per write batch, the most Firestore accepts in one batch
+DELETE_WORKERS = 4  # Write batches of a bulk delete committed at the same time
+
+class FirestoreTransaction:
+    """
+    Operations available inside FirestoreStorage.run_transaction. As in any Firestore transaction, every read must
+    happen before the first write.
+    """
+
+    def __init__(self, client, transaction):
+        self._client = client
+        self._transaction = transaction
+
+    def get(self, collection, doc_id):
+        snapshot = self._client.collection(collection).document(doc_id).get(transaction=self._transaction)
+        return snapshot.to_dict() if snapshot.exists else None
+
+    def where(self, collection, field, value):
+        query = self._client.collection(collection).where(field, "==", value)
+        return [(doc.id, doc.to_dict()) for doc in query.stream(transaction=self._transaction)]
+
+    def set(self, collection, doc_id, data):
+        self._transaction.set(self._client.collection(collection).document(doc_id), data)
+
+    def delete(self, collection, doc_id):
+        self._transaction.delete(self._client.collection(collection).document(doc_id))
+
+class FirestoreStorage:
+    """
+    Storage of the API documents in Firestore.
+    """
+
+    name = "firestore"
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, collection, doc_id):
+        """
+        Reads a document.
+
+        Parameters:
+        collection (str): Name of the collection.
+        doc_id (str): ID of the document.
+
+        Returns:
+        dict or None: The document, or None if it does not exist.
+        """
+        snapshot = self.client.collection(collection).document(doc_id).get()
+        return snapshot.to_dict() if snapshot.exists else None
+
+    def where(self, collection, field, value):
+        """
+        Reads every document of a collection whose field is equal to a value, ordered by ID.
+
+        Parameters:
+        collection (str): Name of the collection.
+        field (str): Name of the field.
+        value: Value of the field.
+
+        Returns:
+        list: (ID, document) pairs.
+        """
+        query = self.client.collection(collection).where(field, "==", value).get()
+        return [(doc.id, doc.to_dict()) for doc in query]
+
+    def stream(self, collection, field, value, order_by=None, start_after=None, limit=None, fields=None):
+        """
+        Iterates over the documents of a collection whose field is equal to a value as they arrive, without loading
+        them all in memory. Ordering by another field needs a composite index (field, order_by) in Firestore
+        (see firestore.indexes.json); the ID breaks ties between documents with the same order_by value.
+
+        Parameters:
+        collection (str): Name of the collection.
+        field (str): Name of the field.
+        value: Value of the field.
+        order_by (str, optional): Field to order by (ascending). Defaults to the document ID.
+        start_after (tuple, optional): (order_by value, ID) of the last document of the previous page, only the
+            documents after it are returned. Needs order_by.
+        limit (int, optional): Maximum number of documents.
+        fields (list, optional): Only return these fields of each document.
+
+        Yields:
+        tuple: (ID, document) pairs.
+        """
+        query = self.client.collection(collection).where(field, "==", value)
+        if order_by is not None:
+            query = query.order_by(order_by).order_by("__name__")
+            if start_after is not None:
+                value, doc_id = start_after
+                query = query.start_after({order_by: value, "__name__": self.client.collection(collection).document(doc_id)})
+        if limit is not None:
+            query = query.limit(limit)
+        if fields is not None:
+            query = query.select(fields)
+        for doc in query.stream():
+            yield doc.id, doc.to_dict()
+
+    def add(self, collection, data):
+        """
+        Creates a document with a generated ID.
+
+        Parameters:
+        collection (str): Name of the collection.
+        data (dict): The document.
+
+        Returns:
+        str: ID of the new document.
+        """
+        doc_ref = self.client.collection(collection).document()
+        doc_ref.set(data)
+        return doc_ref.id
+
+    def set(self, collection, doc_id, data):
+        """
+        Creates or replaces a document.
+
+        Parameters:
+        collection (str): Name of the collection.
+        doc_id (str): ID of the document.
+        data (dict): The document.
+        """
+        self.client.collection(collection).document(doc_id).set(data)
+
+    def update(self, collection, doc_id, data):
+        """
+        Updates some fields of an existing document.
+
+        Parameters:
+        collection (str): Name of the collection.
+        doc_id (str): ID of the document.
+        data (dict): The fields to update.
+
+        Returns:
+        bool: False if the document does not exist.
+        """
+        from google.api_core.exceptions import NotFound
+
+        # A single request: Firestore only applies an update if the document exists
+        try:
+            self.client.collection(collection).document(doc_id).update(data)
+        except NotFound:
+            return False
+        return True
+
+    def delete(self, collection, doc_id):
+        """
+        Deletes an existing document.
+
+        Parameters:
+        collection (str): Name of the collection.
+        doc_id (str): ID of the document.
+
+        Returns:
+        bool: False if the document does not exist.
+        """
+        from google.api_core.exceptions import NotFound
+
+        # A single request: the delete only applies if the document exists
+        try:
+            self.client.collection(collection).document(doc_id).delete(option=self.client.write_option(exists=True))
+        except NotFound:
+            return False
+        return True
+
+    def delete_where(self, collection, field, value, batch_size=DELETE_BATCH_SIZE, workers=DELETE_WORKERS):
+        """
+        Deletes every document of a collection whose field is equal to a value. Only the document references are
+        read (key-only projection), streamed and deleted in write batches, several of them committed at once.
+
+        Parameters:
+        collection (str): Name of the collection.
+        field (str): Name of the field.
+        value: Value of the field.
+        batch_size (int, optional): Documents per write batch, at most 500.
+        workers (int, optional): Write batches committed at the same time.
+
+        Yields:
+        list: IDs of the documents deleted by each write batch, as the batches are committed.
+        """
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+        query = self.client.collection(collection).where(field, "==", value).select(["__name__"])
+
+        def commit(references):
+            batch = self.client.batch()
+            for reference in references:
+                batch.delete(reference)
+            batch.commit()
+            return [reference.id for reference in references]
+
+        # Leaving the executor waits for the batches in flight, also when the caller stops early
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-delete") as executor:
+            pending = set()
+            references = []
+            for snapshot in query.stream():
+                references.append(snapshot.reference)
+                if len(references) < batch_size:
+                    continue
+                pending.add(executor.submit(commit, references))
+                references = []
+
+                # Keep at most `workers` batches in flight while the query is still streaming
+                if len(pending) >= workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+
+            if references:
+                pending.add(executor.submit(commit, references))
+            for future in as_completed(pending):
+                yield future.result()
+
+    def run_transaction(self, function):
+        """
+        Runs a function in a transaction, retrying it if another client changes what it read.
+
+        Parameters:
+        function (callable): Receives a FirestoreTransaction and returns the result.
+
+        Returns:
+        The result of the function.
+        """
+        from google.cloud import firestore  # Only needed when a transaction runs
+
+        @firestore.transactional
+        def run(transaction):
+            return function(FirestoreTransaction(self.client, transaction))
+
+        return run(self.client.transaction())
+
+    def ping(self):
+        """
+        Opens the connection to Firestore.
+        """
+        # Any call opens the gRPC channel, reading a document that does not exist is the cheapest one
+        self.client.collection("user").document("warmup").get(timeout=10)
+
+def create_backend():
+    """
+    Creates the storage selected by settings.STORAGE_BACKEND: "firestore" (default) or "sqlite", a local
+    database file at settings.SQLITE_STORAGE_PATH that needs no network.
+
+    Returns:
+    FirestoreStorage or SqliteStorage: The storage.
+
+    Raises:
+    ValueError: If the backend is not known.
+    """
+    backend = getattr(settings, "STORAGE_BACKEND", "firestore")
+    if backend == "firestore":
+        return FirestoreStorage(db.resolve())
+    if backend == "sqlite":
+        from core.services.sqliteStorage import SqliteStorage
+        return SqliteStorage(settings.SQLITE_STORAGE_PATH)
+    raise ValueError(f"Unknown storage backend '{backend}'.")
+
+def create_storage():
+    """
+    Creates the storage used by the API: the backend of create_backend behind the read-through document cache,
+    unless settings.DOCUMENT_CACHE_ENABLED is off.
+
+    Returns:
+    CachedStorage, FirestoreStorage or SqliteStorage: The storage.
+    """
+    backend = create_backend()
+    if not getattr(settings, "DOCUMENT_CACHE_ENABLED", True):
+        return backend
+
+    from core.services.documentCache import CachedStorage
+    return CachedStorage(backend)
+
+# Storage of the user, financialPlan, history, tracking and projection_stats documents
+storage = LazyService(create_storage)
@@ -0,0 +1,58 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Stage timings of the current request, in milliseconds. None when no request is being timed.
+_timings = ContextVar("stage_timings", default=None)
+
+def start_timing():
+    """
+    Starts collecting stage timings for the current request (or thread).
+
+    Returns:
+    Token: Token to pass to stop_timing.
+    """
+    return _timings.set({})
+
+def stop_timing(token):
+    """
+    Stops collecting stage timings and returns what was collected.
+
+    Parameters:
+    token (Token): Token returned by start_timing.
+
+    Returns:
+    dict: Maps each stage name to its accumulated duration in milliseconds.
+    """
+    timings = _timings.get() or {}
+    _timings.reset(token)
+    return timings
+
+def get_timings():
+    """
+    Returns the stage timings collected so far for the current request.
+
+    Returns:
+    dict or None: Maps each stage name to its accumulated duration in milliseconds, or None when not collecting.
+    """
+    return _timings.get()
+
+@contextmanager
+def timed(stage):
+    """
+    Measures the code inside the `with` block as a stage of the current request. Durations of a stage that runs
+    several times (e.g. once per model) are added up. Does nothing when timings are not being collected.
+
+    Parameters:
+    stage (str): Name of the stage.
+    """
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - start) * 1000
@@ -0,0 +1,167 @@
+import threading
+import time
+from django.conf import settings
+
+# Synthetic requests used to run the plan and projection code paths once before real traffic arrives
+WARMUP_PLANS = [
+    {
+        "income": 3000,
+        "last_saving": 0,
+        "expenses": [
+            {"type": "housing", "expense": 900},
+            {"type": "food", "expense": 400},
+            {"type": "transportation", "expense": 150},
+            {"type": "health", "expense": 80},
+            {"type": "university", "expense": 500},
+            {"type": "non-essential", "expense": 200}
+        ],
+        "goal": 5000,
+        "duration": 12,
+        "goal_name": "warmup"
+    },
+    {
+        "income": 1200,
+        "last_saving": 100,
+        "expenses": [
+            {"type": "housing", "expense": 0},
+            {"type": "food", "expense": 300},
+            {"type": "transportation", "expense": 60},
+            {"type": "health", "expense": 40},
+            {"type": "university", "expense": 250},
+            {"type": "non-essential", "expense": 150}
+        ],
+        "goal": 1000,
+        "duration": 6,
+        "goal_name": "warmup"
+    }
+]
+WARMUP_SERIES = [
+    {"months": [1, 2, 3], "progress": [100, 210, 330], "duration": 12, "poly_degree": 1},
+    {"months": [1, 2, 3, 4, 5], "progress": [50, 120, 160, 260, 300], "duration": 24, "poly_degree": 3}
+]
+
+WARMUP_RETRY_DELAY = 5  # Seconds before the failed steps can be run again, doubled after each failed run
+WARMUP_RETRY_MAX_DELAY = 300  # Maximum seconds between two runs of the failed steps
+
+_lock = threading.Lock()
+_state = {"status": "pending", "steps": {}, "errors": {}, "failures": 0}  # Warmup state of this process
+_thread = None
+_retry_at = 0  # time.monotonic() before which the failed steps are not run again
+
+def warm_artifacts():
+    """
+    Loads the plan artifacts and fails if any of them is broken.
+    """
+    from core.services.planArtifacts import bundle_errors, registry
+    errors = bundle_errors(registry.preload())
+    if errors:
+        raise RuntimeError("; ".join(error["message"] for error in errors))
+
+def warm_plans():
+    """
+    Creates the synthetic plans.
+    """
+    from core.services.planModel import create_plan
+    for user_data in WARMUP_PLANS:
+        result = create_plan(user_data)
+        if result["status"] not in ("success", "calc_error"):
+            raise RuntimeError(result.get("details") or result["message"])
+
+def warm_projections():
+    """
+    Generates the synthetic projections.
+    """
+    from core.services.regresionModel import get_points
+    for data in WARMUP_SERIES:
+        result = get_points(data)
+        if result["status"] != "success":
+            raise RuntimeError(result.get("details") or result["message"])
+
+def warm_storage():
+    """
+    Opens the connection to the document storage (Firestore or the local SQLite database).
+    """
+    from core.services.storage import storage
+    storage.ping()
+
+WARMUP_STEPS = [
+    ("artifacts", warm_artifacts),
+    ("plans", warm_plans),
+    ("projections", warm_projections),
+    ("storage", warm_storage)
+]
+
+def run_warmup(skip=(), only=None):
+    """
+    Runs every warmup step in this process: loads the plan artifacts, runs a few synthetic plans and projections
+    so lazy imports, caches and BLAS are initialized, and opens the connection to the document storage.
+
+    Parameters:
+    skip (list, optional): Names of the steps not to run (e.g. "storage" without network access).
+    only (list, optional): Names of the only steps to run, e.g. the ones that failed in the previous run. The
+        durations of the other steps of the previous run are kept.
+
+    Returns:
+    dict: The warmup state:
+        - "status" (str): "ready" if every step succeeded, otherwise "failed".
+        - "steps" (dict): Duration of each step in milliseconds.
+        - "errors" (dict): Error message of each failed step.
+        - "failures" (int): Number of failed runs in a row.
+    """
+    global _retry_at
+    with _lock:
+        steps = {name: duration for name, duration in _state["steps"].items() if only is not None and name not in only}
+        _state.update(status="running")
+
+    errors = {}
+    for name, step in WARMUP_STEPS:
+        if name in skip or (only is not None and name not in only):
+            continue
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            errors[name] = str(e)
+        steps[name] = round((time.perf_counter() - start) * 1000, 3)
+
+    with _lock:
+        steps = {name: steps[name] for name, _ in WARMUP_STEPS if name in steps}
+        failures = _state["failures"] + 1 if errors else 0
+        _state.update(status="failed" if errors else "ready", steps=steps, errors=errors, failures=failures)
+        if errors:
+            _retry_at = time.monotonic() + min(WARMUP_RETRY_DELAY * 2 ** (failures - 1), WARMUP_RETRY_MAX_DELAY)
+        return dict(_state)
+
+def start_warmup():
+    """
+    Starts the warmup of this process in a background thread, unless it has already been started. If it failed,
+    only the failed steps are run again, once the retry delay since the last failed run has passed (the delay
+    doubles after each failed run). Steps listed in settings.WARMUP_SKIP are not run.
+    """
+    global _thread
+    with _lock:
+        only = None
+        if _thread is not None:
+            # Already running, succeeded, or failed too recently
+            if _thread.is_alive() or _state["status"] != "failed" or time.monotonic() < _retry_at:
+                return
+            only = list(_state["errors"])
+        _state["status"] = "running"
+        _thread = threading.Thread(
+            target=run_warmup,
+            kwargs={"skip": getattr(settings, "WARMUP_SKIP", ()), "only": only},
+            name="warmup",
+            daemon=True
+        )
+        _thread.start()
+
+def get_warmup_state():
+    """
+    Returns the warmup state of this process.
+
+    Returns:
+    dict: The status ("pending", "running", "ready" or "failed"), the duration of each step, the errors and
+        the number of failed runs in a row.
+    """
+    with _lock:
+        return dict(_state)
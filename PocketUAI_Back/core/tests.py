@@ -1,3 +1,446 @@
-from django.test import TestCase
+import json
+import os
+import random
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from google.api_core.exceptions import NotFound
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import PolynomialFeatures
+
+from benchmarks.models_benchmark import load_series, load_users
+from core.services import planModel
+from core.services.aprioriRules import compile_rules
+from core.services.cache import LRUCache
+from core.services.decisionTree import compile_tree, predict_tree
+from core.services.documentCache import CachedStorage
+from core.services.planArtifacts import load_model, load_rules, registry
+from core.services.planCache import plan_cache
+from core.services.planSolver import adjust_and_verify_plans, plans_to_matrix, solver_result_to_dict
+from core.services.planSweep import sweep_plans
+from core.services.polynomialFit import evaluate_polynomial, fit_polynomial
+from core.services.regresionModel import get_points
+from core.services.regressionStats import fit_from_stats, stats_from_history
+from core.services.sqliteStorage import SqliteStorage
+from core.services.storage import FirestoreStorage
+from core.views import history as history_views
+from core.views import models as models_views
+
+SAMPLE_SIZE = 300  # Users of student_spending.csv drawn for the parity tests
+SAMPLE_SEED = 0
+
+def sample_users(size=SAMPLE_SIZE, seed=SAMPLE_SEED):
+    # Seeded sample of the plan requests built from the student spending dataset
+    users = load_users(seed=seed)
+    return random.Random(seed).sample(users, size)
+
+def baseline_classify_apriori(user_data, rules_df):
+    # Row-by-row matcher the compiled rules replaced, kept as the reference
+    features = [user_data["income"]] + [expense.get("expense", 0) for expense in user_data["expenses"]]
+    feature_names = ["income"] + [expense.get("type", 0).lower().replace(" ", "_") for expense in user_data["expenses"]]
+    features_df = pd.DataFrame([features], columns=feature_names)
+
+    class_counts = {}
+    for _, row in rules_df.iterrows():
+        clase = row["LeftHand"].split(" / ")[1].strip("',()")
+        all_match = True
+        for item in row["RightHand"].strip("()").split(", "):
+            if "/" in item:
+                feature_range = item.strip("''").split("/")
+                if len(feature_range) == 2:
+                    feature = feature_range[0].strip()
+                    min_val, max_val = map(float, feature_range[1].split("-"))
+                    if feature in features_df.columns:
+                        user_value = features_df.at[0, feature]
+                        if not (min_val <= user_value <= max_val):
+                            all_match = False
+        if all_match:
+            class_counts[clase] = class_counts.get(clase, 0) + 1
+
+    if class_counts:
+        return {"status": "successful", "prediction": [max(class_counts, key=class_counts.get)]}
+    return {"status": "calc_error", "message": "No matching class found."}
+
+def baseline_get_points(data):
+    # scikit-learn projection the closed-form fit replaced, kept as the reference
+    months = np.array(data["months"])
+    poly = PolynomialFeatures(degree=data.get("poly_degree", 1))
+    model = LinearRegression().fit(poly.fit_transform(months.reshape(-1, 1)), np.array(data["progress"]))
+    all_months = np.arange(0, data["duration"] + 1).reshape(-1, 1)
+    return model.predict(poly.transform(all_months))
+
+class AprioriParityTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.rules_df = load_rules()
+        cls.compiled = compile_rules(cls.rules_df)
+        cls.users = sample_users(100)
+
+    def assertSameClassification(self, users):
+        batch = planModel.classify_batch_apriori(users, self.compiled)
+        for user, batch_result in zip(users, batch):
+            expected = baseline_classify_apriori(user, self.rules_df)
+            self.assertEqual(planModel.classify_data_apriori(user, self.compiled), expected)
+            self.assertEqual(batch_result, expected)
+
+    def test_matches_row_by_row_matcher(self):
+        self.assertSameClassification(self.users)
+
+    def test_missing_features_are_ignored(self):
+        # Rules on a feature the user does not provide are matched on their other features only
+        users = []
+        for i, user in enumerate(self.users):
+            dropped = ["housing", "food", "transportation"][i % 3]
+            users.append({**user, "expenses": [expense for expense in user["expenses"] if expense["type"] != dropped]})
+        self.assertSameClassification(users)
+
+    def test_ties_go_to_the_first_matching_rule(self):
+        # Both classes match two rules: class 2 wins because its first matching rule comes first
+        rules_df = pd.DataFrame({
+            "LeftHand": ["('Class / 2',)", "('Class / 1',)", "('Class / 1',)", "('Class / 2',)"],
+            "RightHand": [
+                "('food / 0.0-100.0', 'income / 0.0-5000.0')",
+                "('food / 0.0-100.0', 'housing / 0.0-10.0')",
+                "('housing / 0.0-10.0', 'income / 0.0-5000.0')",
+                "('housing / 0.0-10.0', 'food / 0.0-100.0')"
+            ]
+        })
+        user = {"income": 1000, "expenses": [{"type": "food", "expense": 50}, {"type": "housing", "expense": 5}]}
+        expected = baseline_classify_apriori(user, rules_df)
+        self.assertEqual(expected["prediction"], ["2"])
+        self.assertEqual(planModel.classify_data_apriori(user, compile_rules(rules_df)), expected)
+
+    def test_no_matching_rule(self):
+        user = {**self.users[0], "income": 1e9}
+        user["expenses"] = [{**expense, "expense": 1e9} for expense in user["expenses"]]
+        self.assertEqual(planModel.classify_data_apriori(user, self.compiled)["status"], "calc_error")
+        self.assertEqual(baseline_classify_apriori(user, self.rules_df)["status"], "calc_error")
+
+class DecisionTreeParityTests(SimpleTestCase):
+    def test_predict_tree_matches_sklearn(self):
+        model = load_model()
+        compiled = compile_tree(model, planModel.DT_FEATURE_ORDER)
+        matrix = np.array([planModel.extract_dt_features(user, compiled.features)["features"] for user in sample_users()])
+
+        expected = model.predict(pd.DataFrame(matrix, columns=planModel.DT_FEATURE_ORDER))
+        np.testing.assert_array_equal(predict_tree(compiled, matrix), expected)
+        for row, label in zip(matrix[:20], expected[:20]):
+            np.testing.assert_array_equal(predict_tree(compiled, row), [label])
+
+class PlanSolverParityTests(SimpleTestCase):
+    def test_batch_solver_matches_adjust_and_verify_plan(self):
+        bundle = registry.preload()
+        assigned = []
+        for user in sample_users():
+            result = planModel.assign_plan(user, bundle.plans, model=bundle.model, class_model="dt")
+            self.assertEqual(result["status"], "successful")
+            assigned.append((result["assigned_plan"], user["income"], user["goal"] - user["last_saving"], user["duration"]))
+
+        solved = adjust_and_verify_plans(
+            plans_to_matrix([plan for plan, _, _, _ in assigned]),
+            [income for _, income, _, _ in assigned],
+            [goal for _, _, goal, _ in assigned],
+            [duration for _, _, _, duration in assigned],
+            bundle.minimums
+        )
+
+        for i, (plan, income, goal, duration) in enumerate(assigned):
+            expected = planModel.adjust_and_verify_plan(dict(plan), income, goal, duration, bundle.minimums)
+            actual = solver_result_to_dict(solved, i, plan, duration)
+            with self.subTest(i=i):
+                self.assertEqual(actual.keys(), expected.keys())
+                self.assertEqual(actual["status"], expected["status"])
+                self.assertEqual(actual.get("actual_duration"), expected.get("actual_duration"))
+                self.assertEqual(actual.get("months"), expected.get("months"))
+                self.assertEqual(actual.get("message"), expected.get("message"))
+                for key in ("plan", "diff"):
+                    if key in expected:
+                        self.assertEqual(list(actual[key]), list(expected[key]))
+                        np.testing.assert_allclose(list(actual[key].values()), list(expected[key].values()), rtol=1e-9, atol=1e-9)
+
+class PolynomialFitParityTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.series = load_series(sample_users(), seed=SAMPLE_SEED)
+
+    def test_get_points_matches_sklearn(self):
+        for data in self.series:
+            expected = baseline_get_points(data)
+            result = get_points(data)
+            self.assertEqual(result["status"], "success")
+            self.assertEqual(result["data"]["all_months"], list(range(data["duration"] + 1)))
+            np.testing.assert_allclose(result["data"]["projection"], expected, rtol=1e-6, atol=1e-6 * np.abs(expected).max())
+
+    def test_fewer_points_than_coefficients(self):
+        # Underdetermined fits use the minimum-norm solution, as LinearRegression does
+        data = {"months": [1, 2], "progress": [100, 250], "duration": 6, "poly_degree": 3}
+        np.testing.assert_allclose(get_points(data)["data"]["projection"], baseline_get_points(data), rtol=1e-6, atol=1e-6)
+
+    def test_fit_from_stats_matches_fit_polynomial(self):
+        rng = random.Random(SAMPLE_SEED)
+        for data in self.series:
+            history = [{"month": month, "saving": rng.uniform(0, 500)} for month in data["months"]]
+            rng.shuffle(history)
+            months = sorted(entry["month"] for entry in history)
+            progress = np.cumsum([entry["saving"] for entry in sorted(history, key=lambda entry: entry["month"])])
+
+            stats = stats_from_history(history)
+            degree = data["poly_degree"]
+            x = np.arange(0, data["duration"] + 1)
+            expected = evaluate_polynomial(fit_polynomial(months, progress, degree), x)
+            actual = evaluate_polynomial(fit_from_stats(stats, degree), x)
+            np.testing.assert_allclose(actual, expected, rtol=1e-6, atol=1e-6 * np.abs(expected).max())
+
+class FakeFirestoreDocument:
+    def __init__(self, client, doc_id):
+        self.client = client
+        self.doc_id = doc_id
+
+    def update(self, data):
+        if self.doc_id not in self.client.documents:
+            raise NotFound("No document to update")
+        self.client.documents[self.doc_id].update(data)
+
+    def delete(self, option=None):
+        # Deletes with an exists precondition fail on missing documents, as in Firestore
+        if self.doc_id not in self.client.documents:
+            if option is not None:
+                raise NotFound("No document to delete")
+            return
+        del self.client.documents[self.doc_id]
+
+class FakeFirestoreClient:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def collection(self, name):
+        return self
+
+    def document(self, doc_id):
+        return FakeFirestoreDocument(self, doc_id)
+
+    def write_option(self, **kwargs):
+        return kwargs
+
+class StorageContractTests(SimpleTestCase):
+    def backends(self):
+        # Each backend holds the single document user/a
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        sqlite = SqliteStorage(os.path.join(directory.name, "storage.sqlite3"))
+        cached = CachedStorage(SqliteStorage(os.path.join(directory.name, "cached.sqlite3")), cache=LRUCache(maxsize=10), ttls={"user": 60})
+        for storage in (sqlite, cached):
+            storage.set("user", "a", {"x": 1})
+        cached.get("user", "a")
+        return [FirestoreStorage(FakeFirestoreClient({"a": {"x": 1}})), sqlite, cached]
+
+    def test_update_returns_false_on_missing_document(self):
+        for storage in self.backends():
+            with self.subTest(storage=type(storage).__name__):
+                self.assertFalse(storage.update("user", "missing", {"x": 2}))
+                self.assertTrue(storage.update("user", "a", {"x": 2}))
+
+    def test_delete_returns_false_on_missing_document(self):
+        for storage in self.backends():
+            with self.subTest(storage=type(storage).__name__):
+                self.assertFalse(storage.delete("user", "missing"))
+                self.assertTrue(storage.delete("user", "a"))
+                self.assertFalse(storage.delete("user", "a"))
+
+class HistoryPaginationTests(SimpleTestCase):
+    MONTHS = [1, 2, 2, 3, 3, 3, 4]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = SqliteStorage(os.path.join(directory.name, "storage.sqlite3"))
+        for i, month in enumerate(self.MONTHS):
+            self.storage.add("history", {"month": month, "expenses": 0, "saving": i, "id_user": "u1"})
+
+        patches = [
+            mock.patch.object(history_views, "storage", self.storage),
+            mock.patch("core.views.auth.verify_session", lambda cookie: {"uid": cookie})
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def get_history(self, body):
+        request = RequestFactory().post("/history", data=json.dumps(body), content_type="application/json")
+        request.COOKIES["session"] = "u1"
+        response = history_views.get_history(request, user_id="u1")
+        if response.streaming:
+            return response.status_code, json.loads(b"".join(response.streaming_content))
+        return response.status_code, json.loads(response.content)
+
+    def test_pages_keep_entries_with_duplicate_months(self):
+        for stream in (None, "json"):
+            for limit in (1, 2, 3):
+                with self.subTest(stream=stream, limit=limit):
+                    savings = []
+                    cursor = None
+                    while True:
+                        body = {"limit": limit, "fields": ["saving"]}
+                        if stream:
+                            body["stream"] = stream
+                        if cursor is not None:
+                            body["start_after"] = cursor
+                        status, page = self.get_history(body)
+                        self.assertEqual(status, 200)
+                        savings += [entry["saving"] for entry in page["history"]]
+                        cursor = page["next_start_after"]
+                        if cursor is None:
+                            break
+                    # Every entry exactly once; entries of the same month come in ID order
+                    self.assertEqual(sorted(savings), list(range(len(self.MONTHS))))
+                    self.assertEqual([self.MONTHS[saving] for saving in savings], self.MONTHS)
+
+    def test_storage_cursor_is_month_and_id(self):
+        first = list(self.storage.stream("history", "id_user", "u1", order_by="month", limit=2))
+        doc_id, entry = first[-1]
+        rest = list(self.storage.stream("history", "id_user", "u1", order_by="month", start_after=(entry["month"], doc_id)))
+        self.assertEqual([entry["month"] for _, entry in first + rest], self.MONTHS)
+
+    def test_month_only_cursor_is_rejected(self):
+        status, body = self.get_history({"limit": 2, "start_after": 2})
+        self.assertEqual((status, body["status"]), (400, "invalid_data"))
+
+def plan_request(income, last_saving, goal, duration, **expenses):
+    return {
+        "income": income,
+        "last_saving": last_saving,
+        "expenses": [{"type": category.replace("_", "-"), "expense": amount} for category, amount in expenses.items()],
+        "goal": goal,
+        "duration": duration,
+        "goal_name": "test"
+    }
+
+class PlanWithoutPlanRegressionTests(SimpleTestCase):
+    # adjust_and_verify_plan reports "successful" without a plan when the goal can be reached but the minimum
+    # expenses are not met. The baseline returned it as {"status": "success", "plan": None} and create_plan
+    # answered server_error when it compared that None duration with the other model's. Neither case occurs in
+    # student_spending.csv, so the requests are pinned here.
+
+    # Neither model has a plan: calc_error
+    NO_PLAN = plan_request(10840.0, 100, 1000, 24, housing=721.0, health=159.0, food=230.0, university=867.5,
+                           non_essential=230.0, transportation=76.0)
+    # Only the Apriori plan exists: it is selected
+    APRIORI_ONLY = plan_request(12220.0, 100, 1000, 12, university=706.0, transportation=180.0, housing=862.0,
+                                health=87.0, food=127.0, non_essential=213.0)
+    # Only the Decision Tree plan exists: it is selected
+    DT_ONLY = plan_request(14400.0, 1000, 5000, 24, health=81.0, non_essential=157.0, food=284.0,
+                           university=884.8333333333334, housing=661.0, transportation=95.0)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.bundle = registry.preload()
+
+    def adjust(self, user, class_model):
+        assigned = planModel.assign_user_plan(user, class_model, self.bundle)
+        return planModel.adjust_and_verify_plan(
+            dict(assigned["assigned_plan"]), assigned["income"], assigned["goal"], assigned["duration"], self.bundle.minimums
+        )
+
+    def assertWithoutPlan(self, user, class_model):
+        adjusted = self.adjust(user, class_model)
+        self.assertEqual(adjusted["status"], "successful")
+        self.assertNotIn("plan", adjusted)
+        self.assertEqual(planModel.manage_plan(user, class_model, self.bundle), {
+            "status": "calc_error",
+            "message": "Cannot adjust the plan to meet minimum expenses."
+        })
+
+    def create_plan(self, user):
+        plan_cache.clear()
+        result = planModel.create_plan(user)
+        self.assertEqual(planModel.create_plans([user]), [result])
+        return result
+
+    def test_no_plan_is_a_calc_error(self):
+        self.assertWithoutPlan(self.NO_PLAN, "dt")
+        self.assertWithoutPlan(self.NO_PLAN, "apriori")
+        self.assertEqual(self.create_plan(self.NO_PLAN), {
+            "status": "calc_error",
+            "message": "Cannot adjust the plan to meet minimum expenses."
+        })
+
+    def test_model_with_a_plan_is_selected(self):
+        for user, without_plan, with_plan in ((self.APRIORI_ONLY, "dt", "apriori"), (self.DT_ONLY, "apriori", "dt")):
+            with self.subTest(selected=with_plan):
+                self.assertWithoutPlan(user, without_plan)
+                expected = planModel.manage_plan(user, with_plan, self.bundle)
+                self.assertEqual(expected["status"], "success")
+                self.assertIsNotNone(expected["plan"])
+                self.assertEqual(self.create_plan(user), expected)
+
+    def test_format_plan_result_without_plan(self):
+        result = planModel.format_plan_result({"status": "successful", "months": 4, "message": "You can achieve the savings goal in 4 months."})
+        self.assertEqual(result, {"status": "calc_error", "message": "Cannot adjust the plan to meet minimum expenses."})
+
+class SweepValidationTests(SimpleTestCase):
+    USER = plan_request(20000, 0, 3000, 12, housing=900, food=300)
+
+    def setUp(self):
+        patch = mock.patch("core.views.auth.verify_session", lambda cookie: {"uid": cookie})
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def post_sweep(self, body):
+        request = RequestFactory().post("/sweep", data=json.dumps(body), content_type="application/json")
+        request.COOKIES["session"] = "u1"
+        response = models_views.get_plan_sweep(request)
+        return response.status_code, json.loads(response.content)
+
+    def test_invalid_grids_are_rejected(self):
+        for name, values in (
+            ("durations", [0]), ("durations", [-3]), ("durations", [True]), ("durations", [2.5]), ("durations", [float("nan")]),
+            ("goals", [0]), ("goals", [-1000]), ("goals", [True]), ("goals", [float("nan")]), ("goals", [float("inf")])
+        ):
+            with self.subTest(name=name, values=values):
+                self.assertEqual(sweep_plans(self.USER, **{name: values})["status"], "invalid_data")
+                status, body = self.post_sweep({**self.USER, name: values})
+                self.assertEqual((status, body["status"]), (400, "invalid_data"))
+
+    def test_invalid_goal_is_rejected(self):
+        for goal in (0, True, float("nan")):
+            with self.subTest(goal=goal):
+                status, body = self.post_sweep({**self.USER, "goal": goal})
+                self.assertEqual((status, body["status"]), (400, "invalid_data"))
+
+    def test_valid_grids(self):
+        status, body = self.post_sweep({**self.USER, "durations": [6, 12], "goals": [2500.5, 3000]})
+        self.assertEqual((status, body["status"]), (200, "success"))
+        self.assertEqual(len(body["data"]["rows"]), 2 * 2 * len(registry.preload().plans))
+
+
+class CacheStatsAccessTests(SimpleTestCase):
+    def post_stats(self, claims):
+        request = RequestFactory().post("/cache_stats")
+        request.COOKIES["session"] = "cookie"
+        with mock.patch("core.views.auth.verify_session", lambda cookie: {"uid": "u1", **claims}):
+            response = models_views.get_cache_stats(request)
+        return response.status_code, json.loads(response.content)
+
+    @override_settings(DEBUG=False)
+    def test_regular_users_are_rejected(self):
+        for claims in ({}, {"admin": False}, {"admin": "true"}):
+            with self.subTest(claims=claims):
+                status, body = self.post_stats(claims)
+                self.assertEqual((status, body["status"]), (403, "unauthorized"))
+
+    @override_settings(DEBUG=False)
+    def test_admins_get_only_the_result_caches(self):
+        status, body = self.post_stats({"admin": True})
+        self.assertEqual(status, 200)
+        self.assertEqual(set(body["data"]), {"plans", "projections"})
+
+    @override_settings(DEBUG=True)
+    def test_debug_is_open(self):
+        status, body = self.post_stats({})
+        self.assertEqual((status, set(body["data"])), (200, {"plans", "projections"}))
@@ -1,5 +1,5 @@
 from django.urls import path  # Import Django's path function for defining URL patterns
-from core.views import financialPlan, auth, history, tracking, user, models  # Import view modules for various API endpoints
+from core.views import financialPlan, auth, history, tracking, user, models, health  # Import view modules for various API endpoints
 
 # Define URL patterns for the API endpoints
 urlpatterns = [
@@ -36,5 +36,14 @@ urlpatterns = [
 
     # Model-Related Endpoints
     path("api/models/create_new_plan/", models.create_new_plan, name="create_new_plan"),  # Generate a new financial plan using models
+    path("api/models/create_new_plans/", models.create_new_plans, name="create_new_plans"),  # Generate financial plans for many users in one request
+    path("api/models/plan_sweep/", models.get_plan_sweep, name="get_plan_sweep"),  # Evaluate every plan over a grid of durations and goals
+    path("api/models/cache_stats/", models.get_cache_stats, name="get_cache_stats"),  # Retrieve the hit and miss counters of the plan and projection caches (DEBUG or admin only)
     path("api/models/get_points_regression/", models.get_points_regression, name="get_points_regression"),  # Retrieve regression points for progress tracking
+    path("api/models/get_points_regression_batch/", models.get_points_regression_batch, name="get_points_regression_batch"),  # Retrieve regression points for many series in one request
+    path("api/models/user_projection/", models.get_user_projection, name="get_user_projection"),  # Retrieve the projection of the logged-in user from their stored history statistics
+
+    # Health Endpoints
+    path("api/health/live/", health.liveness, name="liveness"),  # Check that the process is up
+    path("api/health/ready/", health.readiness, name="readiness"),  # Check that the worker has finished its warmup
 ]
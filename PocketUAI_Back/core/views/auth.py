@@ -1,6 +1,10 @@
+from dataclasses import dataclass
+from functools import wraps
 from django.shortcuts import render
-from django.http import JsonResponse
-from core.services.firebase import db, firebase_auth
+from django.http import HttpResponse, JsonResponse
+from core.services.firebase import firebase_auth
+from core.services.storage import storage
+from core.services.sessionCache import invalidate_session, revoke_user_sessions, verify_session
 import datetime
 import json
 
@@ -110,7 +114,7 @@ def create_user(request):
             }
             
             # Store user data in Firestore
-            db.collection("user").document(user.uid).set(user_data)
+            storage.set("user", user.uid, user_data)
 
             # Return success response with user details
             return JsonResponse({
@@ -232,8 +236,8 @@ def check_cookie_user(request):
             }, status=400)
 
         try:
-            # Verify the session cookie using Firebase Authentication
-            decoded_claims = firebase_auth.verify_session_cookie(session_cookie, check_revoked=True)
+            # Verify the session cookie using Firebase Authentication (cached after the first verification)
+            decoded_claims = verify_session(session_cookie)
             
             # If the session cookie is valid, return a success response with the user claims
             return JsonResponse({
@@ -271,7 +275,8 @@ def logout_user(request):
     """
     Logs out the user by removing the session cookie from the client's browser. A success message is returned
     confirming the session has been closed successfully. If the request method is not POST, an error message 
-    indicating an invalid method is returned.
+    indicating an invalid method is returned. The cached verification of the cookie is dropped, and with
+    {"all_devices": true} in the body every session of the user is revoked.
 
     Parameters:
     request (HttpRequest): The HTTP request that triggers the logout process.
@@ -280,9 +285,34 @@ def logout_user(request):
     JsonResponse: A JSON response containing the status of the logout process.
                   Possible statuses:
                   - "success" if the session was closed successfully.
+                  - "server_error" if the sessions could not be revoked.
                   - "invalid_method" if the request method is not POST.
     """
     if request.method == "POST":
+        session_cookie = request.COOKIES.get('session')
+
+        # The body is optional: a plain logout only closes this browser's session
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            data = {}
+
+        try:
+            if isinstance(data, dict) and data.get("all_devices") and session_cookie:
+                # Revoke every session of the user, not only this browser's
+                revoke_user_sessions(verify_session(session_cookie)["uid"])
+        except firebase_auth.InvalidSessionCookieError:
+            pass  # The session is already invalid, there is nothing to revoke
+        except Exception as e:
+            return JsonResponse({
+                "status": "server_error",
+                "message": "An error occurred while revoking the sessions.",
+                "details": str(e)
+            }, status=500)
+
+        # Stop accepting the cached verification of this cookie
+        invalidate_session(session_cookie)
+
         # Create the response confirming successful logout
         response = JsonResponse({
             'status': 'success',
@@ -300,12 +330,137 @@ def logout_user(request):
             "message": "Invalid request method."
         }, status=405)
 
+@dataclass(frozen=True)
+class SessionClaims:
+    """
+    Claims of a verified session, attached to the request as request.claims.
+
+    Attributes:
+    uid (str): ID of the user.
+    email (str or None): Email of the user, if the session has one.
+    claims (dict): Every decoded claim of the session cookie.
+    """
+    uid: str
+    email: str | None
+    claims: dict
+
+# Bodies of the authentication errors, encoded once instead of on every rejected request
+AUTH_ERROR_BODIES = {
+    "no_cookie": json.dumps({
+        "status": "no_cookie",
+        "message": "Session cookie not found. Please log in again."
+    }).encode(),
+    "invalid_cookie": json.dumps({
+        "status": "invalid_cookie",
+        "message": "Session cookie is invalid or expired. Please log in again."
+    }).encode(),
+    "missing_uid": json.dumps({
+        "status": "invalid_cookie",
+        "message": "Failed to retrieve user ID from session."
+    }).encode(),
+    "unauthorized": json.dumps({
+        "status": "unauthorized",
+        "message": "User ID does not match the session."
+    }).encode()
+}
+
+def auth_error_response(error, status, clear_cookie=False):
+    """
+    Builds the response of an authentication error from its precomputed body.
+
+    Parameters:
+    error (str): Key of the body in AUTH_ERROR_BODIES.
+    status (int): HTTP status of the response.
+    clear_cookie (bool, optional): Whether the session cookie is removed from the browser. Defaults to False.
+
+    Returns:
+    HttpResponse: The JSON response.
+    """
+    response = HttpResponse(AUTH_ERROR_BODIES[error], status=status, content_type="application/json")
+    if clear_cookie:
+        response.set_cookie('session', '', expires=0)
+    return response
+
+def authenticate_request(request, id=None):
+    """
+    Verifies the session cookie of a request and attaches its claims to it as request.claims. If an ID is
+    provided, the user ID in the session must match it.
+
+    Parameters:
+    request (HttpRequest): The HTTP request containing the session cookie to verify.
+    id (str, optional): The user ID to check against the session. Defaults to None.
+
+    Returns:
+    HttpResponse or None: None if the session is valid, otherwise the error response to return.
+                  Possible statuses:
+                  - "no_cookie" (400) if the session cookie is not found in the request,
+                  - "invalid_cookie" (401) if the session cookie is invalid, expired or has no user ID,
+                  - "unauthorized" (403) if the user ID in the session does not match the provided ID,
+                  - "unknown" (500) if an unexpected error occurs during the process.
+    """
+    request.claims = None
+
+    # Retrieve the session cookie from the request
+    session_cookie = request.COOKIES.get('session')
+    if not session_cookie:
+        return auth_error_response("no_cookie", 400)
+
+    try:
+        # Verify the session cookie using Firebase Authentication (cached after the first verification)
+        decoded_claims = verify_session(session_cookie)
+    except firebase_auth.InvalidSessionCookieError:
+        # If the session cookie is invalid or expired, clear the cookie
+        return auth_error_response("invalid_cookie", 401, clear_cookie=True)
+    except Exception as e:
+        # If an unexpected error occurs, return a server error response
+        return JsonResponse({
+            "status": "unknown",
+            "message": "An unexpected error occurred. Please try again later.",
+            "details": str(e)
+        }, status=500)
+
+    uid = decoded_claims.get("uid")
+    if uid is None:
+        return auth_error_response("missing_uid", 401)
+
+    # If an ID is provided and it doesn't match the user ID in the session, clear the cookie
+    if id and uid != id:
+        return auth_error_response("unauthorized", 403, clear_cookie=True)
+
+    request.claims = SessionClaims(uid=uid, email=decoded_claims.get("email"), claims=decoded_claims)
+    return None
+
+def require_session(method, id_kwarg=None):
+    """
+    Decorator for views that need a valid session. The session is verified before the view runs and its claims
+    are available as request.claims; if it is not valid, the error response is returned without calling the view.
+    Requests with another method go straight to the view so it answers them with its own "invalid_method" error.
+
+    Parameters:
+    method (str): HTTP method handled by the view (e.g. "POST").
+    id_kwarg (str, optional): Name of the URL argument that must match the user ID in the session. Defaults to None.
+
+    Returns:
+    function: The decorator.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method == method:
+                error_response = authenticate_request(request, kwargs.get(id_kwarg) if id_kwarg else None)
+                if error_response is not None:
+                    return error_response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
 def check_cookie_for_functions(request, id=None):
     """
     Verifies the validity of the session cookie. If the session cookie is valid, the user's claims are returned
     with a success message. If an ID is provided, the function checks if the user ID in the session matches the 
     provided ID; if they don't match, an unauthorized response is returned. If the session cookie is invalid or 
     expired, the user is prompted to log in again. In case of unexpected errors, a server error response is returned.
+    Views use the require_session decorator instead, which gives them the claims without decoding this response.
 
     Parameters:
     request (HttpRequest): The HTTP request containing the session cookie to verify.
@@ -322,49 +477,13 @@ def check_cookie_for_functions(request, id=None):
                   - "unknown" if an unexpected error occurs during the process,
                   - "invalid_method" if the request method is not POST.
     """
-    # Retrieve the session cookie from the request
-    session_cookie = request.COOKIES.get('session')
-
-    # If no session cookie is found, return an error response
-    if not session_cookie:
-        return JsonResponse({
-            "status": "no_cookie",
-            "message": "Session cookie not found. Please log in again."
-        }, status=400)
+    error_response = authenticate_request(request, id)
+    if error_response is not None:
+        return error_response
 
-    try:
-        # Verify the session cookie using Firebase Authentication
-        decoded_claims = firebase_auth.verify_session_cookie(session_cookie, check_revoked=True)
-
-        # If an ID is provided and it doesn't match the user ID in the session, return an unauthorized response
-        if id and decoded_claims.get("uid") != id:
-            response = JsonResponse({
-                "status": "unauthorized",
-                "message": "User ID does not match the session."
-            }, status=403)
-            response.set_cookie('session', '', expires=0)
-            return response
-
-        # If the session is valid, return the user claims with a success message
-        return JsonResponse({
-            "status": "success",
-            "message": "Session is valid",
-            "user": decoded_claims
-        }, status=200)
-
-    except firebase_auth.InvalidSessionCookieError:
-        # If the session cookie is invalid or expired, return an error response and clear the cookie
-        response = JsonResponse({
-            "status": "invalid_cookie",
-            "message": "Session cookie is invalid or expired. Please log in again."
-        }, status=401)
-        response.set_cookie('session', '', expires=0)
-        return response
-
-    except Exception as e:
-        # If an unexpected error occurs, return a server error response
-        return JsonResponse({
-            "status": "unknown",
-            "message": "An unexpected error occurred. Please try again later.",
-            "details": str(e)
-        }, status=500)
+    # If the session is valid, return the user claims with a success message
+    return JsonResponse({
+        "status": "success",
+        "message": "Session is valid",
+        "user": request.claims.claims
+    }, status=200)
@@ -1,10 +1,11 @@
 from django.shortcuts import render  # Provides shortcuts for view rendering
 from django.http import JsonResponse  # Handles JSON responses for API endpoints
-from core.services.firebase import db  # Firebase database client for Firestore
-from core.views.auth import check_cookie_for_functions  # Middleware to verify user authentication through cookies
+from core.services.storage import storage  # Document storage (Firestore or local SQLite)
+from core.views.auth import require_session  # Decorator to verify user authentication through cookies
 from datetime import datetime  # Module for handling date and time
 import json  # Library for handling JSON data
 
+@require_session("POST", id_kwarg="plan_id")
 def get_plan(request, plan_id):
     """
     Handles retrieving a specific financial plan by its unique ID.
@@ -19,24 +20,15 @@ def get_plan(request, plan_id):
     # Check if the request is a POST request
     if request.method == "POST":
         try:
-            # Check if the user is authorized using cookies
-            cookie_response = check_cookie_for_functions(request, plan_id)
-            response_data = json.loads(cookie_response.content)
-            
-            # If cookie validation fails, return the cookie_response
-            if response_data.get("status") != "success":
-                return cookie_response
-            
-            # Reference the specific financial plan in the Firestore database
-            plans_ref = db.collection("financialPlan").document(plan_id)
-            query = plans_ref.get()
+            # Read the specific financial plan from the database
+            plan = storage.get("financialPlan", plan_id)
 
             # Check if the financial plan exists in the database
-            if query.exists:
+            if plan is not None:
                 return JsonResponse({
                     "status": "success",
                     "message": "Plan retrieved successfully.",
-                    "financialPlan": query.to_dict() # Return the plan data as a dictionary
+                    "financialPlan": plan # Return the plan data
                 }, status=200)
             else:
                 return JsonResponse({
@@ -58,6 +50,7 @@ def get_plan(request, plan_id):
             "message": "Invalid request method." # Notify the user of the incorrect request method
         }, status=405)
 
+@require_session("POST")
 def add_plan(request):
     """
     Handles the creation of a new financial plan for a user.
@@ -74,21 +67,8 @@ def add_plan(request):
             # Parse the request body to extract the JSON data
             data = json.loads(request.body)
             
-            # Check if the user is authorized by validating the cookie
-            cookie_response = check_cookie_for_functions(request)
-            response_data = json.loads(cookie_response.content)
-            
-            # Return an error response if cookie validation fails
-            if response_data.get("status") != "success":
-                return cookie_response
-            
-            # Extract the user ID from the cookie response
-            user_id = response_data.get("user", {}).get("uid")
-            if user_id is None:
-                return JsonResponse({
-                    "status": "invalid_cookie",
-                    "message": "Failed to retrieve user ID from session."  # Notify if the user ID is missing
-                }, status=401)
+            # Retrieve the user ID from the verified session
+            user_id = request.claims.uid
                 
             # Extract required fields from the request data
             expenses = data.get("expenses")
@@ -115,17 +95,14 @@ def add_plan(request):
                 "date": date,
             }
                 
-            # Reference to the user's document in the financialPlan Firestore collection
-            doc_ref = db.collection("financialPlan").document(user_id)
-            
-            # Save the financial plan data in Firestore
-            doc_ref.set(plan_data)
+            # Save the financial plan data as the user's document in the financialPlan collection
+            storage.set("financialPlan", user_id, plan_data)
             
             # Return a success response with the document ID
             return JsonResponse({
                 "status": "success",
                 "message": "Plan added successfully.",
-                "id": doc_ref.id  # Provide the document ID for reference
+                "id": user_id  # Provide the document ID for reference
             }, status=201)
         
         # Handle any server errors during the process
@@ -143,6 +120,7 @@ def add_plan(request):
         }, status=405)
 
 
+@require_session("PUT", id_kwarg="plan_id")
 def update_plan(request, plan_id):
     """
     Updates an existing financial plan for a specific user.
@@ -160,14 +138,6 @@ def update_plan(request, plan_id):
             # Parse the request body to extract the JSON data
             data = json.loads(request.body)
             
-            # Validate user authorization by checking the session cookie
-            cookie_response = check_cookie_for_functions(request, plan_id)
-            response_data = json.loads(cookie_response.content)
-            
-            # Return an error response if cookie validation fails
-            if response_data.get("status") != "success":
-                return cookie_response
-            
             # Define the list of fields that are allowed to be updated
             allowed_fields = ["expenses", "saving", "duration", "goal_name", "goal", "date"]
             
@@ -181,15 +151,8 @@ def update_plan(request, plan_id):
                     "message": "No valid fields provided for the update."  # Notify if no updatable fields are found
                 }, status=400)
             
-            # Reference the financial plan document by ID
-            doc_ref = db.collection("financialPlan").document(plan_id)
-            
-            # Check if the document exists in Firestore
-            doc = doc_ref.get()
-
-            if doc.exists:
-                # Update the document with the filtered data
-                doc_ref.update(filtered_data)
+            # Update the financial plan document with the filtered data if it exists
+            if storage.update("financialPlan", plan_id, filtered_data):
                 return JsonResponse({
                     "status": "success",
                     "message": "Plan updated successfully."  # Confirm the successful update
@@ -215,6 +178,7 @@ def update_plan(request, plan_id):
         }, status=405)
 
 
+@require_session("DELETE", id_kwarg="plan_id")
 def delete_plan(request, plan_id):
     """
     Deletes a specific financial plan from the database.
@@ -229,21 +193,8 @@ def delete_plan(request, plan_id):
     # Ensure the request method is DELETE
     if request.method == "DELETE":
         try:
-            # Validate user authorization by checking the session cookie
-            cookie_response = check_cookie_for_functions(request, plan_id)
-            response_data = json.loads(cookie_response.content)
-            
-            # Return an error response if cookie validation fails
-            if response_data.get("status") != "success":
-                return cookie_response
-            
-            # Reference the financial plan document by ID
-            doc_ref = db.collection("financialPlan").document(plan_id)
-            doc = doc_ref.get()
-
-            if doc.exists:
-                # Delete the document if it exists
-                doc_ref.delete()
+            # Delete the financial plan document if it exists
+            if storage.delete("financialPlan", plan_id):
                 return JsonResponse({
                     "status": "success",
                     "message": f"Plan with ID '{plan_id}' deleted successfully."  # Confirm the successful deletion
@@ -0,0 +1,35 @@
+from django.http import JsonResponse
+from core.services.warmup import get_warmup_state, start_warmup
+
+def liveness(request):
+    """
+    Reports that the process is up. Does no work so it stays cheap under load.
+
+    Args:
+        request (HttpRequest): The HTTP request.
+
+    Returns:
+        JsonResponse: Always 200.
+    """
+    return JsonResponse({"status": "alive"}, status=200)
+
+def readiness(request):
+    """
+    Reports whether this worker has finished its warmup and can receive traffic. If the warmup has not been
+    started yet (WARMUP_ON_STARTUP disabled), it is started by the first readiness probe; if it failed, the
+    probes run the failed steps again, waiting longer after each failed run (see start_warmup).
+
+    Args:
+        request (HttpRequest): The HTTP request.
+
+    Returns:
+        JsonResponse: 200 with the warmup timings once the warmup succeeded, otherwise 503 with its state.
+    """
+    state = get_warmup_state()
+    if state["status"] in ("pending", "failed"):
+        start_warmup()
+        state = get_warmup_state()
+
+    if state["status"] == "ready":
+        return JsonResponse({"status": "ready", "data": state}, status=200)
+    return JsonResponse({"status": "not_ready", "message": "The warmup has not finished.", "data": state}, status=503)
@@ -1,43 +1,129 @@
 from django.shortcuts import render
-from django.http import JsonResponse
-from core.services.firebase import db
-from core.views.auth import check_cookie_for_functions
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from core.services.storage import storage
+from core.views.auth import require_session
+from core.services.regressionStats import invalidate_stats, record_saving
 import json
 
+HISTORY_FIELDS = ("month", "expenses", "saving", "id_user")  # Fields of a history entry that can be selected
+MAX_HISTORY_PAGE = 1000  # Maximum number of history entries per page
+HISTORY_STREAM_FORMATS = ("ndjson", "json")  # Formats of a streamed history response
+
+def validate_history_options(data):
+    """
+    Checks the optional pagination, field mask and streaming options of a history request.
+
+    Args:
+        data (dict): The request body.
+
+    Returns:
+        dict or None: An error response body if the options are invalid, otherwise None.
+    """
+    if not isinstance(data, dict):
+        return {
+            "status": "invalid_data",
+            "message": "The request body must be a JSON object."
+        }
+
+    limit = data.get("limit")
+    if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or not 1 <= limit <= MAX_HISTORY_PAGE):
+        return {
+            "status": "invalid_data",
+            "message": f"'limit' must be an integer from 1 to {MAX_HISTORY_PAGE}."
+        }
+
+    start_after = data.get("start_after")
+    if start_after is not None and (
+        not isinstance(start_after, dict)
+        or isinstance(start_after.get("month"), bool) or not isinstance(start_after.get("month"), (int, float))
+        or not isinstance(start_after.get("id"), str)
+    ):
+        return {
+            "status": "invalid_data",
+            "message": "'start_after' must be the 'next_start_after' cursor of the previous page: {\"month\": number, \"id\": string}."
+        }
+
+    fields = data.get("fields")
+    if fields is not None and (not isinstance(fields, list) or not fields or any(field not in HISTORY_FIELDS for field in fields)):
+        return {
+            "status": "invalid_data",
+            "message": f"'fields' must be a non-empty list of: {', '.join(HISTORY_FIELDS)}."
+        }
+
+    if data.get("stream") is not None and data.get("stream") not in HISTORY_STREAM_FORMATS:
+        return {
+            "status": "invalid_data",
+            "message": f"'stream' must be one of: {', '.join(HISTORY_STREAM_FORMATS)}."
+        }
+
+    return None
+
 # This function retrieves the user's history based on the user ID.
 # It accepts POST requests and expects to get the history of a user from the "history" collection in the database.
+# Optional body fields:
+#   - "limit" and "start_after": cursor pagination ordered by month, then by ID. The response includes
+#     "next_start_after", the {"month", "id"} cursor to send to get the next page (None on the last page).
+#     On Firestore this needs the composite index of firestore.indexes.json.
+#   - "fields": only return these fields of each entry (plus its "id").
+#   - "stream": "ndjson" (one entry per line) or "json" (the usual response, written entry by entry), so the
+#     entries are sent while they are read instead of being loaded in memory first.
 
+@require_session("POST", id_kwarg="user_id")
 def get_history(request, user_id):
     # Check if the HTTP request method is POST
     if request.method == "POST":
         try:
-            # Check user session and validate the request
-            cookie_response = check_cookie_for_functions(request, user_id)
-            response_data = json.loads(cookie_response.content)
-            
-            # If the session is not valid, return the response from the cookie check
-            if response_data.get("status") != "success":
-                return cookie_response
-            
-            # Query the database for history of the specified user
-            history_ref = db.collection("history")
-            query = history_ref.where("id_user", "==", user_id).get()
-            
-            # Check if the query returns any history data
-            if query:
-                # Convert the retrieved documents to dictionaries and return them in the response
-                history_list = [{**doc.to_dict(), "id": doc.id} for doc in query]
-                return JsonResponse({
-                    "status": "success",
-                    "message": "History retrieved successfully.",
-                    "history": history_list
-                }, status=200)
-            else:
+            # Parse the optional options from the request body
+            data = json.loads(request.body) if request.body else {}
+            validation_error = validate_history_options(data)
+            if validation_error:
+                return JsonResponse(validation_error, status=400)
+
+            limit = data.get("limit")
+            start_after = data.get("start_after")
+            fields = data.get("fields")
+            paginated = limit is not None or start_after is not None
+
+            # Query the database for history of the specified user. Pages are ordered by month and ID, which are
+            # also the cursor, so the month is read even if it is not one of the requested fields.
+            selected = fields if fields is None or not paginated or "month" in fields else fields + ["month"]
+            entries = storage.stream(
+                "history", "id_user", user_id,
+                order_by="month" if paginated else None, limit=limit, fields=selected,
+                start_after=(start_after["month"], start_after["id"]) if start_after is not None else None
+            )
+            history = (({**entry, "id": doc_id}, {"month": entry.get("month"), "id": doc_id}) for doc_id, entry in entries)
+            if selected is not fields:
+                history = (({key: value for key, value in entry.items() if key != "month"}, cursor) for entry, cursor in history)
+
+            # Check if the query returns any history data (a page after the last one is just empty)
+            first = next(history, None)
+            if first is None and start_after is None:
                 # If no history data is found for the user, return a "not found" response
                 return JsonResponse({
                     "status": "not_found",
                     "message": "No history found for the user."
                 }, status=404)
+
+            history = history_with_first(first, history)
+
+            # Send the entries while they are read
+            if data.get("stream") == "ndjson":
+                return StreamingHttpResponse(stream_history_ndjson(history), content_type="application/x-ndjson")
+            if data.get("stream") == "json":
+                return StreamingHttpResponse(stream_history_json(history, limit, paginated), content_type="application/json")
+
+            # Return the entries in the response
+            history = list(history)
+            response = {
+                "status": "success",
+                "message": "History retrieved successfully.",
+                "history": [entry for entry, _ in history]
+            }
+            if paginated:
+                response["next_start_after"] = history[-1][1] if limit is not None and len(history) == limit else None
+            return JsonResponse(response, status=200)
         except Exception as e:
             # Handle any errors that occur during the process and return a server error response
             return JsonResponse({
@@ -52,7 +138,79 @@ def get_history(request, user_id):
             "message": "Invalid request method."
         }, status=405)
 
+def history_with_first(first, history):
+    """
+    Puts back the entry read to check that the history is not empty in front of the remaining ones.
+
+    Parameters:
+    first (tuple or None): The first (entry, cursor) pair.
+    history (generator): The remaining pairs.
 
+    Yields:
+    tuple: Every (entry, cursor) pair.
+    """
+    if first is not None:
+        yield first
+    yield from history
+
+def stream_history_ndjson(history):
+    """
+    Writes history entries as NDJSON, one entry per line.
+
+    Parameters:
+    history (generator): The (entry, cursor) pairs.
+
+    Yields:
+    bytes: One line per entry. An error is reported as a last line with its status, since the status code has
+        already been sent.
+    """
+    try:
+        for entry, _ in history:
+            yield json.dumps(entry, cls=DjangoJSONEncoder).encode() + b"\n"
+    except Exception as e:
+        yield json.dumps({
+            "status": "server_error",
+            "message": "An error occurred while retrieving the history.",
+            "details": str(e)
+        }).encode() + b"\n"
+
+def stream_history_json(history, limit=None, paginated=False):
+    """
+    Writes the usual history response entry by entry. The status is written after the entries, so an error
+    found while reading them can still be reported in it.
+
+    Parameters:
+    history (generator): The (entry, cursor) pairs.
+    limit (int, optional): Size of the page, to report the cursor of the next page.
+    paginated (bool, optional): Whether the cursor of the next page is reported.
+
+    Yields:
+    bytes: Pieces of the JSON response.
+    """
+    yield b'{"history": ['
+    count = 0
+    cursor = None
+    try:
+        for entry, cursor in history:
+            yield (b", " if count else b"") + json.dumps(entry, cls=DjangoJSONEncoder).encode()
+            count += 1
+        closing = {
+            "status": "success",
+            "message": "History retrieved successfully."
+        }
+        if paginated:
+            closing["next_start_after"] = cursor if limit is not None and count == limit else None
+    except Exception as e:
+        closing = {
+            "status": "server_error",
+            "message": "An error occurred while retrieving the history.",
+            "details": str(e)
+        }
+    # Append the remaining fields to the object opened above
+    yield b"], " + json.dumps(closing).encode()[1:]
+
+
+@require_session("POST")
 def add_history(request):
     
     # This function adds a new history record for a user.
@@ -64,21 +222,8 @@ def add_history(request):
             # Parse the incoming JSON request body
             data = json.loads(request.body)
             
-            # Check user session and validate the request
-            cookie_response = check_cookie_for_functions(request)
-            response_data = json.loads(cookie_response.content)
-            
-            # If the session is not valid, return the response from the cookie check
-            if response_data.get("status") != "success":
-                return cookie_response
-            
-            # Retrieve user ID from session data
-            user_id = response_data.get("user", {}).get("uid")
-            if user_id is None:
-                return JsonResponse({
-                    "status": "invalid_cookie",
-                    "message": "Failed to retrieve user ID from session."
-                }, status=401)
+            # Retrieve the user ID from the verified session
+            user_id = request.claims.uid
                 
             # Retrieve the required fields from the request data
             month = data.get("month")
@@ -101,14 +246,19 @@ def add_history(request):
             }
             
             # Add the history data to the "history" collection in the database
-            doc_ref = db.collection("history").document()
-            doc_ref.set(history_data)
+            history_id = storage.add("history", history_data)
+
+            # Add the month to the user's projection statistics (dropped if it cannot be appended)
+            try:
+                record_saving(storage, user_id, month, saving)
+            except Exception:
+                invalidate_stats(storage, user_id)
             
             # Return a success response with the document ID
             return JsonResponse({
                 "status": "success",
                 "message": "History added successfully.",
-                "id": doc_ref.id
+                "id": history_id
             }, status=201)
         except Exception as e:
             # Handle any errors that occur during the process and return a server error response
@@ -125,8 +275,9 @@ def add_history(request):
         }, status=405)
 
 # This function updates an existing history record for a user.
-# It accepts PUT requests and updates a specific history entry in the "history" collection in the database.
+# It accepts PUT requests and updates a specific history entry of the session's user in the "history" collection in the database.
 
+@require_session("PUT")
 def update_history(request, history_id):
     # Check if the HTTP request method is PUT
     if request.method == "PUT":
@@ -134,14 +285,6 @@ def update_history(request, history_id):
             # Parse the incoming JSON request body
             data = json.loads(request.body)
             
-            # Check user session and validate the request
-            cookie_response = check_cookie_for_functions(request)
-            response_data = json.loads(cookie_response.content)
-            
-            # If the session is not valid, return the response from the cookie check
-            if response_data.get("status") != "success":
-                return cookie_response
-            
             # Define allowed fields for updating the history record
             allowed_fields = ["month", "expenses", "saving"]
             
@@ -155,19 +298,23 @@ def update_history(request, history_id):
                     "message": "No valid fields provided for the update."
                 }, status=400)
             
-            # Retrieve the history document using the provided history ID
-            doc_ref = db.collection("history").document(history_id)
-            doc = doc_ref.get()
+            # Read the owner and update the entry in one transaction, so only the session's user can change it
+            def update_owned(transaction):
+                history = transaction.get("history", history_id)
+                if history is None or history.get("id_user") != request.claims.uid:
+                    return False
+                transaction.set("history", history_id, {**history, **filtered_data})
+                return True
 
-            # If the document exists, update it with the filtered data
-            if doc.exists:
-                doc_ref.update(filtered_data)
+            if storage.run_transaction(update_owned):
+                # The owner's accumulated savings changed, the projection statistics are rebuilt on the next projection
+                invalidate_stats(storage, request.claims.uid)
                 return JsonResponse({
                     "status": "success",
                     "message": "History updated successfully."
                 }, status=200)
             else:
-                # If the document does not exist, return a "not found" response
+                # If the document does not exist or belongs to another user, return a "not found" response
                 return JsonResponse({
                     "status": "not_found",
                     "message": "History not found."
@@ -187,35 +334,32 @@ def update_history(request, history_id):
         }, status=405)
 
 
+@require_session("DELETE")
 def delete_history(request, history_id):
     
     # This function deletes a specific history record for a user.
-    # It accepts DELETE requests and removes a history entry from the "history" collection in the database.
+    # It accepts DELETE requests and removes a history entry of the session's user from the "history" collection in the database.
 
     # Check if the HTTP request method is DELETE
     if request.method == "DELETE":
         try:
-            # Check user session and validate the request
-            cookie_response = check_cookie_for_functions(request)
-            response_data = json.loads(cookie_response.content)
-            
-            # If the session is not valid, return the response from the cookie check
-            if response_data.get("status") != "success":
-                return cookie_response
-            
-            # Retrieve the history document using the provided history ID
-            doc_ref = db.collection("history").document(history_id)
-            doc = doc_ref.get()
+            # Read the owner and delete the entry in one transaction, so only the session's user can delete it
+            def delete_owned(transaction):
+                history = transaction.get("history", history_id)
+                if history is None or history.get("id_user") != request.claims.uid:
+                    return False
+                transaction.delete("history", history_id)
+                return True
 
-            # If the document exists, delete it
-            if doc.exists:
-                doc_ref.delete()
+            if storage.run_transaction(delete_owned):
+                # The owner's accumulated savings changed, the projection statistics are rebuilt on the next projection
+                invalidate_stats(storage, request.claims.uid)
                 return JsonResponse({
                     "status": "success",
                     "message": "History deleted successfully."
                 }, status=200)
             else:
-                # If the document does not exist, return a "not found" response
+                # If the document does not exist or belongs to another user, return a "not found" response
                 return JsonResponse({
                     "status": "not_found",
                     "message": "History not found."
@@ -234,41 +378,47 @@ def delete_history(request, history_id):
             "message": "Invalid request method."
         }, status=405)
         
+@require_session("DELETE", id_kwarg="user_id")
 def delete_all_history(request, user_id):
     
     # This function deletes all history records for a specific user.
     # It accepts DELETE requests and removes all history entries for a given user from the "history" collection in the database.
+    # The entries are deleted in write batches committed concurrently. With ?progress=true the response is streamed
+    # as NDJSON, one {"status": "in_progress", "deleted": n} line per batch and the final result as the last line.
 
     # Check if the HTTP request method is DELETE
     if request.method == "DELETE":
         try:
-            # Check user session and validate the request
-            cookie_response = check_cookie_for_functions(request, user_id)
-            response_data = json.loads(cookie_response.content)
-            
-            # If the session is not valid, return the response from the cookie check
-            if response_data.get("status") != "success":
-                return cookie_response
-            
-            # Retrieve all history records for the user using the provided user ID
-            history_ref = db.collection("history")
-            query = history_ref.where("id_user", "==", user_id).get()
+            # Start deleting the user's history records, one batch of IDs at a time
+            batches = storage.delete_where("history", "id_user", user_id)
+            first_batch = next(batches, None)
 
             # If no history records are found for the user, return a "not found" response
-            if not query:
+            if first_batch is None:
                 return JsonResponse({
                     "status": "not_found",
                     "message": "No history found for the user."
                 }, status=404)
-                
-            # Delete all history records for the user
-            for doc in query:
-                doc.reference.delete()
+
+            if request.GET.get("progress") in ("1", "true"):
+                return StreamingHttpResponse(
+                    stream_history_deletion(user_id, first_batch, batches),
+                    content_type="application/x-ndjson"
+                )
+
+            # Delete the remaining history records for the user
+            deleted = len(first_batch)
+            try:
+                for batch in batches:
+                    deleted += len(batch)
+            finally:
+                invalidate_stats(storage, user_id)
                 
             # Return a success response after deleting all history records
             return JsonResponse({
                 "status": "success",
-                "message": f"All history records for user '{user_id}' were deleted successfully."
+                "message": f"All history records for user '{user_id}' were deleted successfully.",
+                "deleted": deleted
             }, status=200)
             
         except Exception as e:
@@ -284,3 +434,38 @@ def delete_all_history(request, user_id):
             "status": "invalid_method",
             "message": "Invalid request method."
         }, status=405)
+
+def stream_history_deletion(user_id, first_batch, batches):
+    """
+    Finishes deleting a user's history while reporting the progress as NDJSON lines.
+
+    Parameters:
+    user_id (str): ID of the user.
+    first_batch (list): IDs deleted by the first batch.
+    batches (generator): The remaining batches of storage.delete_where.
+
+    Yields:
+    bytes: One line per deleted batch, then the final result. Errors are reported on the last line since the
+        status code has already been sent.
+    """
+    deleted = len(first_batch)
+    try:
+        yield json.dumps({"status": "in_progress", "deleted": deleted}).encode() + b"\n"
+        for batch in batches:
+            deleted += len(batch)
+            yield json.dumps({"status": "in_progress", "deleted": deleted}).encode() + b"\n"
+        yield json.dumps({
+            "status": "success",
+            "message": f"All history records for user '{user_id}' were deleted successfully.",
+            "deleted": deleted
+        }).encode() + b"\n"
+    except Exception as e:
+        yield json.dumps({
+            "status": "server_error",
+            "message": "An error occurred while deleting the history.",
+            "details": str(e),
+            "deleted": deleted
+        }).encode() + b"\n"
+    finally:
+        # Also runs if the client disconnects and the remaining batches are abandoned
+        invalidate_stats(storage, user_id)
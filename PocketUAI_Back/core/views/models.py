@@ -1,11 +1,121 @@
-from core.services.planModel import create_plan
-from core.services.regresionModel import get_points 
-from django.shortcuts import render
-from django.http import JsonResponse
-from core.views.auth import check_cookie_for_functions
-from datetime import datetime
+from core.services.planModel import create_plan, create_plans
+from core.services.regresionModel import get_points_batch, get_points_from_stats, is_valid_degree
+from core.services.regressionStats import load_stats
+from core.services.storage import storage
+from core.services.polynomialFit import MAX_DEGREE, MIN_DEGREE
+from core.services.planSweep import sweep_plans, validate_sweep_grid
+from core.services.planCache import plan_cache
+from core.services.projectionCache import get_points_json, projection_cache
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from core.views.auth import require_session
 import json
 
+MAX_BATCH_PLANS = 5000  # Maximum number of users accepted by create_new_plans in a single request
+MAX_BATCH_SERIES = 1000  # Maximum number of series accepted by get_points_regression_batch in a single request
+
+def validate_plan_data(data):
+    """
+    Checks that the data for a new financial plan has every required field and expense category.
+
+    Args:
+        data (dict): The financial plan data sent by the user.
+
+    Returns:
+        dict or None: An error response body if the data is invalid, otherwise None.
+    """
+    # Define required fields and check for any missing ones
+    required_fields = ["income", "last_saving", "expenses", "goal", "duration", "goal_name"]
+    missing_fields = [field for field in required_fields if field not in data]
+    if missing_fields:
+        return {
+            "status": "missing_fields",
+            "message": f"Required fields are missing: {', '.join(missing_fields)}."
+        }
+
+    # Validate expense categories to ensure all required types are present
+    expenses = data.get("expenses", [])
+    expense_categories = {"food", "housing", "health", "transportation", "university", "non-essential"}
+
+    received_categories = set()
+    for expense in expenses:
+        if "type" in expense:
+            received_categories.add(expense["type"])
+
+    missing_categories = [category for category in expense_categories if category not in received_categories]
+
+    if missing_categories:
+        return {
+            "status": "missing_expenses",
+            "message": f"Missing expense categories: {', '.join(missing_categories)}."
+        }
+
+    return None
+
+def validate_projection_data(data):
+    """
+    Checks that the data for a projection has its required fields, matching lengths and a supported degree.
+
+    Args:
+        data (dict): The projection data sent by the user.
+
+    Returns:
+        dict or None: An error response body if the data is invalid, otherwise None.
+    """
+    # Extract necessary data fields for regression
+    months = data.get("months")
+    progress = data.get("progress")
+    duration = data.get("duration")
+
+    # Validate required fields
+    if months is None or progress is None or duration is None:
+        return {
+            "status": "missing_fields",
+            "message": "Required fields are missing: months, progress, duration."
+        }
+
+    # Ensure 'months' and 'progress' lists have the same length
+    if len(months) != len(progress):
+        return {
+            "status": "invalid_data",
+            "message": "Length of 'months' and 'progress' must match."
+        }
+
+    # Only degrees the projection engine supports are accepted
+    if not is_valid_degree(data.get("poly_degree", 1)):
+        return {
+            "status": "invalid_data",
+            "message": f"'poly_degree' must be an integer from {MIN_DEGREE} to {MAX_DEGREE}."
+        }
+
+    return validate_goal_options(data)
+
+def validate_goal_options(data):
+    """
+    Checks the optional goal fields of a projection.
+
+    Args:
+        data (dict): The projection data sent by the user.
+
+    Returns:
+        dict or None: An error response body if the options are invalid, otherwise None.
+    """
+    goal = data.get("goal")
+    if goal is not None and (isinstance(goal, bool) or not isinstance(goal, (int, float))):
+        return {
+            "status": "invalid_data",
+            "message": "'goal' must be a number."
+        }
+
+    if not isinstance(data.get("include_projection", True), bool):
+        return {
+            "status": "invalid_data",
+            "message": "'include_projection' must be a boolean."
+        }
+
+    return None
+
+@require_session("POST")
 def create_new_plan(request):
     """
     Handles the creation of a new financial plan based on user input.
@@ -18,17 +128,131 @@ def create_new_plan(request):
     """
     if request.method == "POST":
         try:
-            # Validate the user's session with cookie check
-            cookie_response = check_cookie_for_functions(request)
-            response_data = json.loads(cookie_response.content)
-            if response_data.get("status") != "success":
-                return cookie_response
-            
             # Parse the JSON request body
             data = json.loads(request.body)
 
-            # Define required fields and check for any missing ones
-            required_fields = ["income", "last_saving", "expenses", "goal", "duration", "goal_name"]
+            # Validate required fields and expense categories
+            validation_error = validate_plan_data(data)
+            if validation_error:
+                return JsonResponse(validation_error, status=400)
+
+            # Create the financial plan using the service function
+            plan_response = create_plan(data)            
+            return JsonResponse(plan_response, status=200)
+
+        except Exception as e:
+            # Handle any server errors
+            return JsonResponse({
+                "status": "server_error",
+                "message": "An error occurred while creating the user.",
+                "details": str(e)
+            }, status=500)
+    else:
+        # Return 405 if the request method is invalid
+        return JsonResponse({
+            "status": "invalid_method",
+            "message": "Invalid request method."
+        }, status=405)
+   
+   
+@require_session("POST")
+def create_new_plans(request):
+    """
+    Handles the creation of financial plans for many users in a single request.
+
+    The request body must contain a "users" list where every item has the same fields as the body of
+    create_new_plan. Every item is validated and answered on its own, so the response has one result per
+    user with its own status, in the same order as the request.
+
+    Args:
+        request (HttpRequest): The HTTP request containing the list of financial plan data.
+
+    Returns:
+        JsonResponse: A JSON response with the list of results or an error message.
+    """
+    if request.method == "POST":
+        try:
+            # Parse the JSON request body
+            data = json.loads(request.body)
+
+            users = data.get("users") if isinstance(data, dict) else None
+            if not isinstance(users, list):
+                return JsonResponse({
+                    "status": "missing_fields",
+                    "message": "Required fields are missing: users."
+                }, status=400)
+
+            if len(users) > MAX_BATCH_PLANS:
+                return JsonResponse({
+                    "status": "invalid_data",
+                    "message": f"A maximum of {MAX_BATCH_PLANS} users can be processed per request."
+                }, status=400)
+
+            # Validate every item, only the valid ones are sent to the models
+            results = [None] * len(users)
+            valid_positions = []
+            for i, user_data in enumerate(users):
+                if not isinstance(user_data, dict):
+                    results[i] = {"status": "invalid_data", "message": "Each item must be an object."}
+                    continue
+
+                expenses = user_data.get("expenses", [])
+                if not isinstance(expenses, list) or not all(isinstance(expense, dict) and isinstance(expense.get("type"), str) for expense in expenses):
+                    results[i] = {"status": "invalid_data", "message": "'expenses' must be a list of objects with a 'type'."}
+                    continue
+
+                validation_error = validate_plan_data(user_data)
+                if validation_error:
+                    results[i] = validation_error
+                else:
+                    valid_positions.append(i)
+
+            # Create all the financial plans using the batch service function
+            plans = create_plans([users[i] for i in valid_positions])
+            for i, plan in zip(valid_positions, plans):
+                results[i] = plan
+
+            return JsonResponse({
+                "status": "success",
+                "message": "Plans processed successfully.",
+                "results": results
+            }, status=200)
+
+        except Exception as e:
+            # Handle any server errors
+            return JsonResponse({
+                "status": "server_error",
+                "message": "An error occurred while creating the plans.",
+                "details": str(e)
+            }, status=500)
+    else:
+        # Return 405 if the request method is invalid
+        return JsonResponse({
+            "status": "invalid_method",
+            "message": "Invalid request method."
+        }, status=405)
+
+
+@require_session("POST")
+def get_plan_sweep(request):
+    """
+    Handles the what-if sweep of a user's goal: every plan template is evaluated over a grid of durations and
+    savings goals, returning the feasibility table and the Pareto frontier of duration vs. cut to non-essentials.
+
+    Args:
+        request (HttpRequest): The HTTP request containing the user's income, expenses and goal, and optionally
+            "last_saving", "durations" and "goals" lists to sweep.
+
+    Returns:
+        JsonResponse: A JSON response containing the sweep results or an error message.
+    """
+    if request.method == "POST":
+        try:
+            # Parse the JSON request body
+            data = json.loads(request.body)
+
+            # Validate required fields
+            required_fields = ["income", "expenses", "goal"]
             missing_fields = [field for field in required_fields if field not in data]
             if missing_fields:
                 return JsonResponse({
@@ -36,32 +260,71 @@ def create_new_plan(request):
                     "message": f"Required fields are missing: {', '.join(missing_fields)}."
                 }, status=400)
 
-            # Validate expense categories to ensure all required types are present
-            expenses = data.get("expenses", [])
-            expense_categories = {"food", "housing", "health", "transportation", "university", "non-essential"}
+            # Validate the optional grids
+            durations = data.get("durations")
+            goals = data.get("goals")
+            validation_error = validate_sweep_grid(durations, goals)
+            if validation_error:
+                return JsonResponse(validation_error, status=400)
 
-            received_categories = set()
-            for expense in expenses:
-                if "type" in expense:
-                    received_categories.add(expense["type"])
+            # Compute the sweep using the service function
+            sweep_response = sweep_plans(data, durations=durations, goals=goals)
+            if sweep_response.get("status") == "invalid_data":
+                return JsonResponse(sweep_response, status=400)
 
-            missing_categories = [category for category in expense_categories if category not in received_categories]
+            return JsonResponse(sweep_response, status=200)
 
-            if missing_categories:
-                return JsonResponse({
-                    "status": "missing_expenses",
-                    "message": f"Missing expense categories: {', '.join(missing_categories)}."
-                }, status=400)
+        except Exception as e:
+            # Handle any server errors
+            return JsonResponse({
+                "status": "server_error",
+                "message": "An error occurred while generating the sweep.",
+                "details": str(e)
+            }, status=500)
+    else:
+        # Return 405 if the request method is invalid
+        return JsonResponse({
+            "status": "invalid_method",
+            "message": "Invalid request method."
+        }, status=405)
 
-            # Create the financial plan using the service function
-            plan_response = create_plan(data)            
-            return JsonResponse(plan_response, status=200)
+
+@require_session("POST")
+def get_cache_stats(request):
+    """
+    Handles the retrieval of the hit and miss counters of the plan and projection result caches.
+
+    Only available in DEBUG or to sessions with the "admin" custom claim.
+
+    Args:
+        request (HttpRequest): The HTTP request.
+
+    Returns:
+        JsonResponse: A JSON response containing the statistics of each cache or an error message.
+    """
+    if request.method == "POST":
+        # Reject regular users outside of DEBUG
+        if not settings.DEBUG and request.claims.claims.get("admin") is not True:
+            return JsonResponse({
+                "status": "unauthorized",
+                "message": "Cache statistics are only available to administrators."
+            }, status=403)
+
+        try:
+            return JsonResponse({
+                "status": "success",
+                "message": "Cache statistics retrieved successfully.",
+                "data": {
+                    "plans": plan_cache.stats(),
+                    "projections": projection_cache.stats()
+                }
+            }, status=200)
 
         except Exception as e:
             # Handle any server errors
             return JsonResponse({
                 "status": "server_error",
-                "message": "An error occurred while creating the user.",
+                "message": "An error occurred while retrieving the cache statistics.",
                 "details": str(e)
             }, status=500)
     else:
@@ -70,8 +333,9 @@ def create_new_plan(request):
             "status": "invalid_method",
             "message": "Invalid request method."
         }, status=405)
-   
-   
+
+
+@require_session("POST")
 def get_points_regression(request):
     """
     Handles the retrieval of regression points for a financial plan's progress over months.
@@ -84,44 +348,171 @@ def get_points_regression(request):
     """
     if request.method == "POST":
         try:
-            # Validate the user's session with cookie check
-            cookie_response = check_cookie_for_functions(request)
-            response_data = json.loads(cookie_response.content)
-            if response_data.get("status") != "success":
-                return cookie_response
-            
             # Parse the JSON request body
             data = json.loads(request.body)
             
-            # Extract necessary data fields for regression
-            months = data.get("months")
-            progress = data.get("progress")
-            duration = data.get("duration")
+            # Validate the required fields, their lengths and the degree
+            validation_error = validate_projection_data(data)
+            if validation_error:
+                return JsonResponse(validation_error, status=400)
             
-            # Validate required fields
-            if months is None or progress is None or duration is None:
+            # Compute the regression points using the service function, reusing the encoded answer of an identical request
+            return HttpResponse(get_points_json(data), content_type="application/json", status=200)
+        
+        except Exception as e:
+            # Handle any server errors
+            return JsonResponse({
+                "status": "server_error",
+                "message": "An error occurred while creating the user.",
+                "details": str(e)
+            }, status=500)
+    else:
+        # Return 405 if the request method is invalid
+        return JsonResponse({
+            "status": "invalid_method",
+            "message": "Invalid request method."
+        }, status=405)
+
+
+@require_session("POST")
+def get_points_regression_batch(request):
+    """
+    Handles the projection of many series in a single request.
+
+    The request body must contain a "series" list where every item has the same fields as the body of
+    get_points_regression. Every item is validated and answered on its own, so the response has one result per
+    series with its own status, in the same order as the request.
+
+    Args:
+        request (HttpRequest): The HTTP request containing the list of series.
+
+    Returns:
+        JsonResponse: A JSON response with the list of results or an error message.
+    """
+    if request.method == "POST":
+        try:
+            # Parse the JSON request body
+            data = json.loads(request.body)
+
+            series = data.get("series") if isinstance(data, dict) else None
+            if not isinstance(series, list):
                 return JsonResponse({
                     "status": "missing_fields",
-                    "message": "Required fields are missing: months, progress, duration."
+                    "message": "Required fields are missing: series."
                 }, status=400)
-            
-            # Ensure 'months' and 'progress' lists have the same length
-            if len(months) != len(progress):
+
+            if len(series) > MAX_BATCH_SERIES:
                 return JsonResponse({
                     "status": "invalid_data",
-                    "message": "Length of 'months' and 'progress' must match."
+                    "message": f"A maximum of {MAX_BATCH_SERIES} series can be processed per request."
                 }, status=400)
-            
-            # Compute the regression points using the service function
-            points_response = get_points(data)
-            
+
+            # Validate every item, only the valid ones are sent to the projection service
+            results = [None] * len(series)
+            valid_positions = []
+            for i, item in enumerate(series):
+                if not isinstance(item, dict):
+                    results[i] = {"status": "invalid_data", "message": "Each item must be an object."}
+                    continue
+
+                if not all(isinstance(item.get(field, []), list) for field in ("months", "progress")):
+                    results[i] = {"status": "invalid_data", "message": "'months' and 'progress' must be lists."}
+                    continue
+
+                validation_error = validate_projection_data(item)
+                if validation_error:
+                    results[i] = validation_error
+                else:
+                    valid_positions.append(i)
+
+            # Compute all the projections using the batch service function
+            projections = get_points_batch([series[i] for i in valid_positions])
+            for i, projection in zip(valid_positions, projections):
+                results[i] = projection
+
+            return JsonResponse({
+                "status": "success",
+                "message": "Projections processed successfully.",
+                "results": results
+            }, status=200)
+
+        except Exception as e:
+            # Handle any server errors
+            return JsonResponse({
+                "status": "server_error",
+                "message": "An error occurred while generating the projections.",
+                "details": str(e)
+            }, status=500)
+    else:
+        # Return 405 if the request method is invalid
+        return JsonResponse({
+            "status": "invalid_method",
+            "message": "Invalid request method."
+        }, status=405)
+
+
+@require_session("POST")
+def get_user_projection(request):
+    """
+    Handles the projection of the logged-in user's savings from the statistics stored for their history,
+    so the client only sends the duration and degree instead of the whole months/progress history.
+
+    Args:
+        request (HttpRequest): The HTTP request containing "duration" and optionally "poly_degree", "goal"
+            and "include_projection".
+
+    Returns:
+        JsonResponse: A JSON response containing the computed regression points or an error message.
+    """
+    if request.method == "POST":
+        try:
+            # Retrieve the user ID from the verified session
+            user_id = request.claims.uid
+
+            # Parse the JSON request body
+            data = json.loads(request.body)
+            duration = data.get("duration")
+            poly_degree = data.get("poly_degree", 1)
+
+            if duration is None:
+                return JsonResponse({
+                    "status": "missing_fields",
+                    "message": "Required fields are missing: duration."
+                }, status=400)
+
+            # Only degrees the projection engine supports are accepted
+            if not is_valid_degree(poly_degree):
+                return JsonResponse({
+                    "status": "invalid_data",
+                    "message": f"'poly_degree' must be an integer from {MIN_DEGREE} to {MAX_DEGREE}."
+                }, status=400)
+
+            validation_error = validate_goal_options(data)
+            if validation_error:
+                return JsonResponse(validation_error, status=400)
+
+            # Read the user's statistics, rebuilt from the history the first time
+            stats = load_stats(storage, user_id)
+            if stats is None:
+                return JsonResponse({
+                    "status": "invalid_data",
+                    "message": "The history contains months or savings that are not numbers."
+                }, status=400)
+            if not stats["count"]:
+                return JsonResponse({
+                    "status": "not_found",
+                    "message": "No history found for the user."
+                }, status=404)
+
+            points_response = get_points_from_stats(stats, duration, poly_degree, data.get("goal"), data.get("include_projection", True))
+
             return JsonResponse(points_response, status=200)
-        
+
         except Exception as e:
             # Handle any server errors
             return JsonResponse({
                 "status": "server_error",
-                "message": "An error occurred while creating the user.",
+                "message": "An error occurred while generating the projection.",
                 "details": str(e)
             }, status=500)
     else:
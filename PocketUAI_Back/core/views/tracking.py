@@ -1,9 +1,10 @@
 from django.shortcuts import render
 from django.http import JsonResponse
-from core.services.firebase import db
-from core.views.auth import check_cookie_for_functions
+from core.services.storage import storage
+from core.views.auth import require_session
 import json
 
+@require_session("POST", id_kwarg="user_id")
 def get_tracking(request, user_id):
     """
     Retrieve tracking data for a specific user.
@@ -17,7 +18,7 @@ def get_tracking(request, user_id):
     - user_id (str): The unique identifier of the user whose tracking data is being requested.
 
     Workflow:
-    1. Validate the user's session by checking the cookie using `check_cookie_for_functions`.
+    1. Validate the user's session by checking the cookie (done by `require_session` before the view runs).
     2. Retrieve the tracking document from the "tracking" collection using the `user_id`.
     3. Return the tracking data if found, or a "not found" response if no data is available.
 
@@ -40,21 +41,14 @@ def get_tracking(request, user_id):
     """
     if request.method == "POST":
         try:
-            # Validate cookie and retrieve user information
-            cookie_response = check_cookie_for_functions(request, user_id)
-            response_data = json.loads(cookie_response.content)
-            if response_data.get("status") != "success":
-                return cookie_response
-            
             # Retrieve the tracking document for the user
-            tracking_ref = db.collection("tracking").document(user_id)
-            query = tracking_ref.get()
+            tracking = storage.get("tracking", user_id)
 
-            if query.exists:
+            if tracking is not None:
                 return JsonResponse({
                     "status": "success",
                     "message": "Tracking data retrieved successfully.",
-                    "tracking": query.to_dict()
+                    "tracking": tracking
                 }, status=200)
             else:
                 return JsonResponse({
@@ -74,6 +68,7 @@ def get_tracking(request, user_id):
         }, status=405)
 
 
+@require_session("POST")
 def add_tracking(request):
     """
     Add tracking data for a user.
@@ -94,7 +89,7 @@ def add_tracking(request):
 
     Workflow:
     1. Parse and validate the JSON request payload.
-    2. Validate the user's session using `check_cookie_for_functions` to retrieve the user ID.
+    2. Read the user ID from the session validated by `require_session`.
     3. Ensure all required fields (`month`, `saving`, `advance`) are present in the payload.
     4. Save the tracking data to the database with the user ID as the document identifier.
     5. Return a success response with the document ID.
@@ -122,19 +117,8 @@ def add_tracking(request):
             # Parse request data
             data = json.loads(request.body)
 
-            # Validate the user session
-            cookie_response = check_cookie_for_functions(request)
-            response_data = json.loads(cookie_response.content)
-            if response_data.get("status") != "success":
-                return cookie_response
-            
-            # Retrieve user ID from the session data
-            user_id = response_data.get("user", {}).get("uid")
-            if user_id is None:
-                return JsonResponse({
-                    "status": "invalid_cookie",
-                    "message": "Failed to retrieve user ID from session."
-                }, status=401)
+            # Retrieve the user ID from the verified session
+            user_id = request.claims.uid
             
             # Extract required fields
             month = data.get("month")
@@ -155,13 +139,12 @@ def add_tracking(request):
             }
             
             # Save tracking data to the database
-            doc_ref = db.collection("tracking").document(user_id)
-            doc_ref.set(tracking_data)
+            storage.set("tracking", user_id, tracking_data)
             
             return JsonResponse({
                 "status": "success",
                 "message": "Tracking data added successfully.",
-                "id": doc_ref.id
+                "id": user_id
             }, status=201)
         except Exception as e:
             return JsonResponse({
@@ -176,6 +159,7 @@ def add_tracking(request):
         }, status=405)
 
 
+@require_session("PUT", id_kwarg="tracking_id")
 def update_tracking(request, tracking_id):
     
     """
@@ -194,12 +178,6 @@ def update_tracking(request, tracking_id):
             # Load the data from the request body (in JSON format)
             data = json.loads(request.body)
             
-            # Verify the user's session by checking the cookie
-            cookie_response = check_cookie_for_functions(request, tracking_id)
-            response_data = json.loads(cookie_response.content)
-            if response_data.get("status") != "success":
-                return cookie_response
-            
             # Define the allowed fields that can be updated: "month", "saving", "advance"
             allowed_fields = ["month", "saving", "advance"]
             
@@ -213,13 +191,8 @@ def update_tracking(request, tracking_id):
                     "message": "No valid fields provided for the update."
                 }, status=400)
             
-            # Access the tracking document in the database using the "tracking_id"
-            doc_ref = db.collection("tracking").document(tracking_id)
-            doc = doc_ref.get()
-
-            # If the tracking document exists, update it with the filtered data
-            if doc.exists:
-                doc_ref.update(filtered_data)
+            # Update the tracking document with the filtered data if it exists
+            if storage.update("tracking", tracking_id, filtered_data):
                 return JsonResponse({
                     "status": "success",
                     "message": "Tracking data updated successfully."
@@ -245,6 +218,7 @@ def update_tracking(request, tracking_id):
         }, status=405)
 
 
+@require_session("DELETE", id_kwarg="tracking_id")
 def delete_tracking(request, tracking_id):
     
     """
@@ -260,19 +234,8 @@ def delete_tracking(request, tracking_id):
     # Check if the request method is DELETE (used for deleting resources)
     if request.method == "DELETE":
         try:
-            # Verify the user's session by checking the cookie
-            cookie_response = check_cookie_for_functions(request, tracking_id)
-            response_data = json.loads(cookie_response.content)
-            if response_data.get("status") != "success":
-                return cookie_response
-            
-            # Access the tracking document in the database using the "tracking_id"
-            doc_ref = db.collection("tracking").document(tracking_id)
-            doc = doc_ref.get()
-
-            # If the tracking document exists, delete it
-            if doc.exists:
-                doc_ref.delete()
+            # Delete the tracking document if it exists
+            if storage.delete("tracking", tracking_id):
                 return JsonResponse({
                     "status": "success",
                     "message": f"Tracking data with ID '{tracking_id}' deleted successfully."
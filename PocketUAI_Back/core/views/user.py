@@ -1,9 +1,10 @@
 from django.shortcuts import render
 from django.http import JsonResponse
-from core.services.firebase import db
-from core.views.auth import check_cookie_for_functions
+from core.services.storage import storage
+from core.views.auth import require_session
 import json
 
+@require_session("POST", id_kwarg="user_id")
 def get_user(request, user_id):
     """
     This function is responsible for retrieving the user data based on the provided 
@@ -17,22 +18,15 @@ def get_user(request, user_id):
     # Check if the request method is POST (used for retrieving data)
     if request.method == "POST":
         try:
-            # Verify the user's session by checking the cookie
-            cookie_response = check_cookie_for_functions(request, user_id)
-            response_data = json.loads(cookie_response.content)
-            if response_data.get("status") != "success":
-                return cookie_response
-            
             # Access the user document in the database using the "user_id"
-            user_ref = db.collection("user").document(user_id)
-            user = user_ref.get()
+            user = storage.get("user", user_id)
 
             # If the user exists, return the user data
-            if user.exists:
+            if user is not None:
                 return JsonResponse({
                     "status": "success",
                     "message": "User retrieved successfully.",
-                    "user": user.to_dict()  # Convert the document to a dictionary and return
+                    "user": user
                 }, status=200)
             else:
                 # If the user is not found, return an error
@@ -85,6 +79,7 @@ def get_user(request, user_id):
 #             "message": "Invalid request method."
 #         }, status=405)
 
+@require_session("PUT", id_kwarg="user_id")
 def update_user(request, user_id):
     """
     This function is used to update the user's information in the database. It expects a PUT request, 
@@ -101,12 +96,6 @@ def update_user(request, user_id):
             # Parse the request body to get the data sent for the update
             data = json.loads(request.body)
             
-            # Verify the user's session by checking the cookie
-            cookie_response = check_cookie_for_functions(request, user_id)
-            response_data = json.loads(cookie_response.content)
-            if response_data.get("status") != "success":
-                return cookie_response
-            
             # Define the allowed fields that can be updated
             allowed_fields = ["name", "last", "email", "income", "expenses"]
             # Filter the data to only include the allowed fields
@@ -119,13 +108,8 @@ def update_user(request, user_id):
                     "message": "No valid fields provided for the update."
                 }, status=400)
 
-            # Access the user document in the database using the "user_id"
-            doc_ref = db.collection("user").document(user_id)
-            doc = doc_ref.get()
-
-            # If the user exists, update the user data with the filtered data
-            if doc.exists:
-                doc_ref.update(filtered_data)
+            # Update the user document with the filtered data if it exists
+            if storage.update("user", user_id, filtered_data):
                 return JsonResponse({
                     "status": "success",
                     "message": "User updated successfully."
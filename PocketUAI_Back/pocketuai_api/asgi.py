@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pocketuai_api.settings')
 
 application = get_asgi_application()
+
+# Warm up this worker in the background; /core/api/health/ready/ answers 200 once it is done
+from django.conf import settings  # noqa: E402
+from core.services.warmup import start_warmup  # noqa: E402
+
+if settings.WARMUP_ON_STARTUP:
+    start_warmup()
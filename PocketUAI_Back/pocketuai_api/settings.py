@@ -10,16 +10,25 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
-from decouple import AutoConfig
+from decouple import AutoConfig, Csv
 
 config = AutoConfig()
 FIREBASE_CREDENTIALS_PATH = config("FIREBASE_CREDENTIALS_PATH")
+MODEL_TIMING_LOG = config("MODEL_TIMING_LOG", default=False, cast=bool)  # Log the stage timings of the model endpoints
+IMPORT_TIME_BUDGET_MS = config("IMPORT_TIME_BUDGET_MS", default=1000, cast=int)  # Maximum startup import time checked by `check --deploy`, 0 to disable
+WARMUP_ON_STARTUP = config("WARMUP_ON_STARTUP", default=True, cast=bool)  # Warm up each server worker in the background when it starts
+WARMUP_SKIP = config("WARMUP_SKIP", default="", cast=Csv())  # Warmup steps not to run, e.g. "storage"
+SESSION_REVOCATION_CHECK_INTERVAL = config("SESSION_REVOCATION_CHECK_INTERVAL", default=60, cast=int)  # Seconds between background revocation checks of a cached session
 
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+STORAGE_BACKEND = config("STORAGE_BACKEND", default="firestore")  # Document storage: "firestore" or "sqlite" (local, no network)
+SQLITE_STORAGE_PATH = config("SQLITE_STORAGE_PATH", default=str(BASE_DIR / "storage.sqlite3"))  # Database file of the sqlite storage
+DOCUMENT_CACHE_ENABLED = config("DOCUMENT_CACHE_ENABLED", default=True, cast=bool)  # Serve repeated document reads from memory
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.0/howto/deployment/checklist/
@@ -56,6 +65,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ServerTimingMiddleware',
 ]
 
 ROOT_URLCONF = 'pocketuai_api.urls'
@@ -136,4 +146,18 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173"
 ]
 
-CORS_ALLOW_CREDENTIALS = True
\ No newline at end of file
+CORS_ALLOW_CREDENTIALS = True
+
+# Lets the frontend read the stage timings of the model endpoints
+CORS_EXPOSE_HEADERS = ["Server-Timing"]
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "core.timing": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
\ No newline at end of file